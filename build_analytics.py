@@ -3,26 +3,36 @@ import logging
 from pathlib import Path
 import os
 
+from warehouse.snapshots import BUILD_DB_ENV, build_db_path, standalone_build
+
 # BASE_DIR is /app/ inside the container
 ROOT_DIR = os.getcwd()
 
-DB_PATH = os.path.join(ROOT_DIR, "warehouse", "analytics", "analytics.duckdb")
+# Private build file when run inside a snapshot build (see warehouse/snapshots.py)
+DB_PATH = os.path.join(ROOT_DIR, build_db_path())
 STAGING_PATH = os.path.join(ROOT_DIR, "warehouse", "staging")
 SCHEMA_PATH = os.path.join(ROOT_DIR, "warehouse", "sql", "schema.sql")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
 
-def build_gold_layer():
-    db_path_obj = Path(DB_PATH)
-    db_path_obj.parent.mkdir(parents=True, exist_ok=True)
-    
+def build_gold_layer(con=None):
+    """
+    Load the gold layer. Pass `con` to reuse an open connection (pipeline.py
+    shares one across steps); otherwise DB_PATH, which must be a build in
+    progress, is opened and closed here.
+    """
     if not os.path.exists(SCHEMA_PATH):
         raise FileNotFoundError(f"CRITICAL: Schema file not found at {SCHEMA_PATH}")
 
-    # Open connection
-    con = duckdb.connect(DB_PATH)
-    
+    owns_connection = con is None
+    if owns_connection:
+        if not os.environ.get(BUILD_DB_ENV):
+            # Outside a build DB_PATH is the published snapshot, which is never written
+            raise RuntimeError("build_gold_layer() needs `con` or a build in progress (see standalone_build)")
+        Path(DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+        con = duckdb.connect(DB_PATH)
+
     try:
         logger.info("Connection to DuckDB successful. Starting load...")
         
@@ -38,9 +48,10 @@ def build_gold_layer():
      
         # 3. Load Fact Tables
         logger.info("Loading Fact Tables with EXCLUDE logic...")
+        rows_out = 0
         
         # DRIVER SHIFTS
-        con.execute(f"""
+        rows_out += con.execute(f"""
             INSERT OR REPLACE INTO mart.fact_driver_shifts 
             BY NAME
             SELECT 
@@ -48,10 +59,10 @@ def build_gold_layer():
                 timestamp AS event_timestamp, 
                 CAST(timestamp AS DATE) as date_key 
             FROM read_json_auto('{STAGING_PATH}/driver_health_staged.jsonl')
-        """)
+        """).fetchone()[0]
 
         # VEHICLE TELEMETRY
-        con.execute(f"""
+        rows_out += con.execute(f"""
             INSERT OR REPLACE INTO mart.fact_vehicle_telemetry 
             BY NAME
             SELECT 
@@ -59,25 +70,33 @@ def build_gold_layer():
                 timestamp AS event_timestamp, 
                 CAST(timestamp AS DATE) as date_key 
             FROM read_json_auto('{STAGING_PATH}/vehicles_staged.jsonl')
-        """)
+        """).fetchone()[0]
 
         # DAILY FINANCE
-        con.execute(f"""
+        rows_out += con.execute(f"""
             INSERT OR REPLACE INTO mart.fact_daily_finance 
             BY NAME
             SELECT 
                 * EXCLUDE(date), 
                 date AS date_key 
             FROM read_json_auto('{STAGING_PATH}/finance_daily_staged.jsonl')
-        """)
+        """).fetchone()[0]
         # 4. Final Quality Check
         count = con.execute("SELECT count(*) FROM mart.dim_driver").fetchone()[0]
         logger.info(f"Analytics Layer Ready. Total Drivers in Mart: {count}")
+        return {"rows_out": rows_out}
 
     finally:
         # Close connection ONLY after all work is done
-        con.close()
-        logger.info("Database connection closed safely.")
+        if owns_connection:
+            con.close()
+            logger.info("Database connection closed safely.")
 
 if __name__ == "__main__":
-    build_gold_layer()
\ No newline at end of file
+    # Standalone runs load a private build, published only if the load succeeds
+    with standalone_build() as build_path:
+        con = duckdb.connect(str(build_path))
+        try:
+            build_gold_layer(con)
+        finally:
+            con.close()
@@ -1,7 +1,9 @@
 # check_results.py 
 import duckdb
 
-con = duckdb.connect("warehouse/analytics/analytics.duckdb")
+from warehouse.snapshots import current_db_path
+
+con = duckdb.connect(str(current_db_path()), read_only=True)
 
 query = """
 SELECT 
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 from utils.db import run_query
 from utils.formatting import format_int
 
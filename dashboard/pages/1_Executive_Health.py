@@ -1,6 +1,5 @@
 # dashboard/pages/1_Executive_Health.py
 import streamlit as st
-import pandas as pd
 from utils.db import run_query
 from components.kpis import get_executive_kpis
 
@@ -26,13 +25,13 @@ FATIGUE_WARN = get_thresh('avg_fatigue_index', 'warning')
 kpis = get_executive_kpis()
 
 # Dynamic Overheat Query
-overheat_sql = f"""
+overheat_sql = """
     SELECT COUNT(DISTINCT vehicle_id) 
     FROM mart.fact_vehicle_daily_metrics 
-    WHERE avg_engine_temp_c > {TEMP_WARN} 
+    WHERE avg_engine_temp_c > $temp_warn 
     AND date_key = (SELECT MAX(date_key) FROM mart.fact_vehicle_daily_metrics)
 """
-overheat_val = run_query(overheat_sql).iloc[0, 0]
+overheat_val = run_query(overheat_sql, {"temp_warn": float(TEMP_WARN)}).iloc[0, 0]
 
 c1, c2, c3, c4, c5 = st.columns(5)
 c1.metric("Drivers Active", kpis["active_drivers"])
@@ -62,15 +61,15 @@ with t_col1:
 
 with t_col2:
     st.write("**Safety & Health Incidents**")
-    safety_df = run_query(f"""
+    safety_df = run_query("""
         SELECT 
             date_key, 
             SUM(speeding_events) as speeding,
-            COUNT(CASE WHEN avg_engine_temp_c > {TEMP_WARN} THEN 1 END) as overheating
+            COUNT(CASE WHEN avg_engine_temp_c > $temp_warn THEN 1 END) as overheating
         FROM mart.fact_vehicle_daily_metrics
         WHERE date_key >= (SELECT MAX(date_key) FROM mart.fact_vehicle_daily_metrics) - INTERVAL 7 DAY
         GROUP BY 1 ORDER BY 1
-    """)
+    """, {"temp_warn": float(TEMP_WARN)})
     st.line_chart(safety_df, x="date_key", y=["speeding", "overheating"])
 
 st.divider()
@@ -81,7 +80,7 @@ a_col1, a_col2 = st.columns([2, 1])
 
 with a_col1:
     st.write("**Drivers Requiring Intervention**")
-    risky_drivers_sql = f"""
+    risky_drivers_sql = """
     SELECT
         driver_id,
         ROUND(avg_fatigue_index, 2) AS fatigue,
@@ -89,11 +88,11 @@ with a_col1:
         fraud_alerts_count AS fraud
     FROM mart.fact_driver_daily_metrics
     WHERE date_key = (SELECT MAX(date_key) FROM mart.fact_driver_daily_metrics)
-    AND (avg_fatigue_index > {FATIGUE_WARN} OR speeding_events > 5 OR fraud_alerts_count > 0)
+    AND (avg_fatigue_index > $fatigue_warn OR speeding_events > 5 OR fraud_alerts_count > 0)
     ORDER BY fatigue DESC
     LIMIT 5
     """
-    st.dataframe(run_query(risky_drivers_sql), use_container_width=True, hide_index=True)
+    st.dataframe(run_query(risky_drivers_sql, {"fatigue_warn": float(FATIGUE_WARN)}), use_container_width=True, hide_index=True)
 
 with a_col2:
     st.write("**Asset Status Distribution**")
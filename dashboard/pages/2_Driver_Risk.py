@@ -21,7 +21,9 @@ if not selected_driver:
     st.stop()
 
 # DATA FETCHING
-summary_sql = f"""
+params = {"driver": selected_driver, "start": start_date, "end": end_date}
+
+summary_sql = """
 SELECT
     COUNT(DISTINCT date_key)           AS active_days,
     AVG(avg_fatigue_index)             AS avg_fatigue,
@@ -29,10 +31,10 @@ SELECT
     MAX(max_continuous_hours)          AS max_hours,
     SUM(fraud_alerts_count)            AS fraud_alerts
 FROM mart.fact_driver_daily_metrics
-WHERE driver_id = '{selected_driver}'
-  AND date_key BETWEEN '{start_date}' AND '{end_date}'
+WHERE driver_id = $driver
+  AND date_key BETWEEN $start AND $end
 """
-summary = run_query(summary_sql).iloc[0]
+summary = run_query(summary_sql, params).iloc[0]
 
 # KPI TOP BAR
 c1, c2, c3, c4, c5 = st.columns(5)
@@ -54,31 +56,31 @@ left, right = st.columns(2)
 
 with left:
     st.subheader("🧠 Fatigue & Continuous Driving")
-    trend_sql = f"""
+    trend_sql = """
     SELECT date_key::DATE as date, avg_fatigue_index, max_continuous_hours
     FROM mart.fact_driver_daily_metrics
-    WHERE driver_id = '{selected_driver}' AND date_key BETWEEN '{start_date}' AND '{end_date}'
+    WHERE driver_id = $driver AND date_key BETWEEN $start AND $end
     ORDER BY date_key
     """
-    trend_df = run_query(trend_sql)
+    trend_df = run_query(trend_sql, params)
     st.line_chart(trend_df, x="date", y=["avg_fatigue_index", "max_continuous_hours"])
 
 with right:
     st.subheader("🚦 Speeding Profile")
-    speed_sql = f"""
+    speed_sql = """
     SELECT date_key::DATE as date, speeding_events
     FROM mart.fact_driver_daily_metrics
-    WHERE driver_id = '{selected_driver}' AND date_key BETWEEN '{start_date}' AND '{end_date}'
+    WHERE driver_id = $driver AND date_key BETWEEN $start AND $end
     ORDER BY date_key
     """
-    st.bar_chart(run_query(speed_sql), x="date", y="speeding_events", color="#ff4b4b")
+    st.bar_chart(run_query(speed_sql, params), x="date", y="speeding_events", color="#ff4b4b")
 
 st.divider()
 
 # POLICY VIOLATION LOG 
 st.subheader("📋 Compliance Audit Log")
 
-audit_sql = f"""
+audit_sql = """
 SELECT 
     date_key,
     ROUND(avg_fatigue_index, 2) as fatigue,
@@ -86,12 +88,12 @@ SELECT
     speeding_events as speeding,
     fraud_alerts_count as fraud
 FROM mart.fact_driver_daily_metrics
-WHERE driver_id = '{selected_driver}'
-  AND date_key BETWEEN '{start_date}' AND '{end_date}'
+WHERE driver_id = $driver
+  AND date_key BETWEEN $start AND $end
   AND (avg_fatigue_index > 0.7 OR max_continuous_hours > 8 OR speeding_events > 10 OR fraud_alerts_count > 0)
 ORDER BY date_key DESC
 """
-audit_df = run_query(audit_sql)
+audit_df = run_query(audit_sql, params)
 
 if audit_df.empty:
     st.success(f"Driver {selected_driver} is fully compliant for this period.")
@@ -33,7 +33,9 @@ temp_crit = thresholds_df.loc[thresholds_df['metric_name'] == 'engine_temp_c', '
 batt_warn = thresholds_df.loc[thresholds_df['metric_name'] == 'battery_voltage', 'warning_threshold'].values[0] if not thresholds_df.empty else 11.8
 
 # 3. DATA FETCHING
-summary_sql = f"""
+params = {"vehicle": selected_vehicle, "start": start_date, "end": end_date}
+
+summary_sql = """
 SELECT
     COUNT(DISTINCT date_key)           AS active_days,
     AVG(avg_speed_kph)                 AS avg_speed,
@@ -42,10 +44,10 @@ SELECT
     AVG(avg_battery_voltage)           AS avg_battery,
     SUM(speeding_events)               AS total_speeding
 FROM mart.fact_vehicle_daily_metrics
-WHERE vehicle_id = '{selected_vehicle}'
-  AND date_key BETWEEN '{start_date}' AND '{end_date}'
+WHERE vehicle_id = $vehicle
+  AND date_key BETWEEN $start AND $end
 """
-summary_df = run_query(summary_sql)
+summary_df = run_query(summary_sql, params)
 
 is_ghost = summary_df.empty or summary_df.iloc[0]["active_days"] == 0
 
@@ -84,13 +86,13 @@ st.divider()
 left, right = st.columns(2)
 with left:
     st.subheader("🌡️ Engine Temperature Trend")
-    engine_df = run_query(f"""
+    engine_df = run_query("""
         SELECT date_key, avg_engine_temp_c 
         FROM mart.fact_vehicle_daily_metrics 
-        WHERE vehicle_id = '{selected_vehicle}' 
-        AND date_key BETWEEN '{start_date}' AND '{end_date}' 
+        WHERE vehicle_id = $vehicle 
+        AND date_key BETWEEN $start AND $end 
         ORDER BY date_key
-    """)
+    """, params)
     if not engine_df.empty:
         # Clean date for chart hover/X-axis
         engine_df['date_key'] = pd.to_datetime(engine_df['date_key']).dt.date
@@ -98,13 +100,13 @@ with left:
 
 with right:
     st.subheader("⚡ Speeding & Stress Correlation")
-    stress_df = run_query(f"""
+    stress_df = run_query("""
         SELECT date_key, speeding_rate, avg_speed_kph 
         FROM mart.fact_vehicle_daily_metrics 
-        WHERE vehicle_id = '{selected_vehicle}' 
-        AND date_key BETWEEN '{start_date}' AND '{end_date}' 
+        WHERE vehicle_id = $vehicle 
+        AND date_key BETWEEN $start AND $end 
         ORDER BY date_key
-    """)
+    """, params)
     if not stress_df.empty:
         # Clean date for chart hover/X-axis
         stress_df['date_key'] = pd.to_datetime(stress_df['date_key']).dt.date
@@ -134,7 +136,7 @@ st.divider()
 
 # 7. DATA TABLE (FIXED DATE CLEANING)
 st.subheader("📋 Detailed Operational Log")
-log_df = run_query(f"""
+log_df = run_query("""
     SELECT 
         date_key, 
         avg_speed_kph, 
@@ -143,10 +145,10 @@ log_df = run_query(f"""
         avg_battery_voltage, 
         speeding_events 
     FROM mart.fact_vehicle_daily_metrics 
-    WHERE vehicle_id = '{selected_vehicle}' 
-    AND date_key BETWEEN '{start_date}' AND '{end_date}' 
+    WHERE vehicle_id = $vehicle 
+    AND date_key BETWEEN $start AND $end 
     ORDER BY date_key DESC
-""")
+""", params)
 
 if not log_df.empty:
     log_df['date_key'] = pd.to_datetime(log_df['date_key']).dt.date
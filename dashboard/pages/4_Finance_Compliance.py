@@ -1,7 +1,6 @@
 # dashboard/pages/4_Finance_Compliance.py
 
 import streamlit as st
-import pandas as pd
 from utils.db import run_query
 from components.filters import date_filter
 
@@ -13,18 +12,19 @@ st.caption("Monitoring fleet profitability against regulatory and fraud risk")
 
 # FILTERS
 start_date, end_date = date_filter()
+params = {"start": start_date, "end": end_date}
 
 # FINANCIAL KPIs
-kpi_sql = f"""
+kpi_sql = """
 SELECT
     SUM(total_revenue)      AS total_revenue,
     SUM(total_cost)         AS total_cost,
     SUM(net_profit)         AS net_profit,
     SUM(fraud_alerts_count) AS fraud_alerts
 FROM mart.fact_driver_daily_metrics
-WHERE date_key BETWEEN '{start_date}' AND '{end_date}'
+WHERE date_key BETWEEN $start AND $end
 """
-kpi_res = run_query(kpi_sql)
+kpi_res = run_query(kpi_sql, params)
 
 if not kpi_res.empty:
     kpis = kpi_res.iloc[0]
@@ -47,39 +47,39 @@ left, right = st.columns(2)
 
 with left:
     st.subheader("📈 Revenue vs. Cost Over Time")
-    trend_sql = f"""
+    trend_sql = """
         SELECT date_key, SUM(total_revenue) AS revenue, SUM(total_cost) AS cost
         FROM mart.fact_driver_daily_metrics
-        WHERE date_key BETWEEN '{start_date}' AND '{end_date}'
+        WHERE date_key BETWEEN $start AND $end
         GROUP BY 1 ORDER BY 1
     """
-    st.area_chart(run_query(trend_sql).set_index("date_key"))
+    st.area_chart(run_query(trend_sql, params).set_index("date_key"))
 
 with right:
     st.subheader("🚩 Fraud Alert Velocity")
-    fraud_trend_sql = f"""
+    fraud_trend_sql = """
         SELECT date_key, SUM(fraud_alerts_count) AS alerts
         FROM mart.fact_driver_daily_metrics
-        WHERE date_key BETWEEN '{start_date}' AND '{end_date}'
+        WHERE date_key BETWEEN $start AND $end
         GROUP BY 1 ORDER BY 1
     """
-    st.bar_chart(run_query(fraud_trend_sql).set_index("date_key"), color="#ff4b4b")
+    st.bar_chart(run_query(fraud_trend_sql, params).set_index("date_key"), color="#ff4b4b")
 
 st.divider()
 
 # ADVANCED RISK ANALYSIS
 st.subheader("🎯 Risk vs. Reward (Driver Profiling)")
-correlation_sql = f"""
+correlation_sql = """
     SELECT 
         driver_id, 
         SUM(net_profit) as total_profit, 
         SUM(fraud_alerts_count) as total_fraud,
         AVG(avg_fatigue_index) as avg_fatigue
     FROM mart.fact_driver_daily_metrics
-    WHERE date_key BETWEEN '{start_date}' AND '{end_date}'
+    WHERE date_key BETWEEN $start AND $end
     GROUP BY 1
 """
-corr_df = run_query(correlation_sql)
+corr_df = run_query(correlation_sql, params)
 
 if not corr_df.empty:
     st.scatter_chart(
@@ -99,20 +99,20 @@ c1, c2 = st.columns(2)
 
 with c1:
     st.subheader("📉 Loss-Making Drivers")
-    loss_sql = f"""
+    loss_sql = """
         SELECT driver_id, SUM(net_profit) as profit, SUM(total_revenue) as rev
         FROM mart.fact_driver_daily_metrics
-        WHERE date_key BETWEEN '{start_date}' AND '{end_date}'
+        WHERE date_key BETWEEN $start AND $end
         GROUP BY 1 HAVING SUM(net_profit) < 0 ORDER BY profit ASC
     """
-    st.dataframe(run_query(loss_sql), use_container_width=True)
+    st.dataframe(run_query(loss_sql, params), use_container_width=True)
 
 with c2:
     st.subheader("🕵️ High Fraud Drivers")
-    fraud_audit_sql = f"""
+    fraud_audit_sql = """
         SELECT driver_id, SUM(fraud_alerts_count) as alerts, AVG(avg_fatigue_index) as fatigue
         FROM mart.fact_driver_daily_metrics
-        WHERE date_key BETWEEN '{start_date}' AND '{end_date}'
+        WHERE date_key BETWEEN $start AND $end
         GROUP BY 1 HAVING SUM(fraud_alerts_count) > 0 ORDER BY alerts DESC
     """
-    st.dataframe(run_query(fraud_audit_sql), use_container_width=True)
\ No newline at end of file
+    st.dataframe(run_query(fraud_audit_sql, params), use_container_width=True)
\ No newline at end of file
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from utils.db import run_query
-from datetime import datetime
+from datetime import datetime, time
 
 st.set_page_config(page_title="Data Quality & Trust", layout="wide")
 
@@ -31,14 +31,14 @@ latency_df = run_query("SELECT DATEDIFF('day', MAX(date_key), CURRENT_DATE) as d
 external_lag = int(latency_df["days_lag"][0]) if not latency_df.empty else 99
 
 # D. Consolidated Leads
-leads_df = run_query(f"""
+leads_df = run_query("""
     SELECT 
         'Vehicle' as category,
         vehicle_id as entity_id, 
         'High Temp' as issue_type,
         ROUND(avg_engine_temp_c, 1) || '°C' as value
     FROM mart.fact_vehicle_daily_metrics 
-    WHERE avg_engine_temp_c > {TEMP_WARN}
+    WHERE avg_engine_temp_c > $temp_warn
     AND date_key = (SELECT MAX(date_key) FROM mart.fact_vehicle_daily_metrics)
 
     UNION ALL
@@ -49,9 +49,9 @@ leads_df = run_query(f"""
         'High Fatigue' as issue_type,
         ROUND(avg_fatigue_index, 2) as value
     FROM mart.fact_driver_daily_metrics 
-    WHERE avg_fatigue_index > {FATIGUE_WARN}
+    WHERE avg_fatigue_index > $fatigue_warn
     AND date_key = (SELECT MAX(date_key) FROM mart.fact_driver_daily_metrics)
-""")
+""", {"temp_warn": float(TEMP_WARN), "fatigue_warn": float(FATIGUE_WARN)})
 
 validity_count = len(leads_df)
 null_check = run_query("SELECT count(*) FROM mart.fact_vehicle_daily_metrics WHERE vehicle_id IS NULL").iloc[0,0]
@@ -105,7 +105,94 @@ with right:
     else:
         st.success("✅ All telemetry matches safety thresholds.")
 
-# 5. TRUST TIP
+# 5. PIPELINE PERFORMANCE (mart.pipeline_runs / mart.pipeline_steps)
+st.divider()
+st.subheader("⏱️ Pipeline Performance")
+st.caption("Stage durations and throughput per run, written by pipeline.py. Slowdowns show here before they break the 06:00 SLA.")
+
+# The daily run must be done by 06:00 Lagos time (the workflow's cron is 05:00 UTC)
+SLA_TIMEZONE = "Africa/Lagos"
+SLA_TIME = time(6, 0)
+
+try:
+    runs_df = run_query("""
+        SELECT run_id, started_at, finished_at, duration_s, status,
+               steps_run, steps_skipped, critical_path_s, resumed_from, resume_saved_s
+        FROM mart.pipeline_runs
+        ORDER BY started_at DESC
+        LIMIT 30
+    """)
+    steps_df = run_query("""
+        SELECT r.started_at AS run_started_at, s.step_name, s.phase, s.duration_s,
+               s.rows_in, s.rows_out, s.rows_rejected, s.bytes_read
+        FROM mart.pipeline_steps s
+        JOIN mart.pipeline_runs r USING (run_id)
+        WHERE s.status = 'success'
+          AND r.run_id IN (SELECT run_id FROM mart.pipeline_runs ORDER BY started_at DESC LIMIT 30)
+    """)
+except Exception:
+    runs_df, steps_df = pd.DataFrame(), pd.DataFrame()
+
+finished_runs = runs_df[runs_df["status"] != "running"] if not runs_df.empty else runs_df
+
+if finished_runs.empty:
+    st.info("No pipeline runs recorded yet. Run `python pipeline.py` to start collecting telemetry.")
+else:
+    last = finished_runs.iloc[0]
+    recent = finished_runs["duration_s"].head(7).mean()
+    previous = finished_runs["duration_s"].iloc[7:14].mean()
+    # pipeline.py records UTC; the SLA is a Lagos wall-clock time
+    finished_at = pd.Timestamp(last["finished_at"])
+    if finished_at.tzinfo is None:
+        finished_at = finished_at.tz_localize("UTC")
+    finished_at = finished_at.tz_convert(SLA_TIMEZONE)
+    within_sla = finished_at.time() <= SLA_TIME
+
+    p1, p2, p3, p4 = st.columns(4)
+    p1.metric("Last Run", f"{last['duration_s']:.1f}s", delta=last["status"].title(),
+              delta_color="normal" if last["status"] == "success" else "inverse")
+    p2.metric("Finished At (Lagos)", finished_at.strftime("%H:%M"),
+              delta=f"Within {SLA_TIME:%H:%M} SLA" if within_sla else f"Past {SLA_TIME:%H:%M} SLA",
+              delta_color="normal" if within_sla else "inverse")
+    p3.metric("7-Run Avg Duration", f"{recent:.1f}s",
+              delta=f"{(recent / previous - 1):+.0%} vs prior 7" if previous and pd.notna(previous) else None,
+              delta_color="inverse")
+    p4.metric("Critical Path", f"{last['critical_path_s']:.1f}s",
+              delta=f"{int(last['steps_skipped'])} cached steps", delta_color="off")
+
+    resumed = finished_runs[finished_runs["resumed_from"].notna()]
+    if not resumed.empty:
+        st.caption(
+            f"{len(resumed)} of the last {len(finished_runs)} runs resumed a failed run with `--resume`, "
+            f"saving {resumed['resume_saved_s'].sum():.1f}s of redone work."
+        )
+
+    perf_left, perf_right = st.columns(2)
+
+    with perf_left:
+        st.write("**Stage Durations (s)**")
+        if not steps_df.empty:
+            # Slowest steps on average; the rest is noise at this scale
+            top_steps = steps_df.groupby("step_name")["duration_s"].mean().nlargest(6).index
+            durations = (
+                steps_df[steps_df["step_name"].isin(top_steps)]
+                .pivot_table(index="run_started_at", columns="step_name", values="duration_s", aggfunc="sum")
+                .sort_index()
+            )
+            st.line_chart(durations)
+
+    with perf_right:
+        st.write("**Staging Throughput (rows/s)**")
+        staged = steps_df[(steps_df["phase"] == "stage") & steps_df["rows_in"].notna()] if not steps_df.empty else steps_df
+        if not staged.empty:
+            throughput = staged.groupby("run_started_at").agg(rows=("rows_in", "sum"), secs=("duration_s", "sum"))
+            throughput = throughput[throughput["secs"] > 0]
+            st.line_chart((throughput["rows"] / throughput["secs"]).rename("rows_per_s").sort_index(), color="#00d4ff")
+
+    with st.expander("Recent runs"):
+        st.dataframe(runs_df, use_container_width=True, hide_index=True)
+
+# 6. TRUST TIP
 st.divider()
 if health_score == "Healthy":
     st.success("💡 **Trust Tip:** Data is synced and operating within business thresholds.")
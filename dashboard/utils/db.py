@@ -1,23 +1,128 @@
 # dashboard/utils/db.py
 
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+
 import duckdb
 import streamlit as st
 import pandas as pd
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+# Snapshot layout written by warehouse/snapshots.py
+ANALYTICS_DIR = Path("warehouse/analytics")
+CURRENT_POINTER = ANALYTICS_DIR / "CURRENT"
+LEGACY_DB_PATH = ANALYTICS_DIR / "analytics.duckdb"
+
+# Log cache hit / statement reuse rates every N queries
+STATS_LOG_EVERY = 50
 
-@st.cache_resource
-def get_connection():
+# Parsed statements by template id, shared by every session and snapshot
+_statements: dict = {}
+_stats = {"queries": 0, "cache_misses": 0, "statements_parsed": 0, "statements_reused": 0}
+_lock = threading.Lock()
+
+
+def current_db_path() -> str:
     """
-    Creates a persistent connection to the DuckDB database.
-    Using read_only=True allows multiple sessions to access the file safely.
+    Resolves the published snapshot. The pipeline swaps the CURRENT pointer
+    atomically, so reading it on every query is enough to see new versions.
     """
-    return duckdb.connect("warehouse/analytics/analytics.duckdb", read_only=True)
-@st.cache_data(ttl=300)
-def run_query(sql: str) -> pd.DataFrame:
+    if CURRENT_POINTER.exists():
+        version = CURRENT_POINTER.read_text().strip()
+        if version:
+            return str(ANALYTICS_DIR / "versions" / version)
+    return str(LEGACY_DB_PATH)
+
+
+@st.cache_resource(max_entries=1)
+def get_connection(db_path: str):
     """
-    Executes a SQL query and returns a pandas DataFrame.
-    Results are cached for 5 minutes (300 seconds).
+    Creates a persistent connection to one DuckDB snapshot.
+    Snapshots are never written after publishing, so read_only=True never
+    contends with the pipeline. A new snapshot path evicts the old connection.
     """
-    con = get_connection()
-    return con.execute(sql).df()
+    return duckdb.connect(db_path, read_only=True)
+
+
+@lru_cache(maxsize=256)
+def template_id(sql: str) -> str:
+    """Stable id for a query template, ignoring whitespace differences."""
+    return hashlib.sha1(" ".join(sql.split()).encode()).hexdigest()[:12]
 
 
+def _statement(tid: str, sql: str):
+    """
+    The parsed statement for a template, parsed on first use only.
+    Templates take values as $name parameters, so one statement serves
+    every filter combination.
+    """
+    with _lock:
+        stmt = _statements.get(tid)
+        if stmt is not None:
+            _stats["statements_reused"] += 1
+            return stmt
+
+    parsed = duckdb.extract_statements(sql)
+    if len(parsed) != 1:
+        raise ValueError(f"Query template {tid} must hold exactly one statement, got {len(parsed)}")
+
+    with _lock:
+        stmt = _statements.setdefault(tid, parsed[0])
+        _stats["statements_parsed"] += 1
+    return stmt
+
+
+@st.cache_data(ttl=300)
+def _cached_query(tid: str, params: tuple, db_path: str, _sql: str) -> pd.DataFrame:
+    # `_sql` is not hashed: the cache key is (template id, params, snapshot)
+    with _lock:
+        _stats["cache_misses"] += 1
+    stmt = _statement(tid, _sql)
+    con = get_connection(db_path).cursor()
+    try:
+        return con.execute(stmt, dict(params)).df() if params else con.execute(stmt).df()
+    finally:
+        con.close()
+
+
+def _record_query():
+    with _lock:
+        _stats["queries"] += 1
+        if _stats["queries"] % STATS_LOG_EVERY:
+            return
+        stats = dict(_stats)
+
+    parsed_or_reused = stats["statements_parsed"] + stats["statements_reused"]
+    logger.info(
+        "Dashboard queries: %s | cache hit rate %.0f%% | statement reuse %.0f%% (%s templates)",
+        stats["queries"],
+        100.0 * (stats["queries"] - stats["cache_misses"]) / stats["queries"],
+        100.0 * stats["statements_reused"] / parsed_or_reused if parsed_or_reused else 0.0,
+        stats["statements_parsed"],
+    )
+
+
+def query_stats() -> dict:
+    """Counters behind the periodic hit-rate log line."""
+    with _lock:
+        return dict(_stats)
+
+
+def run_query(template: str, params: dict = None) -> pd.DataFrame:
+    """
+    Executes a SQL template and returns a pandas DataFrame.
+    Values are passed as $name parameters (`params`), never formatted into
+    the SQL, so the template parses once and filter changes only rebind.
+    Results are cached for 5 minutes (300 seconds) per template, params and
+    snapshot version, so a publish shows up on the next rerun instead of
+    after the TTL.
+    """
+    key = tuple(sorted((params or {}).items()))
+    result = _cached_query(template_id(template), key, current_db_path(), template)
+    _record_query()
+    return result
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+fleetintel.py
+-------------
+Single entry point for the FleetIntel360 tools.
+
+Each subcommand's module is imported only when that subcommand runs, so
+`--help` costs an interpreter start and `stage` never loads pandas. Options
+after the subcommand go to the tool's own parser.
+
+Usage:
+    python fleetintel.py simulate --days 3 --engine vector
+    python fleetintel.py stage                   # raw -> staging files only
+    python fleetintel.py build --force           # pipeline.py options
+    python fleetintel.py alerts
+    python fleetintel.py dq
+    python fleetintel.py bench startup           # import-time budgets (exit 1 when over)
+    python fleetintel.py bench finance -n 5000
+    python fleetintel.py bench slack -n 200      # delivery against a local stub webhook
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Config
+DQ_SQL_FILES = [
+    "warehouse/sql/quality/dq_nulls.sql",
+    "warehouse/sql/quality/dq_ranges.sql",
+    "warehouse/sql/quality/dq_freshness.sql",
+]
+
+# Import time per module in a fresh interpreter, on top of bare startup (ms).
+# "fleetintel" is this file: parsing the command line must stay near free.
+IMPORT_BUDGET_MS = {
+    "fleetintel": 60,
+    "simulator.run_simulation": 400,
+    "pipeline": 400,
+    "run_alerts": 300,
+    "run_sql": 300,
+    "simulator.bench_memory": 300,
+    "simulator.bench_finance": 300,
+}
+
+# Never loaded just to parse the command line
+HEAVY_MODULES = ("duckdb", "pandas", "numpy", "requests", "dotenv", "zstandard")
+
+STARTUP_REPEATS = 5
+
+
+# Commands
+def cmd_simulate(argv: List[str]) -> int:
+    from simulator.run_simulation import main
+
+    main(argv)
+    return 0
+
+
+def cmd_stage(argv: List[str]) -> int:
+    import pipeline
+
+    stagers = [step.name for step in pipeline.STEPS if step.phase == "stage"]
+    return pipeline.main(["--steps", *stagers, "--no-deps", *argv])
+
+
+def cmd_build(argv: List[str]) -> int:
+    from pipeline import main
+
+    return main(argv)
+
+
+def cmd_alerts(argv: List[str]) -> int:
+    p = argparse.ArgumentParser(prog="fleetintel alerts", description="Evaluate alert queries and post hits to Slack")
+    p.add_argument("--db", default=None, help="database to read (defaults to the published snapshot)")
+    p.add_argument("--cooldown-hours", type=float, default=None,
+                   help="hours before an unchanged alert is re-sent (default: ALERT_COOLDOWN_HOURS or 72)")
+    args = p.parse_args(argv)
+
+    from run_alerts import run_alerts
+
+    run_alerts(args.db, cooldown_hours=args.cooldown_hours)
+    return 0
+
+
+def cmd_dq(argv: List[str]) -> int:
+    p = argparse.ArgumentParser(prog="fleetintel dq", description="Run the data quality checks against a snapshot")
+    p.add_argument("--db", default=None, help="database to read (defaults to the published snapshot)")
+    args = p.parse_args(argv)
+
+    import duckdb
+
+    from run_sql import run_sql
+    from warehouse.snapshots import current_db_path
+
+    con = duckdb.connect(args.db or str(current_db_path()), read_only=True)
+    try:
+        for sql_file in DQ_SQL_FILES:
+            run_sql(sql_file, fetch_results=True, con=con)
+    finally:
+        con.close()
+    return 0
+
+
+def cmd_bench(argv: List[str]) -> int:
+    benches: Dict[str, Callable[[List[str]], int]] = {
+        "startup": bench_startup,
+        "memory": lambda rest: _run_main("simulator.bench_memory", rest),
+        "finance": lambda rest: _run_main("simulator.bench_finance", rest),
+        "slack": lambda rest: _run_main("slack_delivery", ["--bench", *rest]),
+    }
+    p = argparse.ArgumentParser(prog="fleetintel bench", description="Benchmarks")
+    p.add_argument("bench", choices=list(benches))
+    p.add_argument("args", nargs=argparse.REMAINDER, help="options for the benchmark")
+    args = p.parse_args(argv)
+    return benches[args.bench](args.args)
+
+
+def _run_main(module: str, argv: List[str]) -> int:
+    import importlib
+
+    return importlib.import_module(module).main(argv) or 0
+
+
+# name -> (handler, help)
+COMMANDS: Dict[str, Tuple[Callable[[List[str]], int], str]] = {
+    "simulate": (cmd_simulate, "generate raw vehicle, driver health and finance files"),
+    "stage": (cmd_stage, "validate raw files into staging (pipeline stage steps)"),
+    "build": (cmd_build, "run the pipeline DAG: stage, build, publish, alerts"),
+    "alerts": (cmd_alerts, "evaluate alerts on the published snapshot"),
+    "dq": (cmd_dq, "print data quality checks for the published snapshot"),
+    "bench": (cmd_bench, "benchmarks: startup, memory, finance, slack"),
+}
+
+
+# Startup benchmark
+def _interpreter_ms(code: str, repeats: int) -> Tuple[float, str]:
+    """Best wall time of `python -c code` over `repeats` runs, and its stdout."""
+    best, out = float("inf"), ""
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        best = min(best, (time.perf_counter() - started) * 1000)
+        out = result.stdout.strip()
+    return best, out
+
+
+def bench_startup(argv: List[str]) -> int:
+    """
+    Time each command module's import in a fresh interpreter against
+    IMPORT_BUDGET_MS, and check importing this CLI loads none of
+    HEAVY_MODULES. Returns 1 if anything is over budget.
+    """
+    p = argparse.ArgumentParser(prog="fleetintel bench startup", description="Import-time budgets per entry point")
+    p.add_argument("--repeat", type=int, default=STARTUP_REPEATS, help="runs per module (best is kept)")
+    args = p.parse_args(argv)
+
+    baseline, _ = _interpreter_ms("pass", args.repeat)
+    print(f"Interpreter startup: {baseline:.0f} ms (subtracted below)")
+    print(f"{'module':<28} {'import ms':>10} {'budget':>8}  heavy modules loaded")
+
+    failed = False
+    for module, budget in IMPORT_BUDGET_MS.items():
+        probe = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        elapsed, loaded = _interpreter_ms(probe, args.repeat)
+        elapsed = max(0.0, elapsed - baseline)
+        over = elapsed > budget
+        # The CLI itself must not pull in anything heavy, whatever the timing
+        if module == "fleetintel" and loaded:
+            over = True
+        failed |= over
+        print(f"{module:<28} {elapsed:>10.0f} {budget:>8}  {loaded or '-'}{'  OVER BUDGET' if over else ''}")
+
+    print("FAILED" if failed else "OK")
+    return 1 if failed else 0
+
+
+# CLI
+def parse_args(argv: Optional[List[str]] = None):
+    commands = "\n".join(f"  {name:<10} {text}" for name, (_, text) in COMMANDS.items())
+    p = argparse.ArgumentParser(
+        prog="fleetintel",
+        description="FleetIntel360 command line",
+        epilog=f"commands:\n{commands}\n\nRun `fleetintel <command> --help` for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    p.add_argument("command", choices=list(COMMANDS), metavar="command")
+    p.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    handler, _ = COMMANDS[args.command]
+    return handler(args.args) or 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,447 @@
+# ingest_stream.py
+"""
+Streaming ingest for live telemetry.
+
+Consumes the live simulators' NDJSON stream, validates each event with the
+same rules as the batch stagers, and buffers events into micro-batches that
+close on size (--batch-size) or age (--max-wait). Each batch is appended to
+DuckDB with one bulk INSERT per fact table.
+
+Sources:
+- mqtt:  subscribe to fleet/telemetry and fleet/health on a broker (add
+         fleet/telemetry/batch to --topics for batched simulator output)
+- tcp:   listen for NDJSON over TCP, a local stand-in broker for
+         `python -m simulator.vehicle_sim --mode tcp`
+- stdin: read NDJSON lines, e.g. piped from `--mode stdout`
+
+By default each batch is appended to the live database (warehouse/live.py)
+at the cost of the batch alone, and a snapshot with the live rows merged is
+published every --publish-every seconds, so the dashboard is minutes fresh
+without copying the warehouse per batch. Rows not yet published when the
+nightly build runs are merged by it. --db appends straight into one file
+and never publishes.
+
+Each batch is also run through the stream alert evaluator (stream_alerts.py)
+before it is written, so threshold crossings are posted within a batch of
+the event rather than after the nightly run (--no-alerts to skip).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import duckdb
+import pandas as pd
+
+import stage_driver_health
+import stage_vehicles
+import stream_alerts
+from simulator.vehicle_sim import DEFAULT_BROKER, DEFAULT_TCP_PORT, DEFAULT_TOPIC
+from warehouse.live import DEFAULT_PUBLISH_EVERY, LIVE_DB_PATH, connect_live, publish_live
+from warehouse.snapshots import current_db_path
+
+# Config
+HEALTH_TOPIC = "fleet/health"
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_MAX_WAIT = 5.0  # seconds an event may sit in the buffer
+QUEUE_MAX_LINES = 100_000  # backpressure on sources while a batch is written
+
+TELEMETRY = "fact_vehicle_telemetry"
+SHIFTS = "fact_driver_shifts"
+
+# One bulk statement per table; the batch DataFrame is registered as batch_df
+INSERT_SQL = {
+    TELEMETRY: """
+        INSERT INTO mart.fact_vehicle_telemetry (
+            event_id, vehicle_id, driver_id, event_timestamp, lat, lon,
+            speed_kph, fuel_percent, engine_temp_c, battery_v, speeding, date_key,
+            heading, speed_zone_kph, tire_psi_fl, tire_psi_fr, tire_psi_rl, tire_psi_rr, obd_codes
+        )
+        SELECT
+            event_id, vehicle_id, driver_id,
+            CAST(timestamp AS TIMESTAMP),
+            lat, lon, speed_kph, fuel_percent, engine_temp_c, battery_v,
+            CAST(speeding AS BOOLEAN),
+            CAST(CAST(timestamp AS TIMESTAMP) AS DATE),
+            CAST(heading AS SMALLINT),
+            CAST(speed_zone_kph AS SMALLINT),
+            tire_psi_fl, tire_psi_fr, tire_psi_rl, tire_psi_rr,
+            CAST(obd_codes AS VARCHAR[])
+        FROM batch_df
+        ON CONFLICT (event_id) DO NOTHING
+    """,
+    SHIFTS: """
+        INSERT INTO mart.fact_driver_shifts (
+            event_id, driver_id, event_timestamp, shift_hours, continuous_driving_hours,
+            fatigue_index, breaks_taken, alerts, date_key
+        )
+        SELECT
+            event_id, driver_id,
+            CAST(timestamp AS TIMESTAMP),
+            shift_hours, continuous_driving_hours, fatigue_index,
+            CAST(breaks_taken AS BOOLEAN),
+            CAST(alerts AS JSON),
+            CAST(CAST(timestamp AS TIMESTAMP) AS DATE)
+        FROM batch_df
+        ON CONFLICT (event_id) DO NOTHING
+    """,
+}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+
+# Staging
+def stage_event(event: Dict):
+    """
+    Route one live event to its fact table, applying the batch stager's
+    validation and transform. Raises ValueError for bad events.
+    """
+    if "vehicle_id" in event:
+        record = stage_vehicles.normalize_record(event)
+        stage_vehicles.validate_required_fields(record)
+        stage_vehicles.quality_checks(record)
+        return TELEMETRY, stage_vehicles.stage_record(record)
+
+    if "fatigue_index" in event:
+        stage_driver_health.validate_required_fields(event)
+        stage_driver_health.quality_checks(event)
+        staged = stage_driver_health.stage_record(event)
+        staged["alerts"] = json.dumps(staged["alerts"])
+        return SHIFTS, staged
+
+    raise ValueError("Unrecognized event type")
+
+
+def parse_timestamp(value: str) -> Optional[datetime]:
+    try:
+        ts = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+# Micro-batching
+class MicroBatcher:
+    """
+    Buffers staged events per table until `batch_size` events have
+    arrived or the oldest has waited `max_wait` seconds.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, max_wait: float = DEFAULT_MAX_WAIT):
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self._reset()
+
+    def _reset(self):
+        self.rows: Dict[str, List[Dict]] = {TELEMETRY: [], SHIFTS: []}
+        self.count = 0
+        self.rejected = 0
+        self.opened_at: Optional[float] = None
+        self.oldest_event: Optional[datetime] = None
+        self.newest_event: Optional[datetime] = None
+
+    def add(self, line) -> None:
+        if not line.strip():
+            return
+        try:
+            table, staged = stage_event(json.loads(line))
+        except (ValueError, KeyError, TypeError) as e:
+            self.rejected += 1
+            logger.debug("Rejected event: %s", e)
+            return
+
+        if self.opened_at is None:
+            self.opened_at = time.monotonic()
+        self.rows[table].append(staged)
+        self.count += 1
+
+        ts = parse_timestamp(staged["timestamp"])
+        if ts is not None:
+            if self.oldest_event is None or ts < self.oldest_event:
+                self.oldest_event = ts
+            if self.newest_event is None or ts > self.newest_event:
+                self.newest_event = ts
+
+    def time_left(self) -> Optional[float]:
+        """Seconds until the open batch is due, or None when empty."""
+        if self.opened_at is None:
+            return None
+        return max(0.0, self.max_wait - (time.monotonic() - self.opened_at))
+
+    def due(self) -> bool:
+        return self.count >= self.batch_size or (self.opened_at is not None and self.time_left() == 0.0)
+
+    def drain(self) -> Dict:
+        batch = {
+            "rows": self.rows,
+            "count": self.count,
+            "rejected": self.rejected,
+            "buffered_s": time.monotonic() - self.opened_at if self.opened_at else 0.0,
+            "oldest_event": self.oldest_event,
+            "newest_event": self.newest_event,
+        }
+        self._reset()
+        return batch
+
+
+# Warehouse sink
+class WarehouseSink:
+    """
+    Appends micro-batches to DuckDB.
+    Batches go to the live database, published every `publish_every`
+    seconds; with `db_path` they go straight into that file instead. The
+    file is only opened while a batch is written, so the nightly merge and
+    other writers can get at it in between.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, publish_every: float = DEFAULT_PUBLISH_EVERY):
+        self.db_path = Path(db_path) if db_path else LIVE_DB_PATH
+        self.publish_every = 0.0 if db_path else publish_every
+        self.batches = 0
+        self.rows = 0
+        self.unpublished = 0
+        self.last_publish = time.monotonic()
+
+    def _insert(self, con, rows: Dict[str, List[Dict]]) -> int:
+        inserted = 0
+        for table, records in rows.items():
+            if not records:
+                continue
+            con.register("batch_df", pd.DataFrame.from_records(records))
+            try:
+                con.execute(INSERT_SQL[table])
+            finally:
+                con.unregister("batch_df")
+            inserted += len(records)
+        return inserted
+
+    def write(self, rows: Dict[str, List[Dict]]) -> Dict:
+        started = time.perf_counter()
+        con = connect_live(self.db_path)
+        try:
+            insert_started = time.perf_counter()
+            inserted = self._insert(con, rows)
+            insert_s = time.perf_counter() - insert_started
+        finally:
+            con.close()
+
+        self.batches += 1
+        self.rows += inserted
+        self.unpublished += inserted
+        return {"inserted": inserted, "insert_s": insert_s, "cycle_s": time.perf_counter() - started}
+
+    def publish_due(self) -> bool:
+        return bool(self.publish_every and self.unpublished
+                    and time.monotonic() - self.last_publish >= self.publish_every)
+
+    def publish(self) -> None:
+        """Publish a snapshot with the live rows; skipped while another build holds the lock."""
+        started = time.perf_counter()
+        published = publish_live(self.db_path)
+        self.last_publish = time.monotonic()
+        if published is not None:
+            self.unpublished = 0
+            logger.info("Published %s live rows in %.2fs", f"{published:,}", time.perf_counter() - started)
+
+
+def log_batch(number: int, batch: Dict, result: Dict) -> None:
+    now = datetime.now(timezone.utc)
+    oldest, newest = batch["oldest_event"], batch["newest_event"]
+    lag = (
+        f"lag oldest {(now - oldest).total_seconds():.1f}s / newest {(now - newest).total_seconds():.1f}s"
+        if oldest and newest else "lag n/a"
+    )
+    rate = result["inserted"] / result["insert_s"] if result["insert_s"] > 0 else 0.0
+    logger.info(
+        "Batch %s: %s rows (telemetry %s, health %s, rejected %s) | buffered %.1fs | "
+        "insert %.3fs (%s rows/s) | cycle %.2fs | %s",
+        number, f"{batch['count']:,}", f"{len(batch['rows'][TELEMETRY]):,}", f"{len(batch['rows'][SHIFTS]):,}",
+        batch["rejected"], batch["buffered_s"], result["insert_s"], f"{rate:,.0f}", result["cycle_s"], lag,
+    )
+
+
+# Sources
+EOF_MARKER = None
+
+
+async def tcp_source(queue: asyncio.Queue, host: str, port: int):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        logger.info("Publisher connected: %s", peer)
+        try:
+            async for line in reader:
+                await queue.put(line)
+        finally:
+            writer.close()
+            logger.info("Publisher disconnected: %s", peer)
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("Listening for NDJSON on tcp://%s:%s", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def stdin_source(queue: asyncio.Queue):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    async for line in reader:
+        await queue.put(line)
+    await queue.put(EOF_MARKER)
+
+
+async def mqtt_source(queue: asyncio.Queue, broker: str, topics: List[str]):
+    try:
+        import paho.mqtt.client as mqtt  # type: ignore
+    except ImportError:
+        raise RuntimeError("paho-mqtt is not installed but source=mqtt selected. pip install paho-mqtt")
+
+    loop = asyncio.get_running_loop()
+
+    def on_message(client, userdata, msg):
+        # One event per message, or an NDJSON batch from the simulator's --batch-topic
+        for line in msg.payload.splitlines():
+            loop.call_soon_threadsafe(queue.put_nowait, line)
+
+    client = mqtt.Client()
+    client.on_message = on_message
+    client.connect(broker, 1883, 60)
+    for topic in topics:
+        client.subscribe(topic)
+    client.loop_start()
+    logger.info("Subscribed to %s on %s", ", ".join(topics), broker)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+
+# Consumer
+async def consume(queue: asyncio.Queue, batcher: MicroBatcher, sink: WarehouseSink, evaluator=None):
+    loop = asyncio.get_running_loop()
+    number = 0
+    finished = False
+    notifications = set()
+
+    while not finished:
+        try:
+            line = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            try:
+                line = await asyncio.wait_for(queue.get(), batcher.time_left())
+            except asyncio.TimeoutError:
+                line = b""
+
+        if line is EOF_MARKER:
+            finished = True
+        else:
+            batcher.add(line)
+
+        if batcher.count and (batcher.due() or finished):
+            batch = batcher.drain()
+            number += 1
+            if evaluator is not None:
+                alerts = evaluator.observe_batch(batch["rows"])
+                if alerts:
+                    # Posted alongside the write, not after it
+                    task = loop.run_in_executor(None, stream_alerts.notify, alerts)
+                    notifications.add(task)
+                    task.add_done_callback(notifications.discard)
+            # Written off the event loop so sources keep reading meanwhile
+            result = await loop.run_in_executor(None, sink.write, batch["rows"])
+            log_batch(number, batch, result)
+            if sink.publish_due():
+                await loop.run_in_executor(None, sink.publish)
+
+    if notifications:
+        await asyncio.gather(*notifications)
+
+
+def open_evaluator(db_path: Optional[Path]):
+    """Stream alert evaluator warmed from the target database, or None if it has no thresholds yet."""
+    path = Path(db_path) if db_path else current_db_path()
+    if not path.exists():
+        logger.warning("No database at %s yet; stream alerts disabled", path)
+        return None
+    con = duckdb.connect(str(path), read_only=True)
+    try:
+        evaluator = stream_alerts.StreamAlertEvaluator.from_snapshot(con)
+    except duckdb.CatalogException as e:
+        logger.warning("Stream alerts disabled: %s", e)
+        return None
+    finally:
+        con.close()
+    logger.info("Stream alerts on: %s", ", ".join(evaluator.thresholds))
+    return evaluator
+
+
+async def run(args) -> None:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAX_LINES)
+    batcher = MicroBatcher(args.batch_size, args.max_wait)
+    evaluator = None if args.no_alerts else open_evaluator(args.db)
+    sink = WarehouseSink(args.db, args.publish_every)
+
+    if args.source == "tcp":
+        source = tcp_source(queue, args.host, args.port)
+    elif args.source == "stdin":
+        source = stdin_source(queue)
+    else:
+        source = mqtt_source(queue, args.broker, args.topics)
+
+    source_task = asyncio.create_task(source)
+    consumer_task = asyncio.create_task(consume(queue, batcher, sink, evaluator))
+    started = time.monotonic()
+    try:
+        done, _ = await asyncio.wait({source_task, consumer_task}, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+        await consumer_task
+    finally:
+        source_task.cancel()
+        if batcher.count:
+            # Interrupted mid-batch: don't drop what is already buffered
+            batch = batcher.drain()
+            if evaluator is not None:
+                alerts = evaluator.observe_batch(batch["rows"])
+                if alerts:
+                    stream_alerts.notify(alerts)
+            log_batch(sink.batches + 1, batch, sink.write(batch["rows"]))
+        if sink.unpublished and sink.publish_every:
+            logger.info("%s rows are in the live database until the next publish or nightly build",
+                        f"{sink.unpublished:,}")
+        elapsed = time.monotonic() - started
+        logger.info("Ingested %s rows in %s batches (%.0f rows/s overall)",
+                    f"{sink.rows:,}", sink.batches, sink.rows / elapsed if elapsed else 0)
+
+
+# CLI
+def parse_args():
+    p = argparse.ArgumentParser(description="Stream live telemetry into the warehouse in micro-batches")
+    p.add_argument("--source", choices=["mqtt", "tcp", "stdin"], default="mqtt", help="where events arrive from")
+    p.add_argument("--broker", default=DEFAULT_BROKER, help="MQTT broker host")
+    p.add_argument("--topics", nargs="+", default=[DEFAULT_TOPIC, HEALTH_TOPIC], help="MQTT topics to subscribe to")
+    p.add_argument("--host", default="127.0.0.1", help="TCP listen address")
+    p.add_argument("--port", type=int, default=DEFAULT_TCP_PORT, help="TCP listen port")
+    p.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="flush after this many events")
+    p.add_argument("--max-wait", type=float, default=DEFAULT_MAX_WAIT, help="flush after the oldest event waits this long (s)")
+    p.add_argument("--publish-every", type=float, default=DEFAULT_PUBLISH_EVERY,
+                   help="seconds between snapshot publishes of the live rows (0: leave them to the nightly build)")
+    p.add_argument("--db", type=Path, default=None, help="append straight into this database instead of publishing snapshots")
+    p.add_argument("--no-alerts", action="store_true", help="do not evaluate alert thresholds on the stream")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run(parse_args()))
+    except KeyboardInterrupt:
+        logger.info("Stopped")
@@ -0,0 +1,294 @@
+# maintain_warehouse.py
+"""
+Warehouse footprint maintenance.
+
+The metric SQL deletes and re-inserts recomputed days, and build_analytics
+uses INSERT OR REPLACE, so the DuckDB file accumulates dead rows and free
+blocks that are never handed back. This script:
+
+1. CHECKPOINTs the database (a build only; published snapshots are read-only)
+2. Reports per-table rows, dead rows, compressed size and compression ratio
+3. Rewrites the database compactly (COPY FROM DATABASE into a fresh file)
+   when fragmentation exceeds a threshold, or always with --force
+
+Inside a snapshot build (run_staging.py) the private build file is compacted
+in place before publishing. Run standalone, the compacted copy is published
+as a new snapshot version.
+"""
+
+import argparse
+import logging
+import os
+from contextlib import nullcontext
+from pathlib import Path
+
+import duckdb
+
+from warehouse.snapshots import BUILD_DB_ENV, build_db_path, build_lock, new_build_path, publish
+
+# Compact when more than this share of the file is dead space
+DEFAULT_FRAGMENTATION_THRESHOLD = 0.20
+
+# Logical (uncompressed) width of fixed-size types, in bytes
+FIXED_WIDTHS = {
+    "BOOLEAN": 1,
+    "TINYINT": 1,
+    "SMALLINT": 2,
+    "INTEGER": 4,
+    "DATE": 4,
+    "FLOAT": 4,
+    "BIGINT": 8,
+    "DOUBLE": 8,
+    "TIMESTAMP": 8,
+    "TIMESTAMP WITH TIME ZONE": 8,
+}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+
+# Measurements
+def database_usage(con) -> dict:
+    """
+    Block-level usage of the attached database file.
+    """
+    row = con.execute(
+        "SELECT block_size, total_blocks, used_blocks, free_blocks FROM pragma_database_size()"
+    ).fetchone()
+    block_size, total_blocks, used_blocks, free_blocks = row
+    return {
+        "block_size": block_size,
+        "total_blocks": total_blocks,
+        "used_blocks": used_blocks,
+        "free_blocks": free_blocks,
+    }
+
+
+def list_tables(con) -> list:
+    return con.execute("""
+        SELECT schema_name, table_name, estimated_size
+        FROM duckdb_tables()
+        WHERE database_name = current_database() AND NOT temporary
+        ORDER BY schema_name, table_name
+    """).fetchall()
+
+
+def compressed_sizes(con, tables: list, block_size: int) -> dict:
+    """
+    On-disk bytes per table from segment offsets.
+    Segments share blocks, so each segment is sized up to the next
+    segment's offset in the same block. The last segment in a shared block
+    has no end marker; it is left out of the total, and a table that only
+    fits within a block (nothing measurable beyond such tails) maps to None.
+    """
+    if not tables:
+        return {}
+
+    segments_sql = " UNION ALL ".join(
+        f"""SELECT '{schema}.{table}' AS table_name, block_id, block_offset,
+                   len(COALESCE(additional_block_ids, [])) AS extra_blocks
+            FROM pragma_storage_info('{schema}.{table}')
+            WHERE persistent AND block_id >= 0"""
+        for schema, table, _ in tables
+    )
+
+    rows = con.execute(f"""
+        WITH segments AS ({segments_sql}),
+        sized AS (
+            SELECT
+                table_name,
+                CASE
+                    WHEN next_offset IS NOT NULL THEN next_offset - block_offset
+                    -- Alone from the start of its block: the segment owns the block
+                    WHEN block_offset = 0 THEN {block_size}
+                END + extra_blocks * {block_size} AS segment_bytes
+            FROM (
+                SELECT *, LEAD(block_offset) OVER (PARTITION BY block_id ORDER BY block_offset) AS next_offset
+                FROM segments
+            )
+        )
+        SELECT table_name, SUM(segment_bytes), COUNT(*) FILTER (segment_bytes IS NULL)
+        FROM sized GROUP BY table_name
+    """).fetchall()
+
+    return {
+        name: None if tails and (size or 0) < block_size else int(size or 0)
+        for name, size, tails in rows
+    }
+
+
+def uncompressed_size(con, schema: str, table: str) -> int:
+    """
+    Logical size of a table: fixed widths for scalar types, actual byte
+    length for strings, JSON and lists.
+    """
+    columns = con.execute("""
+        SELECT column_name, data_type
+        FROM duckdb_columns()
+        WHERE database_name = current_database() AND schema_name = ? AND table_name = ?
+    """, [schema, table]).fetchall()
+    if not columns:
+        return 0
+
+    terms = []
+    for name, data_type in columns:
+        width = FIXED_WIDTHS.get(data_type.upper())
+        if width is not None:
+            terms.append(f"COUNT(*) * {width}")
+        else:
+            terms.append(f'COALESCE(SUM(strlen(CAST("{name}" AS VARCHAR))), 0)')
+
+    return int(con.execute(f'SELECT {" + ".join(terms)} FROM "{schema}"."{table}"').fetchone()[0] or 0)
+
+
+def size_report(con) -> dict:
+    """
+    Per-table footprint plus file-level fragmentation.
+    """
+    usage = database_usage(con)
+    tables = list_tables(con)
+    compressed = compressed_sizes(con, tables, usage["block_size"])
+
+    report_rows = []
+    total_rows = 0
+    total_dead = 0
+    for schema, table, estimated_rows in tables:
+        qualified = f"{schema}.{table}"
+        rows = con.execute(f'SELECT COUNT(*) FROM "{schema}"."{table}"').fetchone()[0]
+        dead_rows = max(0, (estimated_rows or 0) - rows)
+        raw_bytes = uncompressed_size(con, schema, table)
+        # None: smaller than one block, so not measurable from offsets
+        disk_bytes = compressed.get(qualified, 0)
+
+        total_rows += rows
+        total_dead += dead_rows
+        report_rows.append({
+            "table": qualified,
+            "rows": rows,
+            "dead_rows": dead_rows,
+            "compressed_bytes": disk_bytes,
+            "uncompressed_bytes": raw_bytes,
+            "compression_ratio": round(raw_bytes / disk_bytes, 2) if disk_bytes else None,
+        })
+
+    free_ratio = usage["free_blocks"] / usage["total_blocks"] if usage["total_blocks"] else 0.0
+    dead_ratio = total_dead / (total_rows + total_dead) if (total_rows + total_dead) else 0.0
+
+    return {
+        "tables": report_rows,
+        "file_bytes": usage["total_blocks"] * usage["block_size"],
+        "free_blocks": usage["free_blocks"],
+        "total_blocks": usage["total_blocks"],
+        "dead_row_ratio": round(dead_ratio, 3),
+        "fragmentation": round(max(free_ratio, dead_ratio), 3),
+    }
+
+
+def log_report(report: dict) -> None:
+    logger.info("%-36s %10s %10s %12s %12s %7s", "table", "rows", "dead", "compressed", "raw", "ratio")
+    for r in report["tables"]:
+        ratio = f"{r['compression_ratio']:.1f}x" if r["compression_ratio"] else "-"
+        disk = "n/a" if r["compressed_bytes"] is None else f"{r['compressed_bytes']:,}"
+        logger.info(
+            "%-36s %10s %10s %12s %12s %7s",
+            r["table"], f"{r['rows']:,}", f"{r['dead_rows']:,}",
+            disk, f"{r['uncompressed_bytes']:,}", ratio,
+        )
+    logger.info(
+        "File: %s bytes | free blocks %s/%s | dead rows %.1f%% | fragmentation %.1f%%",
+        f"{report['file_bytes']:,}", report["free_blocks"], report["total_blocks"],
+        report["dead_row_ratio"] * 100, report["fragmentation"] * 100,
+    )
+
+
+# Compaction
+def compact_into(con, target_path: Path) -> None:
+    """
+    Export every table (with constraints) into a fresh database file.
+    """
+    target_path = Path(target_path)
+    if target_path.exists():
+        target_path.unlink()
+
+    source = con.execute("SELECT current_database()").fetchone()[0]
+    # READ_WRITE: the source connection may be read-only (a published snapshot)
+    con.execute(f"ATTACH '{target_path}' AS compact_target (READ_WRITE)")
+    try:
+        con.execute(f'COPY FROM DATABASE "{source}" TO compact_target')
+        con.execute("CHECKPOINT compact_target")
+    finally:
+        con.execute("DETACH compact_target")
+
+
+def maintain(db_path: Path, threshold: float = DEFAULT_FRAGMENTATION_THRESHOLD,
+             force: bool = False, report_only: bool = False, in_build: bool = None) -> dict:
+    db_path = Path(db_path)
+    if not db_path.exists():
+        raise FileNotFoundError(f"Database not found: {db_path}")
+
+    # pipeline.py passes in_build explicitly; child scripts learn it from env
+    if in_build is None:
+        in_build = bool(os.environ.get(BUILD_DB_ENV))
+
+    # Inside a build the parent already holds the lock; standalone we
+    # publish a new version, so take it like any other writer (a report
+    # alone only reads)
+    with nullcontext() if in_build or report_only else build_lock():
+        return _maintain(db_path, threshold, force, report_only, in_build)
+
+
+def _maintain(db_path: Path, threshold: float, force: bool, report_only: bool, in_build: bool) -> dict:
+    # A published snapshot is never written: read it and compact into a new build
+    con = duckdb.connect(str(db_path), read_only=not in_build)
+    try:
+        if in_build:
+            con.execute("CHECKPOINT")
+        report = size_report(con)
+        log_report(report)
+
+        should_compact = force or report["fragmentation"] > threshold
+        if report_only or not should_compact:
+            logger.info("No compaction needed (threshold %.0f%%)", threshold * 100)
+            return report
+
+        # A private build file can be swapped in place; a published
+        # snapshot is never modified, so compact into a new version instead.
+        target = db_path.with_name(db_path.name + ".compact") if in_build else new_build_path()
+        logger.info("Compacting %s -> %s", db_path.name, target.name)
+        compact_into(con, target)
+    finally:
+        con.close()
+
+    before = os.path.getsize(db_path)
+    if in_build:
+        os.replace(target, db_path)
+        after = os.path.getsize(db_path)
+    else:
+        after = os.path.getsize(target)
+        publish(target)
+
+    logger.info("Compaction complete: %s -> %s bytes (%.0f%% smaller)",
+                f"{before:,}", f"{after:,}", (1 - after / before) * 100 if before else 0)
+    report["compacted_bytes"] = after
+    return report
+
+
+# CLI
+def parse_args():
+    p = argparse.ArgumentParser(description="Checkpoint, compact and report on the analytics database")
+    p.add_argument("--db", type=str, default=None, help="database path (defaults to the current build/snapshot)")
+    p.add_argument("--threshold", type=float, default=DEFAULT_FRAGMENTATION_THRESHOLD,
+                   help="compact when fragmentation exceeds this fraction")
+    p.add_argument("--force", action="store_true", help="always compact")
+    p.add_argument("--report-only", action="store_true", help="only print the size report")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    maintain(
+        Path(args.db) if args.db else build_db_path(),
+        threshold=args.threshold,
+        force=args.force,
+        report_only=args.report_only,
+    )
@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""
+pipeline.py
+-----------
+In-process DAG runner for the staging -> warehouse -> alerts pipeline.
+
+Every stage is a plain function call with declared dependencies instead of
+a `python script.py` subprocess, so interpreter startup and the pandas /
+duckdb imports are paid once. Steps whose dependencies are met run
+concurrently on a thread pool.
+
+Phases run in order (stage and build share one pass, so each build step
+starts as soon as its own stagers finish); within them the DAG decides:
+- stage:    raw -> staging files (no database)
+- build:    SQL into the private snapshot build, on one shared DuckDB
+            connection (each step gets its own cursor)
+- finalize: needs the build file closed (compaction), then publish()
+- report:   reads the freshly published snapshot (alerts)
+
+The build lock is taken, and the build file created, only when the first
+build step actually has to run, so stream ingest can keep publishing during
+staging and a run where nothing changed publishes nothing.
+
+Stage and build steps are cached by a hash of their code / SQL text, input
+files and upstream outputs (warehouse/step_cache.py); unchanged steps are
+skipped. --force ignores the cache.
+
+Every run checkpoints its completed steps and its build file
+(warehouse/checkpoint.py). Build steps commit one transaction each, so a
+failed build is kept as the completed steps left it; --resume continues the
+failed run from there instead of starting over.
+
+Usage:
+    python pipeline.py                                  # whole DAG
+    python pipeline.py --steps fact_vehicle_daily_metrics   # + upstream steps
+    python pipeline.py --steps stage_finance --no-deps      # exactly these
+    python pipeline.py --force                          # rerun every step
+    python pipeline.py --resume                         # continue the last failed run
+    python pipeline.py --list
+"""
+
+import argparse
+import logging
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import duckdb
+
+import build_analytics
+import maintain_warehouse
+import run_sql
+import stage_driver_health
+import stage_finance
+import stage_master_data
+import stage_vehicles
+from warehouse import live
+from warehouse.checkpoint import RunCheckpoint
+from warehouse.snapshots import begin_build, build_lock, current_version, discard, publish
+from warehouse.pipeline_telemetry import append_run, peak_rss_mb, trim_journal, write_tables
+from warehouse.step_cache import StepCache, digest_text, expand_paths
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+# Config
+DEFAULT_WORKERS = 4
+PHASES = ("stage", "build", "finalize", "report")
+# stage and build share one scheduler pass; the later phases are barriers
+PHASE_BARRIER = {"stage": 0, "build": 0, "finalize": 1, "report": 2}
+SQL_ROOT = Path("warehouse/sql")
+STAGED_FILE_PATTERN = re.compile(r"warehouse/staging/[\w.]+\.jsonl")
+
+
+@dataclass
+class StepContext:
+    """What a running step may touch. `con` is a cursor on the build database."""
+    con: Optional[duckdb.DuckDBPyConnection] = None
+    build_path: Optional[Path] = None
+
+
+@dataclass
+class Step:
+    """
+    One DAG node. `code`, `inputs` and `outputs` are files or directories
+    hashed for the step cache; finalize and report steps always run.
+    `run` may return row counts (rows_in / rows_out / rows_rejected), an int
+    of rows written or a result frame, which end up in pipeline telemetry.
+    """
+    name: str
+    run: Callable[[StepContext], Any]
+    deps: Tuple[str, ...] = ()
+    phase: str = "stage"
+    code: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+
+    @property
+    def cacheable(self) -> bool:
+        return self.phase in ("stage", "build")
+
+
+def sql_step(name: str, sql_file: str, deps: Iterable[str], fetch_results: bool = False) -> Step:
+    path = str(SQL_ROOT / sql_file)
+    # Staged files the SQL reads directly
+    staged = tuple(sorted(set(STAGED_FILE_PATTERN.findall(Path(path).read_text()))))
+    return Step(
+        name,
+        lambda ctx: run_sql.run_sql(path, fetch_results, con=ctx.con),
+        tuple(deps),
+        "build",
+        code=(path,),
+        inputs=staged,
+    )
+
+
+def stage_step(name: str, fn: Callable[[], None], module_file: str, inputs=(), outputs=()) -> Step:
+    return Step(
+        name,
+        lambda ctx: fn(),
+        code=(module_file, "simulator/jsonl_io.py"),
+        inputs=tuple(str(p) for p in inputs),
+        outputs=tuple(str(p) for p in outputs),
+    )
+
+
+def _run_alerts(ctx: StepContext) -> None:
+    # Imported late: only this step needs the alert / Slack modules
+    from run_alerts import run_alerts
+    run_alerts()
+
+
+# DAG
+STEPS: List[Step] = [
+    # Staging: independent of each other
+    Step(
+        "stage_master_data",
+        lambda ctx: stage_master_data.stage_dimensions(),
+        # The rosters live in simulator/common.py
+        code=("stage_master_data.py", "simulator/common.py"),
+        outputs=(str(stage_master_data.DIM_DRIVERS_PATH), str(stage_master_data.DIM_VEHICLES_PATH)),
+    ),
+    stage_step(
+        "stage_driver_health", stage_driver_health.stage_driver_health, "stage_driver_health.py",
+        inputs=[stage_driver_health.RAW_DRIVER_HEALTH_PATH],
+        outputs=[stage_driver_health.STAGED_OUT_PATH],
+    ),
+    stage_step(
+        "stage_driver_health_intraday", stage_driver_health.stage_driver_health_intraday, "stage_driver_health.py",
+        inputs=[stage_driver_health.RAW_INTRADAY_PATH],
+        outputs=[stage_driver_health.STAGED_INTRADAY_PATH],
+    ),
+    stage_step(
+        "stage_vehicles", stage_vehicles.stage_vehicles, "stage_vehicles.py",
+        inputs=[stage_vehicles.RAW_VEHICLES_PATH],
+        outputs=[stage_vehicles.STAGED_OUT_PATH],
+    ),
+    stage_step(
+        "stage_finance", stage_finance.stage_finance, "stage_finance.py",
+        inputs=[stage_finance.RAW_FINANCE_PATH],
+        outputs=[stage_finance.STAGED_DAILY_PATH, stage_finance.STAGED_TRIPS_PATH],
+    ),
+
+    # Warehouse build. Schema and reference data need no staged input,
+    # so they run (or are skipped) alongside staging
+    sql_step("schema", "schema.sql", []),
+    Step(
+        "build_analytics",
+        lambda ctx: build_analytics.build_gold_layer(con=ctx.con),
+        ("schema", "stage_master_data", "stage_driver_health", "stage_vehicles", "stage_finance"),
+        "build",
+        code=("build_analytics.py",),
+        inputs=(
+            str(stage_driver_health.STAGED_OUT_PATH),
+            str(stage_vehicles.STAGED_OUT_PATH),
+            str(stage_finance.STAGED_DAILY_PATH),
+            str(stage_master_data.DIM_DRIVERS_PATH),
+        ),
+    ),
+    sql_step("alert_thresholds", "seed/alert_thresholds.sql", ["schema"]),
+    sql_step("dim_date", "dimensions/dim_date.sql", ["schema"]),
+    sql_step("fact_vehicle_telemetry", "facts/fact_vehicle_telemetry.sql", ["build_analytics"]),
+    sql_step("fact_driver_shifts", "facts/fact_driver_shifts.sql", ["build_analytics"]),
+    sql_step("fact_driver_health_minute", "facts/fact_driver_health_minute.sql",
+             ["schema", "stage_driver_health_intraday"]),
+    # Writes fact_driver_shifts too, so it waits for the daily load
+    sql_step("fact_driver_shift_rollup", "facts/fact_driver_shift_rollup.sql",
+             ["fact_driver_health_minute", "fact_driver_shifts"]),
+    sql_step("fact_daily_finance", "facts/fact_daily_finance.sql", ["build_analytics"]),
+    # Rows the stream writers appended since their last publish (warehouse/live.py)
+    Step(
+        "merge_live",
+        lambda ctx: live.merge_live(ctx.con),
+        # After every other writer of these tables
+        ("fact_vehicle_telemetry", "fact_driver_shift_rollup", "fact_daily_finance"),
+        "build",
+        code=("warehouse/live.py",),
+        inputs=(str(live.LIVE_DB_PATH), str(live.LIVE_DB_PATH) + ".wal"),
+    ),
+    sql_step("dim_driver", "dimensions/dim_driver.sql", ["fact_driver_shift_rollup", "build_analytics", "merge_live"]),
+    sql_step("dim_vehicle", "dimensions/dim_vehicle.sql", ["fact_vehicle_telemetry", "build_analytics", "merge_live"]),
+    sql_step("fact_driver_daily_metrics", "facts/fact_driver_daily_metrics.sql",
+             ["dim_driver", "fact_daily_finance", "fact_vehicle_telemetry", "fact_driver_shift_rollup", "merge_live"]),
+    sql_step("fact_vehicle_daily_metrics", "facts/fact_vehicle_daily_metrics.sql",
+             ["alert_thresholds", "fact_vehicle_telemetry", "merge_live"]),
+    sql_step("entity_baselines", "facts/entity_baselines.sql",
+             ["fact_driver_daily_metrics", "fact_vehicle_daily_metrics"]),
+    sql_step("dq_nulls", "quality/dq_nulls.sql", ["fact_driver_daily_metrics"], fetch_results=True),
+    sql_step("dq_ranges", "quality/dq_ranges.sql", ["fact_driver_daily_metrics"], fetch_results=True),
+
+    # Compacts in place, so it runs on the closed build file
+    Step(
+        "maintain_warehouse",
+        lambda ctx: maintain_warehouse.maintain(ctx.build_path, in_build=True),
+        ("build_analytics",),
+        "finalize",
+    ),
+
+    # Alerts read the published snapshot
+    Step("run_alerts", _run_alerts, ("fact_driver_daily_metrics", "fact_vehicle_daily_metrics", "entity_baselines"),
+         "report"),
+]
+
+STEPS_BY_NAME: Dict[str, Step] = {s.name: s for s in STEPS}
+
+
+# Selection
+def select_steps(names: Optional[Iterable[str]] = None, with_deps: bool = True) -> List[str]:
+    """
+    Step names to run, in declaration (topological) order.
+    None selects the whole DAG; otherwise the named steps plus, unless
+    `with_deps` is False, everything upstream of them.
+    """
+    if names is None:
+        return [s.name for s in STEPS]
+
+    unknown = [n for n in names if n not in STEPS_BY_NAME]
+    if unknown:
+        raise ValueError(f"Unknown pipeline step(s): {', '.join(unknown)}")
+
+    selected = set(names)
+    if with_deps:
+        frontier = list(selected)
+        while frontier:
+            for dep in STEPS_BY_NAME[frontier.pop()].deps:
+                if dep not in selected:
+                    selected.add(dep)
+                    frontier.append(dep)
+
+    return [s.name for s in STEPS if s.name in selected]
+
+
+# Reporting
+def utc_now() -> str:
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def critical_path(durations: Dict[str, float]) -> Tuple[float, List[str]]:
+    """
+    Longest dependency chain through the steps that ran.
+    A step after a phase barrier also waits on everything before it.
+    """
+    finish: Dict[str, float] = {}
+    via: Dict[str, Optional[str]] = {}
+
+    for step in STEPS:  # declaration order is topological
+        name = step.name
+        if name not in durations:
+            continue
+        barrier = PHASE_BARRIER[step.phase]
+        upstream = [d for d in step.deps if d in finish]
+        upstream += [n for n in finish if PHASE_BARRIER[STEPS_BY_NAME[n].phase] < barrier]
+        before = max(upstream, key=finish.get, default=None)
+        finish[name] = durations[name] + (finish[before] if before else 0.0)
+        via[name] = before
+
+    if not finish:
+        return 0.0, []
+
+    node = max(finish, key=finish.get)
+    total = finish[node]
+    path = []
+    while node:
+        path.append(node)
+        node = via[node]
+    return total, path[::-1]
+
+
+def log_summary(durations: Dict[str, float], wall: float) -> None:
+    total, path = critical_path(durations)
+    busy = sum(durations.values())
+    logger.info("Step timings:")
+    for name, secs in sorted(durations.items(), key=lambda kv: -kv[1]):
+        logger.info("  %-30s %7.2fs%s", name, secs, "  *" if name in path else "")
+    logger.info(
+        "Wall %.2fs | step time %.2fs | critical path %.2fs: %s",
+        wall, busy, total, " -> ".join(path),
+    )
+
+
+# Runner
+class PipelineRunner:
+    """
+    Runs a selection of STEPS. Holds the build lock and the shared build
+    connection from the first build step that has to run until publish().
+    With `resume`, steps the last unfinished run completed are not redone.
+    """
+
+    def __init__(self, names: List[str], workers: int = DEFAULT_WORKERS, force: bool = False,
+                 resume: bool = False):
+        self.names = names
+        self.workers = max(1, workers)
+        self.force = force
+        self.resume = resume
+        self.cache = StepCache()
+        self.durations: Dict[str, float] = {}
+        self.skipped: List[str] = []
+        self.completed = set()
+        # Output hash per step this run; downstream keys are built from them
+        self.outputs: Dict[str, str] = {}
+        # Build-step cache entries, committed only once the build is published
+        self.build_entries: Dict[str, Tuple[str, str, Optional[str]]] = {}
+        self.build_path: Optional[Path] = None
+        self.seed_version: Optional[str] = None
+        self.con: Optional[duckdb.DuckDBPyConnection] = None
+        self.stack: Optional[ExitStack] = None
+        self.build_guard = threading.Lock()
+        # Telemetry rows (see warehouse/pipeline_telemetry.py)
+        self.run_id = "run_" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self.started_at = utc_now()
+        self.step_rows: List[Dict] = []
+        self.journaled: Set[str] = set()
+        # Resume: the unfinished run's checkpoint, and seconds it spent on each reused step
+        self.checkpoint = RunCheckpoint(self.run_id, self.started_at, names)
+        self.prior: Optional[RunCheckpoint] = None
+        self.resumed: Dict[str, float] = {}
+        self.resumed_build = False
+
+    # Build lifecycle
+    def _open_build(self, resume_from: Optional[RunCheckpoint] = None) -> None:
+        with self.build_guard:
+            if self.con is not None:
+                return
+            self.stack.enter_context(build_lock())
+            self.seed_version = current_version()
+            if resume_from is not None and resume_from.seed_version == self.seed_version:
+                self.build_path = Path(resume_from.build_path)
+                self.resumed_build = True
+                logger.info("Reusing build %s of run %s", self.build_path.name, resume_from.run_id)
+            else:
+                if resume_from is not None:
+                    logger.warning("A snapshot was published since run %s; its build is dropped", resume_from.run_id)
+                    discard(Path(resume_from.build_path))
+                self.build_path = begin_build()
+            self.con = duckdb.connect(str(self.build_path))
+        self.checkpoint.set_build(self.build_path, self.seed_version)
+
+    def _close_build(self) -> None:
+        if self.con is not None:
+            self.con.close()
+            self.con = None
+
+    def _commit_build_entries(self) -> None:
+        """Point build-step cache entries at the snapshot just published."""
+        for name, (key, output, checked) in self.build_entries.items():
+            if checked in (None, self.seed_version):
+                self.cache.record(name, key, output, snapshot=self.build_path.name)
+            else:
+                # Validated against a snapshot this build was not seeded from
+                self.cache.forget([name])
+
+    # Resume
+    def _load_checkpoint(self) -> None:
+        """Pick up the unfinished run's checkpoint with --resume; otherwise drop its build."""
+        prior = RunCheckpoint.load()
+        if prior is None:
+            if self.resume:
+                logger.info("No unfinished run to resume; running everything")
+            return
+
+        build = Path(prior.build_path) if prior.build_path else None
+        unpublished = build is not None and not prior.published and build.exists()
+        if not self.resume:
+            logger.warning("Run %s did not finish; starting over (--resume continues it)", prior.run_id)
+            if unpublished and build.name != current_version():
+                discard(build)
+            return
+
+        self.prior = prior
+        logger.info("Resuming run %s: %s step(s) completed", prior.run_id, len(prior.steps))
+        if unpublished:
+            self._open_build(resume_from=prior)
+
+    def _resumable(self, step: Step, key: Optional[str]) -> Optional[Dict]:
+        """The checkpoint entry when the resumed run completed `step` and it still holds."""
+        if self.prior is None:
+            return None
+        entry = self.prior.steps.get(step.name)
+        if entry is None or entry["key"] != key:
+            return None
+        if step.phase == "stage":
+            holds = self.cache.fingerprint(step.outputs) == entry["output"]
+        elif self.prior.published:
+            holds = current_version() == Path(self.prior.build_path).name
+        else:
+            # Build / finalize work lives in the reused build file
+            holds = self.resumed_build
+        return entry if holds else None
+
+    # Cache
+    def _step_key(self, step: Step) -> str:
+        upstream = []
+        for dep in step.deps:
+            output = self.outputs.get(dep)
+            if output is None:
+                # Not part of this run (--no-deps): use its last recorded output
+                entry = self.cache.get(dep)
+                output = entry["output"] if entry else ""
+            upstream.append(f"{dep}={output}")
+        return digest_text(
+            step.name,
+            self.cache.fingerprint(step.code),
+            self.cache.fingerprint(step.inputs),
+            *upstream,
+        )
+
+    def _cached_output(self, step: Step, key: str) -> Optional[str]:
+        """The recorded output hash when `step` can be skipped, else None."""
+        entry = self.cache.get(step.name)
+        if self.force or entry is None or entry["key"] != key:
+            return None
+        if step.phase == "stage":
+            if self.cache.fingerprint(step.outputs) != entry["output"]:
+                return None
+        elif entry["snapshot"] != current_version():
+            return None
+        return entry["output"]
+
+    # Telemetry
+    def _record_step(self, step: Step, started_at: str, status: str, duration: float = 0.0,
+                     result: Any = None, error: Optional[BaseException] = None) -> None:
+        row = {
+            "run_id": self.run_id,
+            "step_name": step.name,
+            "phase": step.phase,
+            "started_at": started_at,
+            "duration_s": round(duration, 4),
+            "status": status,
+            "rows_in": None,
+            "rows_out": None,
+            "rows_rejected": None,
+            "bytes_read": None,
+            "peak_rss_mb": peak_rss_mb(),
+            "error": None if error is None else str(error),
+        }
+        if status != "skipped":
+            row["bytes_read"] = sum(f.stat().st_size for f in expand_paths(step.inputs)) if step.inputs else None
+        if isinstance(result, dict):
+            row.update({k: v for k, v in result.items() if k in ("rows_in", "rows_out", "rows_rejected")})
+        elif hasattr(result, "columns"):  # DataFrame from a fetch_results step
+            row["rows_out"] = len(result)
+        elif isinstance(result, int):
+            row["rows_out"] = result
+        self.step_rows.append(row)
+
+    def _run_row(self, status: str, error: Optional[BaseException] = None) -> Dict:
+        finished = status != "running"
+        total, _ = critical_path(self.durations)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "finished_at": utc_now() if finished else None,
+            "duration_s": round(time.perf_counter() - self.t0, 4) if finished else None,
+            "status": status,
+            "steps_run": len(self.durations),
+            "steps_skipped": len(self.skipped) + len(self.resumed),
+            "critical_path_s": round(total, 4),
+            "snapshot": self.build_path.name if self.build_path else current_version(),
+            "error": None if error is None else str(error),
+            "resumed_from": self.prior.run_id if self.prior else None,
+            "resume_saved_s": round(sum(self.resumed.values()), 4) if self.prior else None,
+        }
+
+    # Execution
+    def _execute(self, step: Step) -> None:
+        started_at = utc_now()
+        key = self._step_key(step) if step.cacheable else None
+
+        resumed = self._resumable(step, key)
+        if resumed is not None:
+            if resumed["output"] is not None:
+                self.outputs[step.name] = resumed["output"]
+            if step.phase == "build" and not self.prior.published:
+                self.build_entries[step.name] = (key, resumed["output"], None)
+            self.resumed[step.name] = resumed["duration_s"]
+            self.checkpoint.record_step(step.name, step.phase, resumed["duration_s"], key, resumed["output"])
+            self._record_step(step, started_at, "resumed")
+            logger.info("Step %s completed in run %s, skipped", step.name, self.prior.run_id)
+            return
+
+        if key is not None:
+            cached = self._cached_output(step, key)
+            if cached is not None:
+                self.outputs[step.name] = cached
+                self.skipped.append(step.name)
+                if step.phase == "build":
+                    self.build_entries[step.name] = (key, cached, current_version())
+                self.checkpoint.record_step(step.name, step.phase, 0.0, key, cached)
+                self._record_step(step, started_at, "skipped")
+                logger.info("Step %s unchanged, skipped", step.name)
+                return
+
+        if step.phase == "build":
+            self._open_build()
+
+        cursor = self.con.cursor() if step.phase == "build" else None
+        start = time.perf_counter()
+        try:
+            if cursor is not None:
+                # One transaction per build step: a failure leaves the build as the completed steps made it
+                cursor.begin()
+            result = step.run(StepContext(con=cursor, build_path=self.build_path))
+            if cursor is not None:
+                cursor.commit()
+        except Exception as e:
+            if cursor is not None:
+                cursor.rollback()
+            self._record_step(step, started_at, "failed", time.perf_counter() - start, error=e)
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+        self.durations[step.name] = time.perf_counter() - start
+        self._record_step(step, started_at, "success", self.durations[step.name], result)
+        logger.info("Step %s finished in %.2fs", step.name, self.durations[step.name])
+
+        output = None
+        if step.phase == "stage":
+            output = self.cache.fingerprint(step.outputs)
+            self.cache.record(step.name, key, output)
+        elif step.phase == "build":
+            # Tables are not hashed; the key stands in for what was loaded
+            output = key
+            self.build_entries[step.name] = (key, output, None)
+        if output is not None:
+            self.outputs[step.name] = output
+        self.checkpoint.record_step(step.name, step.phase, self.durations[step.name], key, output)
+
+    def _run_phase(self, names: List[str]) -> None:
+        """Run one phase's steps as their dependencies complete."""
+        pending = list(names)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                ready = [
+                    n for n in pending
+                    if all(d in self.completed or d not in self.names for d in STEPS_BY_NAME[n].deps)
+                ]
+                for name in ready:
+                    pending.remove(name)
+                    logger.info("--- Running %s ---", name)
+                    running[pool.submit(self._execute, STEPS_BY_NAME[name])] = name
+
+                if not running:
+                    raise RuntimeError(f"Unsatisfiable dependencies for: {', '.join(pending)}")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                failed = None
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        failed = failed or (name, future.exception())
+                    else:
+                        self.completed.add(name)
+
+                if failed:
+                    # Let in-flight steps finish, start nothing new
+                    wait(running)
+                    name, error = failed
+                    raise RuntimeError(f"Step {name} failed: {error}") from error
+
+    def run(self) -> bool:
+        self.t0 = t0 = time.perf_counter()
+        by_phase = {p: [n for n in self.names if STEPS_BY_NAME[n].phase == p] for p in PHASES}
+        status, error = "failed", None
+
+        try:
+            with ExitStack() as self.stack:
+                self._load_checkpoint()
+                try:
+                    self._run_phase(by_phase["stage"] + by_phase["build"])
+                    if self.con is not None:
+                        # Published snapshots are read-only, so history goes in now
+                        self.journaled = write_tables(self.con, self._run_row("running"), self.step_rows)
+                    self._close_build()
+
+                    if by_phase["finalize"]:
+                        if not by_phase["build"]:
+                            # Finalize alone still works on a fresh private build
+                            self._open_build()
+                            self._close_build()
+                        if self.build_path is not None:
+                            self._run_phase(by_phase["finalize"])
+                        else:
+                            logger.info("Nothing was rebuilt; skipping %s", ", ".join(by_phase["finalize"]))
+                except Exception:
+                    self._close_build()
+                    if self.build_path is not None:
+                        # Left unpublished for --resume; the next run without it removes it
+                        logger.error("Warehouse build failed. Keeping the previous snapshot live; "
+                                     "build %s is kept for --resume.", self.build_path.name)
+                    raise
+
+                if self.build_path is not None:
+                    self.build_path = publish(self.build_path)
+                    self.checkpoint.mark_published()
+                    # The published snapshot now holds these runs; the journal need not
+                    trim_journal(self.journaled)
+                    self._commit_build_entries()
+                    if "merge_live" in self.durations or "merge_live" in self.resumed:
+                        # Still under the build lock, so no writer publish interleaves
+                        live.clear_merged()
+
+            self._run_phase(by_phase["report"])
+            status = "success"
+            self.checkpoint.clear()
+        except Exception as e:
+            error = e
+            logger.error("Pipeline failed: %s", e)
+            logger.info("Completed steps are checkpointed; rerun with --resume to continue")
+            log_summary(self.durations, time.perf_counter() - t0)
+            return False
+        finally:
+            self.cache.save()
+            append_run(self._run_row(status, error), self.step_rows)
+            if self.resumed:
+                logger.info("Resume saved %.2fs: %s step(s) of run %s not redone",
+                            sum(self.resumed.values()), len(self.resumed), self.prior.run_id)
+
+        if self.skipped:
+            logger.info("Skipped %s unchanged step(s): %s", len(self.skipped), ", ".join(self.skipped))
+        log_summary(self.durations, time.perf_counter() - t0)
+        return True
+
+
+def run_pipeline(steps: Optional[Iterable[str]] = None, with_deps: bool = True,
+                 workers: int = DEFAULT_WORKERS, force: bool = False, resume: bool = False) -> bool:
+    """Run the DAG (or a selection of it) in-process. Returns True on success."""
+    names = select_steps(None if steps is None else list(steps), with_deps)
+    logger.info("Running %s pipeline step(s) with %s worker(s)", len(names), workers)
+    return PipelineRunner(names, workers, force, resume).run()
+
+
+# CLI
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Run the FleetIntel360 pipeline DAG in-process")
+    p.add_argument("--steps", nargs="+", default=None, metavar="STEP", help="run these steps (default: all)")
+    p.add_argument("--no-deps", action="store_true", help="do not add upstream steps to --steps")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="steps run concurrently")
+    p.add_argument("--force", action="store_true", help="ignore the step cache and rerun every step")
+    p.add_argument("--resume", action="store_true", help="continue the last unfinished run from its checkpoint")
+    p.add_argument("--list", action="store_true", help="print the DAG and exit")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.list:
+        for step in STEPS:
+            deps = ", ".join(step.deps) or "-"
+            print(f"{step.phase:<9} {step.name:<30} <- {deps}")
+        return 0
+
+    ok = run_pipeline(args.steps, with_deps=not args.no_deps, workers=args.workers, force=args.force,
+                      resume=args.resume)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
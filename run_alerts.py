@@ -1,77 +1,159 @@
 import duckdb
-import requests
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
 import os
 
-from slack_formatter import format_alert
+from slack_formatter import INLINE_CSV_CHARS, digest_csv, format_digest
+from warehouse.snapshots import ANALYTICS_DIR, current_db_path
 
-# CLOUD-AWARE ENVIRONMENT LOADING
-# 1. Try to get from system environment (GitHub Actions / Docker)
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+# Alerts always read the published snapshot (resolved in run_alerts)
 
-# 2. Fallback to .env for local development
-if not SLACK_WEBHOOK_URL:
-    load_dotenv(Path(__file__).parent / ".env")
-    SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 
-# 3. Validation
-if not SLACK_WEBHOOK_URL:
-    print("ERROR: SLACK_WEBHOOK_URL not found. Check GitHub Secrets or local .env")
-else:
-    print("Slack Webhook URL loaded successfully")
+@lru_cache(maxsize=None)
+def slack_webhook_url():
+    """Slack webhook, looked up on first send rather than at import."""
+    # CLOUD-AWARE ENVIRONMENT LOADING
+    # 1. Try to get from system environment (GitHub Actions / Docker)
+    url = os.getenv("SLACK_WEBHOOK_URL")
 
-# Change path to be relative to the root for GitHub Actions compatibility
-DB_PATH = os.path.join(os.getcwd(), "warehouse/analytics/analytics.duckdb")
+    # 2. Fallback to .env for local development
+    if not url:
+        from dotenv import load_dotenv
 
+        load_dotenv(Path(__file__).parent / ".env")
+        url = os.getenv("SLACK_WEBHOOK_URL")
+
+    # 3. Validation
+    if not url:
+        print("ERROR: SLACK_WEBHOOK_URL not found. Check GitHub Secrets or local .env")
+    else:
+        print("Slack Webhook URL loaded successfully")
+    return url
+
+
+def send_to_slack(payloads):
+    """
+    Delivers the formatted payloads, in order, through the rate-limited
+    queue in slack_delivery; failures end up in its dead-letter file.
+    """
+    url = slack_webhook_url()
+    if not url:
+        print(f"Not sending {len(payloads)} message(s): no Slack webhook configured")
+        return
+
+    from slack_delivery import deliver
+
+    # One sender: the pages of a digest must arrive in order
+    stats = deliver(payloads, url, workers=1)
+    print(f"Slack delivery: {stats['sent']} sent, {stats['retried']} retried, "
+          f"{stats['dead_lettered']} dead-lettered")
+
+
+def attach_csv(path: Path) -> bool:
+    """Uploads the digest CSV when a bot token and channel are configured."""
+    token, channel = os.getenv("SLACK_BOT_TOKEN"), os.getenv("SLACK_CHANNEL_ID")
+    if not (token and channel):
+        return False
+
+    from slack_delivery import upload_file
 
-def send_to_slack(payload):
-    """Sends the formatted JSON payload to the Slack Webhook."""
     try:
-        response = requests.post(SLACK_WEBHOOK_URL, json=payload)
-        response.raise_for_status()
+        upload_file(path, token, channel, title=path.name)
     except Exception as e:
-        print(f"Failed to send alert: {e}")
+        print(f"Failed to attach {path.name}: {e}")
+        return False
+    return True
 
 
-# Connect to DuckDB
-con = duckdb.connect(DB_PATH)
+# Full CSV of every digest, kept locally
+DIGEST_DIR = ANALYTICS_DIR / "alert_digests"
 
 ALERT_SQL_FILES = [
     "warehouse/sql/alerts/driver_fatigue_alerts.sql",
     "warehouse/sql/alerts/alert_vehicle_risk.sql",
     "warehouse/sql/alerts/alert_fraud.sql",
     "warehouse/sql/alerts/alert_data_freshness.sql",
+    "warehouse/sql/alerts/alert_baseline_anomaly.sql",
 ]
 
-print(f"Checking {len(ALERT_SQL_FILES)} alert queries...")
-
-for sql_file in ALERT_SQL_FILES:
-    if not os.path.exists(sql_file):
-        print(f"Warning: SQL file not found: {sql_file}")
-        continue
+# Columns every alert query returns (plus the rule, added here)
+ALERT_COLUMNS = [
+    "rule", "entity_id", "entity_type", "metric_name", "metric_value", "severity", "description",
+]
 
-    sql = Path(sql_file).read_text()
-    df = con.execute(sql).df()
 
-    if df.empty:
-        print(f"No results for: {os.path.basename(sql_file)}")
-        continue
+def run_alerts(db_path: str = None, cooldown_hours: float = None):
+    """
+    Evaluate every alert query against the published snapshot and post the
+    hits not suppressed by the alert state (cooldown unless severity rises).
+    """
+    import pandas as pd
 
-    print(f"ALERT FOUND in {os.path.basename(sql_file)}: Sending to Slack...")
-    
-    payload = format_alert(
-        title="🚨 Fleet Alert",
-        rows=df,
-        severity_column="severity",
-        entity_column="entity_id"
-    )
+    from warehouse.alert_state import AlertStateStore
 
-    # Slack safety limit (max 50 blocks allowed)
-    if "blocks" in payload and len(payload["blocks"]) > 45:
-        payload["blocks"] = payload["blocks"][:45]
+    # Resolved per call: an in-process pipeline publishes just before this
+    # Read-only: alerts never write, and readers such as the dashboard may hold the file
+    con = duckdb.connect(db_path or os.path.join(os.getcwd(), current_db_path()), read_only=True)
 
-    send_to_slack(payload)
+    print(f"Checking {len(ALERT_SQL_FILES)} alert queries...")
 
-con.close()
-print("Alerts run complete.")
\ No newline at end of file
+    results, evaluated = [], []
+    try:
+        for sql_file in ALERT_SQL_FILES:
+            if not os.path.exists(sql_file):
+                print(f"Warning: SQL file not found: {sql_file}")
+                continue
+
+            sql = Path(sql_file).read_text()
+            df = con.execute(sql).df()
+            rule = Path(sql_file).stem
+            evaluated.append(rule)
+
+            if df.empty:
+                print(f"No results for: {os.path.basename(sql_file)}")
+                continue
+
+            print(f"ALERT FOUND in {os.path.basename(sql_file)}: {len(df)} hit(s)")
+            results.append(df.assign(rule=rule))
+    finally:
+        con.close()
+
+    # One batched lookup against the state for the whole run
+    hits = pd.concat(results, ignore_index=True) if results else pd.DataFrame(columns=ALERT_COLUMNS)
+    # Nothing is recorded as sent when there is nowhere to send it
+    to_send = AlertStateStore(cooldown_hours=cooldown_hours).filter(
+        hits, evaluated, record=bool(slack_webhook_url())
+    )
+    print(f"{len(to_send)} of {len(hits)} hit(s) new, escalated or past cooldown")
+
+    if to_send.empty:
+        print("Alerts run complete.")
+        return
+
+    # One digest for the whole run, paged within Slack's block limit
+    csv_text = digest_csv(to_send)
+    DIGEST_DIR.mkdir(parents=True, exist_ok=True)
+    csv_path = DIGEST_DIR / f"alerts_{datetime.now():%Y%m%dT%H%M%S}.csv"
+    csv_path.write_text(csv_text)
+
+    note = None
+    large = len(csv_text) > INLINE_CSV_CHARS
+    can_attach = bool(os.getenv("SLACK_BOT_TOKEN") and os.getenv("SLACK_CHANNEL_ID"))
+    if large:
+        note = (
+            f"_Full list ({len(to_send)} rows) attached below as `{csv_path.name}`_" if can_attach
+            else f"_Full list ({len(to_send)} rows) saved as `{csv_path.name}`_"
+        )
+
+    payloads = format_digest("🚨 Fleet Alert Digest", to_send, csv_text=csv_text, csv_note=note)
+    print(f"Digest: {len(to_send)} alert(s) in {len(payloads)} message(s), CSV at {csv_path}")
+    send_to_slack(payloads)
+    if large and slack_webhook_url():
+        attach_csv(csv_path)
+
+    print("Alerts run complete.")
+
+
+if __name__ == "__main__":
+    run_alerts()
@@ -1,45 +1,118 @@
 # run_daily_ops.py
-import subprocess
 import logging
 import argparse
-from datetime import date
-import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from pipeline import run_pipeline
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
 logger = logging.getLogger(__name__)
 
+# Backfills are reproducible by default; pass --seed to vary them
+DEFAULT_BACKFILL_SEED = 0
+DEFAULT_TELEMETRY_PER_DAY = 180
+
+
+def run_daily(target_date, resume=False):
+    logger.info(f"Starting FleetIntel360 Daily Operations for {target_date}")
+
+    from simulator.run_simulation import run_batch
+
+    # STEP 1: Run Simulation (in-process; same defaults as the CLI)
+    if resume:
+        # The failed run already generated the day; appending again would duplicate it
+        logger.info("Step 1/2: Skipped (resuming the failed run's pipeline)")
+    else:
+        logger.info(f"Step 1/2: Generating Daily Raw Data for {target_date}...")
+        run_batch(
+            start_date=date.fromisoformat(target_date),
+            days=1,
+            telemetry_per_day=DEFAULT_TELEMETRY_PER_DAY,
+            overwrite=False,
+        )
+
+    # STEP 2: Run the full staging pipeline (pipeline.py DAG)
+    logger.info("Step 2/2: Executing Staging Pipeline & Analytics Refresh...")
+    if not run_pipeline(resume=resume):
+        logger.error("Daily Operations Failed: pipeline did not complete")
+        return False
+
+    logger.info(f"Operations complete. Dashboard and Alerts updated for {target_date}.")
+    return True
+
+
+def generate_day(day: date, seed: int, telemetry_per_day: int) -> str:
+    """
+    Worker: simulate one day in-process.
+    Each day is seeded on its own, so output doesn't depend on scheduling.
+    """
+    from simulator.run_simulation import run_batch
+
+    run_batch(
+        start_date=day,
+        days=1,
+        telemetry_per_day=telemetry_per_day,
+        overwrite=True,  # re-running a backfill replaces the day instead of appending
+        seed=seed,
+    )
+    return str(day)
+
+
+def run_backfill(start: date, end: date, seed: int, workers: int, telemetry_per_day: int, resume: bool = False):
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    logger.info(f"Starting backfill for {len(days)} day(s): {start} -> {end} (seed={seed}, workers={workers or 'auto'})")
+
+    t0 = time.perf_counter()
+
+    # STEP 1: Generate every day in parallel
+    logger.info(f"Step 1/2: Generating {len(days)} day(s) of raw data in parallel...")
+    with ProcessPoolExecutor(max_workers=workers or None) as pool:
+        for finished in pool.map(generate_day, days, [seed] * len(days), [telemetry_per_day] * len(days)):
+            logger.info(f"Generated {finished}")
+    t_generate = time.perf_counter() - t0
+
+    # STEP 2: Stage all days in one batch and build the warehouse once
+    logger.info("Step 2/2: Executing Staging Pipeline & Analytics Refresh (single build)...")
+    if not run_pipeline(resume=resume):
+        logger.error("Backfill Failed: pipeline did not complete")
+        return False
+    t_total = time.perf_counter() - t0
+
+    minutes = t_total / 60
+    logger.info(
+        f"Backfill complete: {len(days)} day(s) in {t_total:.1f}s "
+        f"(generate {t_generate:.1f}s, stage+build {t_total - t_generate:.1f}s) "
+        f"-> {len(days) / minutes if minutes else float('inf'):.1f} days/minute"
+    )
+    return True
+
+
 def main():
     # Setup argument parsing
     parser = argparse.ArgumentParser()
     # keep orchestrator's flag as --date for simplicity
     parser.add_argument("--date", type=str, help="Date in YYYY-MM-DD format", default=str(date.today()))
+    parser.add_argument("--start", type=str, help="Backfill start date (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--end", type=str, help="Backfill end date (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_BACKFILL_SEED, help="Base seed for backfill days")
+    parser.add_argument("--workers", type=int, default=0, help="Parallel generator processes (0 = CPU count)")
+    parser.add_argument("--telemetry-per-day", type=int, default=DEFAULT_TELEMETRY_PER_DAY)
+    parser.add_argument("--resume", action="store_true", help="continue the last failed pipeline run from its checkpoint")
     args = parser.parse_args()
 
-    target_date = args.date
-    logger.info(f"Starting FleetIntel360 Daily Operations for {target_date}")
-
-    try:
-        # STEP 1: Run Simulation 
-        # FIXED: Changed --date to --start-date and added --days 1
-        logger.info(f"Step 1/2: Generating Daily Raw Data for {target_date}...")
-        subprocess.run([
-            "python", "-m", "simulator.run_simulation", 
-            "--start-date", target_date,  # Matches the simulator's requirements
-            "--days", "1"
-        ], check=True)
-
-        # STEP 2: Run the full staging pipeline
-        logger.info("Step 2/2: Executing Staging Pipeline & Analytics Refresh...")
-        subprocess.run(
-            ["python", "run_staging.py"], 
-            check=True, 
-            env=os.environ.copy() # Add this line here too!
-        )
-
-        logger.info(f"Operations complete. Dashboard and Alerts updated for {target_date}.")
-        
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Daily Operations Failed: {e}")
+    if args.start or args.end:
+        if not (args.start and args.end):
+            parser.error("--start and --end must be used together")
+        start, end = date.fromisoformat(args.start), date.fromisoformat(args.end)
+        if end < start:
+            parser.error("--end must not be before --start")
+        ok = run_backfill(start, end, args.seed, args.workers, args.telemetry_per_day, args.resume)
+    else:
+        ok = run_daily(args.date, args.resume)
+    # Non-zero on failure, so CI stops before committing anything
+    return 0 if ok else 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    raise SystemExit(main())
@@ -1,9 +1,25 @@
 import duckdb
+import os
 from pathlib import Path
 
-DB_PATH = "warehouse/analytics/analytics.duckdb"
+from warehouse.snapshots import BUILD_DB_ENV, build_db_path, standalone_build
 
-def run_sql(sql_file: str, fetch_results: bool = False):
+DB_PATH = str(build_db_path())
+
+# Statements whose Count result is "rows written"
+WRITE_STATEMENTS = {
+    duckdb.StatementType.INSERT,
+    duckdb.StatementType.UPDATE,
+    duckdb.StatementType.MERGE_INTO,
+}
+
+def run_sql(sql_file: str, fetch_results: bool = False, con=None):
+    """
+    Execute one SQL file. Pass `con` to run on a shared connection
+    (left open); otherwise DB_PATH, which must be a build in progress, is
+    opened for this file only.
+    Returns the result frame with fetch_results, else rows written.
+    """
     sql_path = Path(sql_file)
 
     if not sql_path.exists():
@@ -11,7 +27,12 @@ def run_sql(sql_file: str, fetch_results: bool = False):
 
     print(f"\n Running: {sql_path}")
 
-    con = duckdb.connect(DB_PATH)
+    owns_connection = con is None
+    if owns_connection:
+        if not os.environ.get(BUILD_DB_ENV):
+            # Outside a build DB_PATH is the published snapshot, which is never written
+            raise RuntimeError("run_sql() needs `con` or a build in progress (see standalone_build)")
+        con = duckdb.connect(DB_PATH)
     sql = sql_path.read_text()
 
     try:
@@ -21,39 +42,51 @@ def run_sql(sql_file: str, fetch_results: bool = False):
             print(result)
             return result
         else:
-            # con.execute(sql)
-            # print("Success")
-            con.sql(sql) 
-            print("Success")
+            # One statement at a time so DML row counts can be reported
+            rows = 0
+            for statement in duckdb.extract_statements(sql):
+                result = con.execute(statement)
+                if statement.type in WRITE_STATEMENTS:
+                    rows += result.fetchone()[0]
+            print(f"Success ({rows} rows written)")
+            return rows
     except Exception as e:
         print("Failed")
         raise e
     finally:
-        con.close()
+        if owns_connection:
+            con.close()
 
 if __name__ == "__main__":
+    # Standalone runs write a private build, published only if every file succeeds
+    with standalone_build() as build_path:
+        con = duckdb.connect(str(build_path))
+        try:
+            # SETUP (run daily, but only does work on Day 1)
+            run_sql("warehouse/sql/schema.sql", con=con)
+            run_sql("warehouse/sql/seed/alert_thresholds.sql", con=con)
+            run_sql("warehouse/sql/dimensions/dim_date.sql", con=con)
 
-    # SETUP (run daily, but only does work on Day 1)
-    run_sql("warehouse/sql/schema.sql") 
-    run_sql("warehouse/sql/seed/alert_thresholds.sql")
-    run_sql("warehouse/sql/dimensions/dim_date.sql") 
+            # INCREMENTAL RAW DATA (Appends new logs)
+            run_sql("warehouse/sql/facts/fact_vehicle_telemetry.sql", con=con)
+            run_sql("warehouse/sql/facts/fact_driver_shifts.sql", con=con)
+            run_sql("warehouse/sql/facts/fact_driver_health_minute.sql", con=con)
+            run_sql("warehouse/sql/facts/fact_driver_shift_rollup.sql", con=con)
+            run_sql("warehouse/sql/facts/fact_daily_finance.sql", con=con)
 
-    # INCREMENTAL RAW DATA (Appends new logs)
-    run_sql("warehouse/sql/facts/fact_vehicle_telemetry.sql")
-    run_sql("warehouse/sql/facts/fact_driver_shifts.sql")
-    run_sql("warehouse/sql/facts/fact_daily_finance.sql")
+            # UPDATE MASTER RECORDS (Updates 'Last Seen' timestamps)
+            run_sql("warehouse/sql/dimensions/dim_driver.sql", con=con)
+            run_sql("warehouse/sql/dimensions/dim_vehicle.sql", con=con)
 
-    # UPDATE MASTER RECORDS (Updates 'Last Seen' timestamps)
-    run_sql("warehouse/sql/dimensions/dim_driver.sql")
-    run_sql("warehouse/sql/dimensions/dim_vehicle.sql")
+            # RECOMPUTE AGGREGATES (The core of the dashboard)
+            run_sql("warehouse/sql/facts/fact_driver_daily_metrics.sql", con=con)
+            run_sql("warehouse/sql/facts/fact_vehicle_daily_metrics.sql", con=con)
+            run_sql("warehouse/sql/facts/entity_baselines.sql", con=con)
 
-    # RECOMPUTE AGGREGATES (The core of the dashboard)
-    run_sql("warehouse/sql/facts/fact_driver_daily_metrics.sql") 
-    run_sql("warehouse/sql/facts/fact_vehicle_daily_metrics.sql")
-
-    # VALIDATE
-    run_sql("warehouse/sql/quality/dq_nulls.sql", fetch_results=True)
-    run_sql("warehouse/sql/quality/dq_ranges.sql", fetch_results=True)
+            # VALIDATE
+            run_sql("warehouse/sql/quality/dq_nulls.sql", fetch_results=True, con=con)
+            run_sql("warehouse/sql/quality/dq_ranges.sql", fetch_results=True, con=con)
+        finally:
+            con.close()
 
     print("\n Warehouse build completed successfully")
-
@@ -1,38 +1,22 @@
 # run_staging.py
-import subprocess
-import logging
-import os 
+"""
+Full pipeline entry point: staging, warehouse build, publish, alerts.
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
-logger = logging.getLogger(__name__)
+Kept for existing callers (CI, docs); the work is done in-process by the
+DAG runner in pipeline.py. Use `python pipeline.py --steps ...` to run
+part of it; `--resume` continues a failed run from its checkpoint.
+"""
+import sys
 
-def run_script(script_name):
-    logger.info(f"--- Running {script_name} ---")
-    try:
-        subprocess.run(["python", script_name], check=True, env=os.environ.copy())
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Error occurred while running {script_name}: {e}")
-        return False
-    return True
+from pipeline import run_pipeline
 
-def main():
-    # 1. ALWAYS run Dimensions first 
-    scripts = [
-        "stage_master_data.py",      
-        "stage_driver_health.py",    
-        "stage_vehicles.py",          
-        "stage_finance.py",
-        "build_analytics.py",
-        "run_sql.py",                
-        "run_alerts.py"        
-    ]
 
-    for script in scripts:
-        if not run_script(script):
-            logger.error("Staging pipeline failed early.")
-            break
-    else:
-        logger.info("ALL STAGING SCRIPTS COMPLETED SUCCESSFULLY")
+def main(resume: bool = False) -> bool:
+    ok = run_pipeline(resume=resume)
+    if ok:
+        print("ALL STAGING SCRIPTS COMPLETED SUCCESSFULLY")
+    return ok
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(0 if main(resume="--resume" in sys.argv[1:]) else 1)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+simulator/bench_finance.py
+
+Timing benchmark for one day of finance generation across N drivers:
+- per-trip: generate_daily_finance per driver (Python loop, uuid4 IDs)
+- batch: generate_daily_finance_batch (NumPy draws, IdAllocator IDs)
+
+Usage:
+    python -m simulator.bench_finance --drivers 10000
+"""
+
+import argparse
+import random
+import time
+from datetime import date as date_cls
+
+from simulator.finance_sim import generate_daily_finance, generate_daily_finance_batch
+
+TRIPS_RANGE = (5, 15)
+
+
+def run_per_trip(drivers, day):
+    return [generate_daily_finance(d, day, random.randint(*TRIPS_RANGE)) for d in drivers]
+
+
+def run_batch(drivers, day):
+    return generate_daily_finance_batch(drivers, day, TRIPS_RANGE)
+
+
+def best_of(fn, repeat, *args):
+    """Best wall time over `repeat` runs, plus trips produced by the last run."""
+    best, events = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        events = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, sum(len(e["trips"]) for e in events)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Finance generation time, per-trip loop vs batch")
+    p.add_argument("--drivers", "-n", type=int, default=10_000)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args(argv)
+
+    drivers = [f"DR_{i:05d}" for i in range(1, args.drivers + 1)]
+    day = date_cls(2026, 1, 19)
+
+    before, trips_before = best_of(run_per_trip, args.repeat, drivers, day)
+    after, trips_after = best_of(run_batch, args.repeat, drivers, day)
+
+    print(f"Drivers: {args.drivers:,} | best of {args.repeat}")
+    print(f"{'mode':<10} {'seconds':>9} {'trips':>10} {'trips/s':>12}")
+    for label, secs, trips in (("per-trip", before, trips_before), ("batch", after, trips_after)):
+        print(f"{label:<10} {secs:>9.3f} {trips:>10,} {trips / secs:>12,.0f}")
+    print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
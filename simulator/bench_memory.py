@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+simulator/bench_memory.py
+
+Memory benchmark for live-simulator vehicle state.
+
+Builds N vehicles, runs each for a full replay window, and reports traced
+bytes per vehicle for:
+- dict layout: the previous representation (per-instance __dict__, tyre and
+  leak dicts, deque of full payload dicts), rebuilt here as a baseline
+- compact layout: the current Vehicle (__slots__, typed arrays, SpeedRing)
+
+Usage:
+    python -m simulator.bench_memory --vehicles 5000
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from collections import deque
+
+from simulator.vehicle_sim import REPLAY_BUFFER_SIZE, TIRE_POSITIONS, Vehicle
+
+
+class DictLayoutVehicle:
+    """
+    State layout of Vehicle before the __slots__ change, for comparison.
+    Same fields, dict-backed; replay keeps the whole payload per tick.
+    """
+
+    def __init__(self, vehicle_id: str, driver_id: str, lat: float, lon: float, rng: random.Random):
+        self.vehicle_id = vehicle_id
+        self.driver_id = driver_id
+        self.lat = lat
+        self.lon = lon
+        self.seeded = True
+        self.rng = rng
+        self.speed_kph = rng.uniform(20, 60)
+        self.heading_deg = rng.uniform(0, 360)
+        self.engine_temp_c = rng.uniform(75, 95)
+        self.battery_v = rng.uniform(12.0, 12.8)
+        self.tire_psi = {k: rng.uniform(30, 34) for k in TIRE_POSITIONS}
+        self.fuel_percent = rng.uniform(50, 100)
+        self.replay = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._overheat_until = 0.0
+        self._tyre_leak_until = {k: 0.0 for k in TIRE_POSITIONS}
+
+
+def _fill_compact(v: Vehicle):
+    for _ in range(REPLAY_BUFFER_SIZE):
+        v.step()
+        v.replay.append(v.to_payload()["speed_kph"])
+
+
+def _fill_dict(v: DictLayoutVehicle, template: Vehicle):
+    # Payloads come from a real Vehicle so both layouts hold the same data
+    for _ in range(REPLAY_BUFFER_SIZE):
+        template.step()
+        payload = template.to_payload()
+        payload["harsh_brake"] = False
+        v.replay.append(payload)
+
+
+def measure(layout: str, n: int, seed: int) -> float:
+    """Traced bytes per vehicle once every replay window is full."""
+    shared_rng = random.Random(seed)
+    template = Vehicle("TEMPLATE", "DR_000", 6.45, 3.39, rng=random.Random(seed))
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    fleet = []
+    for i in range(n):
+        args = (f"SIM_{i:05d}", "DR_001", 6.45 + i * 1e-4, 3.39 + i * 1e-4)
+        if layout == "compact":
+            v = Vehicle(*args, rng=shared_rng)
+            _fill_compact(v)
+        else:
+            v = DictLayoutVehicle(*args, rng=shared_rng)
+            _fill_dict(v, template)
+        fleet.append(v)
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del fleet
+    return used / n
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Bytes per simulated vehicle, dict vs compact layout")
+    p.add_argument("--vehicles", "-n", type=int, default=5000)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+
+    before = measure("dict", args.vehicles, args.seed)
+    after = measure("compact", args.vehicles, args.seed)
+
+    print(f"Vehicles: {args.vehicles:,} | replay window: {REPLAY_BUFFER_SIZE} ticks")
+    print(f"{'layout':<10} {'bytes/vehicle':>14} {'MiB per 10k':>12}")
+    for label, value in (("dict", before), ("compact", after)):
+        print(f"{label:<10} {value:>14,.0f} {value * 10_000 / 2**20:>12,.1f}")
+    print(f"Reduction: {before / after:.1f}x ({(1 - after / before):.0%} smaller)")
+
+
+if __name__ == "__main__":
+    main()
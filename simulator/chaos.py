@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+simulator/chaos.py
+
+Dirty-data profiles for stress-testing the pipeline.
+
+A ChaosInjector wraps the batch simulator's record streams and injects, at
+configurable rates:
+- duplicate event_ids (at-least-once redelivery)
+- out-of-order records within a file
+- late-arriving records (an older day's events landing in the newest file)
+- missing required fields and out-of-range values
+- malformed (truncated) JSON lines
+- oversized days (telemetry volume multiplied)
+
+Everything injected is counted in a ground-truth manifest, and `verify`
+compares it against staging rejects and the warehouse:
+
+    python -m simulator.run_simulation --days 7 --chaos dirty --seed 1 --overwrite
+    python -m simulator.chaos verify --run-pipeline
+"""
+
+import argparse
+import json
+import logging
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from simulator.common import entity_rng, utc_now_iso
+
+# Config
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_PATH = PROJECT_ROOT / "warehouse" / "raw" / "chaos_manifest.json"
+REJECTED_DIR = Path("warehouse/staging/rejected")
+
+# Rates are per record, except oversize_day_rate (per day)
+CHAOS_PROFILES = {
+    "clean": {
+        "duplicate_rate": 0.0,
+        "out_of_order_rate": 0.0,
+        "late_rate": 0.0,
+        "missing_field_rate": 0.0,
+        "out_of_range_rate": 0.0,
+        "malformed_rate": 0.0,
+        "oversize_day_rate": 0.0,
+        "oversize_factor": 1,
+    },
+    "dirty": {
+        "duplicate_rate": 0.02,
+        "out_of_order_rate": 0.05,
+        "late_rate": 0.01,
+        "missing_field_rate": 0.005,
+        "out_of_range_rate": 0.005,
+        "malformed_rate": 0.001,
+        "oversize_day_rate": 0.1,
+        "oversize_factor": 5,
+    },
+    "hostile": {
+        "duplicate_rate": 0.10,
+        "out_of_order_rate": 0.20,
+        "late_rate": 0.05,
+        "missing_field_rate": 0.03,
+        "out_of_range_rate": 0.03,
+        "malformed_rate": 0.01,
+        "oversize_day_rate": 0.3,
+        "oversize_factor": 10,
+    },
+}
+
+# Records held back at most this many positions when reordered
+OUT_OF_ORDER_WINDOW = 50
+
+# Per raw entity: fields staging requires, physically impossible values,
+# the field carrying the event date, and the fact table it lands in
+ENTITY_RULES = {
+    "vehicles": {
+        "required": ["event_id", "vehicle_id", "driver_id", "timestamp", "lat", "lon"],
+        "out_of_range": {
+            "lat": lambda rng: rng.uniform(91, 180),
+            "lon": lambda rng: -rng.uniform(181, 360),
+            "speed_kph": lambda rng: -rng.uniform(1, 50),
+            "fuel_percent": lambda rng: rng.uniform(101, 200),
+            "heading": lambda rng: rng.uniform(361, 720),
+        },
+        "date_field": "timestamp",
+        "table": "mart.fact_vehicle_telemetry",
+    },
+    "driver_health": {
+        "required": ["event_id", "driver_id", "timestamp"],
+        "out_of_range": {
+            "fatigue_index": lambda rng: rng.uniform(1.1, 3.0),
+            "shift_hours": lambda rng: -rng.uniform(1, 10),
+            "continuous_driving_hours": lambda rng: -rng.uniform(1, 6),
+        },
+        "date_field": "timestamp",
+        "table": "mart.fact_driver_shifts",
+    },
+    "finance": {
+        "required": ["event_id", "driver_id", "date"],
+        "out_of_range": {
+            "total_revenue": lambda rng: -rng.uniform(1, 500),
+            "total_cost": lambda rng: -rng.uniform(1, 200),
+        },
+        "date_field": "date",
+        "table": "mart.fact_daily_finance",
+    },
+}
+
+COUNTERS = (
+    "generated", "emitted_lines", "duplicates", "out_of_order", "late",
+    "missing_field", "out_of_range", "malformed", "rejected_lines", "expected_valid",
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def resolve_profile(name: str, overrides: Optional[Dict[str, float]] = None) -> Dict:
+    if name not in CHAOS_PROFILES:
+        raise ValueError(f"Unknown chaos profile: {name} (choose from {', '.join(CHAOS_PROFILES)})")
+    profile = dict(CHAOS_PROFILES[name])
+    for key, value in (overrides or {}).items():
+        if key not in profile:
+            raise ValueError(f"Unknown chaos rate: {key}")
+        profile[key] = value
+    return profile
+
+
+# Injection
+class ChaosInjector:
+    """
+    Applies a chaos profile to record streams and keeps the ground truth.
+    Seeded runs inject identically, per (entity, day).
+    """
+
+    def __init__(self, profile_name: str, rates: Dict, seed: Optional[int] = None):
+        self.profile_name = profile_name
+        self.rates = rates
+        self.seed = seed
+        self.stats: Dict[str, Dict[str, Dict]] = defaultdict(lambda: defaultdict(lambda: dict.fromkeys(COUNTERS, 0)))
+        self.oversized_days: List[str] = []
+        self.late: Dict[str, List[Dict]] = defaultdict(list)
+        self.late_into: Optional[str] = None
+
+    def _rng(self, *keys) -> random.Random:
+        return random.Random() if self.seed is None else entity_rng(self.seed, "chaos", *keys)
+
+    def telemetry_samples(self, date, samples: int) -> int:
+        """Telemetry volume for a day; some days are oversized."""
+        if self._rng("oversize", date).random() < self.rates["oversize_day_rate"]:
+            self.oversized_days.append(str(date))
+            return samples * int(self.rates["oversize_factor"])
+        return samples
+
+    def _event_date(self, entity: str, record: Dict, default: str) -> str:
+        value = record.get(ENTITY_RULES[entity]["date_field"])
+        return str(value)[:10] if value else default
+
+    def _corrupt(self, entity: str, record: Dict, rng: random.Random, stats: Dict):
+        """
+        Returns (record_or_line, corrupted). Malformed records become a
+        truncated JSON string written verbatim.
+        """
+        rules = ENTITY_RULES[entity]
+        roll = rng.random()
+        missing = self.rates["missing_field_rate"]
+        out_of_range = missing + self.rates["out_of_range_rate"]
+        malformed = out_of_range + self.rates["malformed_rate"]
+
+        if roll < missing:
+            record = dict(record)
+            record.pop(rng.choice(rules["required"]), None)
+            stats["missing_field"] += 1
+            return record, True
+        if roll < out_of_range:
+            record = dict(record)
+            field, bad_value = rng.choice(list(rules["out_of_range"].items()))
+            record[field] = round(bad_value(rng), 2)
+            stats["out_of_range"] += 1
+            return record, True
+        if roll < malformed:
+            line = json.dumps(record)
+            stats["malformed"] += 1
+            return line[: rng.randint(1, max(1, len(line) - 1))], True
+        return record, False
+
+    def apply(self, entity: str, date, records: Iterable[Dict]) -> Iterator:
+        """Inject chaos into one entity/day stream."""
+        rng = self._rng(entity, date)
+        day = str(date)
+        held: List[list] = []
+
+        for record in records:
+            true_day = self._event_date(entity, record, day)
+            stats = self.stats[entity][true_day]
+            stats["generated"] += 1
+
+            # Late: diverted to the newest file, written after every day
+            if rng.random() < self.rates["late_rate"]:
+                stats["late"] += 1
+                stats["expected_valid"] += 1
+                self.late[entity].append(record)
+                continue
+
+            out, corrupted = self._corrupt(entity, record, rng, stats)
+            copies = [out]
+            if rng.random() < self.rates["duplicate_rate"]:
+                copies.append(out)
+                stats["duplicates"] += 1
+            if not corrupted:
+                stats["expected_valid"] += 1
+
+            for copy in copies:
+                stats["emitted_lines"] += 1
+                stats["rejected_lines"] += int(corrupted)
+                if rng.random() < self.rates["out_of_order_rate"]:
+                    stats["out_of_order"] += 1
+                    held.append([rng.randint(1, OUT_OF_ORDER_WINDOW), copy])
+                else:
+                    yield copy
+
+                # Release held records once their delay has passed
+                for item in held:
+                    item[0] -= 1
+                ready = [item[1] for item in held if item[0] <= 0]
+                held = [item for item in held if item[0] > 0]
+                yield from ready
+
+        for _, copy in held:
+            yield copy
+
+    def drain_late(self, entity: str, into_date) -> List[Dict]:
+        records = self.late.pop(entity, [])
+        if records:
+            self.late_into = str(into_date)
+            for record in records:
+                self.stats[entity][self._event_date(entity, record, str(into_date))]["emitted_lines"] += 1
+        return records
+
+    def write_manifest(self, path: Path = MANIFEST_PATH, **run_info) -> Path:
+        manifest = {
+            "profile": self.profile_name,
+            "rates": self.rates,
+            "seed": self.seed,
+            **({"generated_at": utc_now_iso()} if self.seed is None else {}),
+            **run_info,
+            "late_into": self.late_into,
+            "oversized_days": sorted(self.oversized_days),
+            "entities": {
+                entity: {day: dict(counts) for day, counts in sorted(days.items())}
+                for entity, days in self.stats.items()
+            },
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(manifest, indent=2) + "\n")
+        logger.info("Wrote chaos manifest %s", path)
+        return path
+
+
+# Verification
+def _count_rejects() -> int:
+    if not REJECTED_DIR.exists():
+        return 0
+    total = 0
+    for path in REJECTED_DIR.glob("*.jsonl"):
+        with path.open() as f:
+            total += sum(1 for _ in f)
+    return total
+
+
+def verify(manifest_path: Path = MANIFEST_PATH, db_path: Optional[Path] = None, run_pipeline: bool = False) -> bool:
+    """
+    Check pipeline output against the manifest. Expects a warehouse that
+    only holds this chaos run's days (e.g. a fresh build).
+    """
+    import duckdb
+    from warehouse.snapshots import current_db_path
+
+    manifest = json.loads(Path(manifest_path).read_text())
+    entities = manifest["entities"]
+    emitted = sum(c["emitted_lines"] for days in entities.values() for c in days.values())
+    ok = True
+
+    if run_pipeline:
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "run_staging.py"], check=True)
+        elapsed = time.perf_counter() - started
+        logger.info("Pipeline: %s raw lines in %.1fs (%s lines/s)", f"{emitted:,}", elapsed, f"{emitted / elapsed:,.0f}")
+
+    # Staging quarantine should hold exactly the corrupted lines
+    expected_rejects = sum(c["rejected_lines"] for days in entities.values() for c in days.values())
+    rejected = _count_rejects()
+    status = "OK" if rejected >= expected_rejects else "MISMATCH"
+    ok &= status == "OK"
+    # Rejects from earlier raw files can add to the count, never subtract
+    logger.info("Staging rejects: %s (expected >= %s) %s", rejected, expected_rejects, status)
+
+    con = duckdb.connect(str(db_path or current_db_path()), read_only=True)
+    try:
+        for entity, days in entities.items():
+            table = ENTITY_RULES[entity]["table"]
+            actual = dict(con.execute(
+                f"SELECT CAST(date_key AS VARCHAR), COUNT(*) FROM {table} GROUP BY 1"
+            ).fetchall())
+            for day, counts in days.items():
+                expected = counts["expected_valid"]
+                got = actual.get(day, 0)
+                status = "OK" if got == expected else "MISMATCH"
+                ok &= got == expected
+                logger.info("%-14s %s: %6s rows (expected %6s) %s", entity, day, got, expected, status)
+
+        # Daily metrics must reflect late rows too
+        drift = con.execute("""
+            SELECT t.date_key, t.events, COALESCE(m.events, 0)
+            FROM (SELECT date_key, COUNT(*) AS events FROM mart.fact_vehicle_telemetry GROUP BY 1) t
+            LEFT JOIN (SELECT date_key, SUM(telemetry_events) AS events
+                       FROM mart.fact_vehicle_daily_metrics GROUP BY 1) m USING (date_key)
+            WHERE t.events <> COALESCE(m.events, 0)
+            ORDER BY 1
+        """).fetchall()
+        for date_key, facts, metrics in drift:
+            ok = False
+            logger.info("Metric drift %s: %s telemetry rows, %s in daily metrics", date_key, facts, metrics)
+    finally:
+        con.close()
+
+    logger.info("Chaos verification %s", "PASSED" if ok else "FAILED")
+    return ok
+
+
+# CLI
+def parse_args():
+    p = argparse.ArgumentParser(description="Chaos manifest tools")
+    sub = p.add_subparsers(dest="command", required=True)
+    v = sub.add_parser("verify", help="compare pipeline output with the chaos manifest")
+    v.add_argument("--manifest", type=Path, default=MANIFEST_PATH)
+    v.add_argument("--db", type=Path, default=None, help="database to check (defaults to the current snapshot)")
+    v.add_argument("--run-pipeline", action="store_true", help="run run_staging.py first and report throughput")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "verify":
+        sys.exit(0 if verify(args.manifest, args.db, args.run_pipeline) else 1)
@@ -7,12 +7,15 @@ This file intentionally stays lightweight. It only contains:
 - Cross-module constants (drivers, vehicles, finance categories)
 - Reusable ID + timestamp helpers
 - Small random utility functions
+- Seeded per-entity RNG streams for reproducible runs
 
 Nothing in this file contains business logic or simulation loops.
 """
 
 import uuid
 import random
+import hashlib
+import secrets
 from datetime import datetime, timedelta, timezone
 
 
@@ -53,13 +56,67 @@ FINANCE_CATEGORIES = {
 }
 
 
+#  SEEDED RNG STREAMS
+def entity_seed(seed: int, *keys) -> int:
+    """
+    Derive a stable 64-bit seed for one (entity, date, ...) key.
+    Hash-based, so streams are independent of each other and of the
+    order (or process) in which they are created.
+    Example: entity_seed(42, "vehicle", "BUS_01", "2026-01-19")
+    """
+    material = ":".join(str(k) for k in (seed, *keys))
+    return int.from_bytes(hashlib.sha256(material.encode()).digest()[:8], "big")
+
+
+def entity_rng(seed: int, *keys) -> random.Random:
+    """
+    Independent random stream for one (entity, date, ...) key.
+    Regenerating any single entity/day with the same seed is byte-identical.
+    """
+    return random.Random(entity_seed(seed, *keys))
+
+
 #  UTILITY FUNCTIONS
-def generate_id(prefix: str) -> str:
+def generate_id(prefix: str, rng: random.Random = None, length: int = 10) -> str:
     """
     Generate a short unique ID with a prefix.
     Example: generate_id("evt") -> "evt_8af21bd41f"
+
+    With an `rng` stream the ID is drawn from it, so seeded runs
+    produce deterministic IDs.
+    """
+    if rng is None:
+        return f"{prefix}_{uuid.uuid4().hex[:length]}"
+    return f"{prefix}_{rng.getrandbits(4 * length):0{length}x}"
+
+
+class IdAllocator:
     """
-    return f"{prefix}_{uuid.uuid4().hex[:10]}"
+    Counter-based IDs for bulk generation: one random (or seeded) 64-bit
+    block prefix per allocator, then a hex counter. Much cheaper than a
+    uuid4 per record and unique as long as block prefixes don't collide;
+    at 64 bits that stays negligible however many allocators backfill
+    workers draw independently.
+    Example: IdAllocator("trip").take(2) -> ["trip_9c41e07d5be2a013_000000", "trip_9c41e07d5be2a013_000001"]
+
+    Seeded runs derive the block from entity_seed(seed, *keys), so IDs are
+    deterministic per (seed, keys).
+    """
+
+    def __init__(self, prefix: str, seed: int = None, *keys):
+        block = secrets.randbits(64) if seed is None else entity_seed(seed, "ids", prefix, *keys)
+        self.stem = f"{prefix}_{block:016x}_"
+        self.counter = 0
+
+    def next(self) -> str:
+        value = f"{self.stem}{self.counter:06x}"
+        self.counter += 1
+        return value
+
+    def take(self, n: int) -> list:
+        stem, start = self.stem, self.counter
+        self.counter += n
+        return [f"{stem}{i:06x}" for i in range(start, start + n)]
 
 
 def utc_now_iso() -> str:
@@ -70,33 +127,35 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat() + "Z"
 
 
-def random_timestamp(base: datetime = None, max_offset_seconds: int = 60) -> str:
+def random_timestamp(base: datetime = None, max_offset_seconds: int = 60, rng: random.Random = None) -> str:
     """
     Create a random timestamp near a base timestamp.
 
     Parameters:
         base (datetime): The reference time. If None, uses current UTC.
         max_offset_seconds (int): Maximum number of seconds to randomly add.
+        rng (random.Random): Optional seeded stream (defaults to global random).
 
     Returns:
         str (ISO formatted UTC timestamp)
     """
+    rng = rng or random
     base = base or datetime.now(timezone.utc)
-    offset = timedelta(seconds=random.randint(0, max_offset_seconds))
+    offset = timedelta(seconds=rng.randint(0, max_offset_seconds))
     return (base + offset).isoformat() + "Z"
 
 
-def safe_rand_uniform(a: float, b: float) -> float:
+def safe_rand_uniform(a: float, b: float, rng: random.Random = None) -> float:
     """
     A simple wrapper for random.uniform() that keeps values clean
     and rounded for nicer JSON output.
     """
     assert a <= b, "Lower bound must be <= upper bound"
-    return round(random.uniform(a, b), 2)
+    return round((rng or random).uniform(a, b), 2)
 
 
-def safe_rand_int(a: int, b: int) -> int:
+def safe_rand_int(a: int, b: int, rng: random.Random = None) -> int:
     """
     Random integer helper with safer semantics.
     """
-    return random.randint(a, b)
+    return (rng or random).randint(a, b)
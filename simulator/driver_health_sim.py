@@ -2,7 +2,6 @@
 
 import json
 import random
-import uuid
 from datetime import datetime, timedelta
 from simulator.common import generate_id, utc_now_iso, DRIVERS
 import time
@@ -34,13 +33,16 @@ class DriverHealthSimulator:
                     # connection failed; keep client but warn
                     print("Warning: could not connect to MQTT broker; continuing with mqtt client object.")
 
-    def simulate_shift_event(self, driver_id):
+    def simulate_shift_event(self, driver_id, rng=None):
+        # Optional seeded stream (common.entity_rng); global random otherwise
+        seeded = rng is not None
+        rng = rng or random
         # Simulate shift hours: 6–10
-        shift_hours = round(random.uniform(6, 10), 1)
+        shift_hours = round(rng.uniform(6, 10), 1)
         # Continuous driving: 2–6 hours, cannot exceed shift
-        continuous_hours = round(random.uniform(2, min(6, shift_hours)), 1)
+        continuous_hours = round(rng.uniform(2, min(6, shift_hours)), 1)
         # Fatigue index: derived from continuous hours
-        fatigue_index = round(min(1.0, continuous_hours / 6 + random.uniform(-0.1, 0.1)), 2)
+        fatigue_index = round(min(1.0, continuous_hours / 6 + rng.uniform(-0.1, 0.1)), 2)
         # Breaks taken if fatigue index is below threshold
         breaks_taken = fatigue_index < 0.6
         # Alerts
@@ -49,7 +51,7 @@ class DriverHealthSimulator:
             alerts.append("fatigue_risk")
 
         event = {
-            "event_id": f"health_{uuid.uuid4().hex[:8]}",
+            "event_id": generate_id("health", rng if seeded else None, length=8),
             "driver_id": driver_id,
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "shift_hours": shift_hours,
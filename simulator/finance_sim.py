@@ -18,10 +18,15 @@ entire FleetIntel360 simulator.
 import json
 import random
 from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
 
 from simulator.common import (
     DRIVERS,
     FINANCE_CATEGORIES,
+    IdAllocator,
+    entity_seed,
     generate_id,
     utc_now_iso,
     safe_rand_uniform,
@@ -30,7 +35,7 @@ from simulator.common import (
 
 
 #   TRIP GENERATION
-def generate_trip(driver_id: str, event_time: datetime) -> dict:
+def generate_trip(driver_id: str, event_time: datetime, rng: random.Random = None) -> dict:
     """
     Simulate one trip/job for a driver.
 
@@ -38,21 +43,23 @@ def generate_trip(driver_id: str, event_time: datetime) -> dict:
     - revenue (per trip)
     - fuel/toll/maintenance costs
     - fraud signal
+
+    Pass a seeded `rng` (common.entity_rng) for reproducible trips and IDs.
     """
 
     # Core revenue + cost simulation
-    revenue = safe_rand_uniform(10, 120)           # what the driver earns
-    fuel_cost = safe_rand_uniform(2, 15)
-    toll_fees = safe_rand_uniform(0, 7)
-    maintenance_cost = safe_rand_uniform(0.5, 5)
+    revenue = safe_rand_uniform(10, 120, rng)           # what the driver earns
+    fuel_cost = safe_rand_uniform(2, 15, rng)
+    toll_fees = safe_rand_uniform(0, 7, rng)
+    maintenance_cost = safe_rand_uniform(0.5, 5, rng)
 
     total_cost = round(fuel_cost + toll_fees + maintenance_cost, 2)
 
     # Slight chance of fraud/risk behavior
-    fraud_alert = random.random() < 0.12           # ~12% probability
+    fraud_alert = (rng or random).random() < 0.12           # ~12% probability
 
     return {
-        "event_id": generate_id("trip"),
+        "event_id": generate_id("trip", rng),
         "driver_id": driver_id,
         "timestamp": event_time.isoformat() + "Z",
 
@@ -68,22 +75,23 @@ def generate_trip(driver_id: str, event_time: datetime) -> dict:
     }
 
 #   DAILY SUMMARY GENERATION
-def generate_daily_finance(driver_id: str, date: datetime, num_trips: int) -> dict:
+def generate_daily_finance(driver_id: str, date: datetime, num_trips: int, rng: random.Random = None) -> dict:
     """
     Generate all trips for a driver for a specific day and produce
     a financial summary.
     """
 
     trips = []
+    draw = rng or random
     base_time = datetime(date.year, date.month, date.day)
 
     # Generate each trip with realistic timestamps across the workday
     for i in range(num_trips):
         # Spread timestamps across 8–12 hour window
-        seconds_into_day = random.randint(0, 12 * 3600)
+        seconds_into_day = draw.randint(0, 12 * 3600)
         trip_time = base_time + timedelta(seconds=seconds_into_day)
 
-        trips.append(generate_trip(driver_id, trip_time))
+        trips.append(generate_trip(driver_id, trip_time, rng))
 
     # Aggregate metrics
     total_revenue = round(sum(t["revenue"] for t in trips), 2)
@@ -92,13 +100,13 @@ def generate_daily_finance(driver_id: str, date: datetime, num_trips: int) -> di
     fraud_alerts_count = sum(1 for t in trips if t["fraud_alert"])
 
     # Slightly financial-flavored but non-invasive
-    trading_position = random.choice(["hold", "long_bias", "short_bias", "risk_off"])
+    trading_position = draw.choice(["hold", "long_bias", "short_bias", "risk_off"])
 
     # End-of-day account balance simulation (for dashboarding)
-    end_of_day_balance = safe_rand_uniform(200, 1500) + net_profit
+    end_of_day_balance = safe_rand_uniform(200, 1500, rng) + net_profit
 
     return {
-        "event_id": generate_id("daily_finance"),
+        "event_id": generate_id("daily_finance", rng),
         "driver_id": driver_id,
         "date": date.isoformat(),
 
@@ -115,6 +123,99 @@ def generate_daily_finance(driver_id: str, date: datetime, num_trips: int) -> di
     }
 
 
+#   BATCH GENERATION (whole fleet, one day)
+TRADING_POSITIONS = ["hold", "long_bias", "short_bias", "risk_off"]
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    return np.round(values, 2)
+
+
+def generate_daily_finance_batch(drivers: List[str], date, trips_range=(5, 15), seed: int = None) -> List[dict]:
+    """
+    Same records as generate_daily_finance, for every driver at once.
+
+    Every trip of the day is drawn in one pass as NumPy arrays and the
+    per-driver sums are bincounts over the trip -> driver index, so the
+    Python work left is building the output dicts. IDs come from
+    IdAllocator instead of a uuid4 per trip.
+    """
+    n = len(drivers)
+    if n == 0:
+        return []
+
+    rng = np.random.default_rng(None if seed is None else entity_seed(seed, "finance_batch", date))
+    trip_ids = IdAllocator("trip", seed, date)
+    daily_ids = IdAllocator("daily_finance", seed, date)
+
+    counts = rng.integers(trips_range[0], trips_range[1] + 1, n)
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(n), counts)
+
+    # Same distributions as generate_trip
+    seconds = rng.integers(0, 12 * 3600 + 1, total)
+    revenue = _round2(rng.uniform(10, 120, total))
+    fuel_cost = _round2(rng.uniform(2, 15, total))
+    toll_fees = _round2(rng.uniform(0, 7, total))
+    maintenance_cost = _round2(rng.uniform(0.5, 5, total))
+    trip_cost = _round2(fuel_cost + toll_fees + maintenance_cost)
+    fraud = rng.random(total) < 0.12
+
+    # Per-driver aggregates
+    total_revenue = _round2(np.bincount(owner, weights=revenue, minlength=n))
+    total_cost = _round2(np.bincount(owner, weights=trip_cost, minlength=n))
+    net_profit = _round2(total_revenue - total_cost)
+    fraud_count = np.bincount(owner, weights=fraud, minlength=n).astype(np.int64)
+    positions = rng.integers(0, len(TRADING_POSITIONS), n)
+    balance = _round2(_round2(rng.uniform(200, 1500, n)) + net_profit)
+
+    day_start = np.datetime64(f"{date.year:04d}-{date.month:02d}-{date.day:02d}T00:00:00")
+    timestamps = np.datetime_as_string(day_start + seconds.astype("timedelta64[s]"), unit="s")
+
+    # Bulk list conversion once; dicts are built from plain Python values
+    ids = trip_ids.take(total)
+    ts = [t + "Z" for t in timestamps.tolist()]
+    owner_l = owner.tolist()
+    rev_l, fuel_l, toll_l, maint_l = revenue.tolist(), fuel_cost.tolist(), toll_fees.tolist(), maintenance_cost.tolist()
+    cost_l, fraud_l = trip_cost.tolist(), fraud.tolist()
+
+    trips = [
+        {
+            "event_id": ids[i],
+            "driver_id": drivers[owner_l[i]],
+            "timestamp": ts[i],
+            "revenue": rev_l[i],
+            "fuel_cost": fuel_l[i],
+            "toll_fees": toll_l[i],
+            "maintenance_cost": maint_l[i],
+            "total_cost": cost_l[i],
+            "fraud_alert": fraud_l[i],
+        }
+        for i in range(total)
+    ]
+
+    bounds = np.concatenate(([0], np.cumsum(counts))).tolist()
+    date_iso = date.isoformat()
+    rev_t, cost_t, net_t = total_revenue.tolist(), total_cost.tolist(), net_profit.tolist()
+    fraud_t, pos_t, bal_t = fraud_count.tolist(), positions.tolist(), balance.tolist()
+
+    return [
+        {
+            "event_id": daily_ids.next(),
+            "driver_id": driver_id,
+            "date": date_iso,
+            "total_revenue": rev_t[d],
+            "total_cost": cost_t[d],
+            "net_profit": net_t[d],
+            "fraud_alerts_count": fraud_t[d],
+            "trading_position": TRADING_POSITIONS[pos_t[d]],
+            "end_of_day_balance": bal_t[d],
+            "trips": trips[bounds[d]:bounds[d + 1]],
+        }
+        for d, driver_id in enumerate(drivers)
+    ]
+
+
 #   MAIN SIMULATION LOOP
 def run_simulation(
     drivers=DRIVERS,
@@ -0,0 +1,148 @@
+"""
+simulator/fleet_state.py
+------------------------
+Array-backed fleet simulator for large fleets.
+
+FleetState holds every vehicle's state as NumPy arrays and advances the
+whole fleet in one vectorized step. It follows the same random-walk
+model and anomaly probabilities as `vehicle_sim.Vehicle`, so daily
+aggregates match the per-object simulator statistically, but costs a
+handful of array operations per tick instead of a Python loop per vehicle.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from simulator.vehicle_sim import ANOMALY_PROBS, SPEED_MAX, SPEED_MIN, TIRE_POSITIONS
+
+
+class FleetState:
+    def __init__(
+        self,
+        vehicle_ids: List[str],
+        driver_ids: List[str],
+        lat: np.ndarray,
+        lon: np.ndarray,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        n = len(vehicle_ids)
+
+        self.vehicle_ids = list(vehicle_ids)
+        self.driver_ids = list(driver_ids)
+        self.lat = np.asarray(lat, dtype=np.float64).copy()
+        self.lon = np.asarray(lon, dtype=np.float64).copy()
+
+        # Same initial ranges as Vehicle.__init__
+        self.speed_kph = self.rng.uniform(20, 60, n)
+        self.heading_deg = self.rng.uniform(0, 360, n)
+        self.engine_temp_c = self.rng.uniform(75, 95, n)
+        self.battery_v = self.rng.uniform(12.0, 12.8, n)
+        self.tire_psi = self.rng.uniform(30, 34, (n, len(TIRE_POSITIONS)))
+        self.fuel_percent = self.rng.uniform(50, 100, n)
+
+    @classmethod
+    def from_meta(cls, vehicles_meta: List[Dict], rng: Optional[np.random.Generator] = None) -> "FleetState":
+        """
+        Build from the same metadata dicts `run_simulation.make_vehicle_list` returns.
+        """
+        return cls(
+            vehicle_ids=[m["vehicle_id"] for m in vehicles_meta],
+            driver_ids=[m["driver_id"] for m in vehicles_meta],
+            lat=np.array([m["lat"] for m in vehicles_meta]),
+            lon=np.array([m["lon"] for m in vehicles_meta]),
+            rng=rng,
+        )
+
+    def __len__(self) -> int:
+        return len(self.vehicle_ids)
+
+    def step(self, tick_seconds: float = 1.0):
+        """Advance every vehicle by one tick (vectorized Vehicle.step)."""
+        n = len(self)
+        u = self.rng.uniform
+
+        self.heading_deg = (self.heading_deg + u(-3, 3, n)) % 360
+
+        # Rough kph -> degree deltas (1 deg lat ~ 111 km), as in Vehicle.step
+        distance_km = (self.speed_kph * tick_seconds) / 3600.0
+        heading_rad = np.radians(self.heading_deg)
+        self.lat += (distance_km / 111.0) * np.cos(heading_rad)
+        self.lon += (distance_km / (111.0 * np.cos(np.radians(self.lat)) + 1e-6)) * np.sin(heading_rad)
+
+        self.speed_kph = np.clip(self.speed_kph + u(-3, 3, n), SPEED_MIN, SPEED_MAX)
+
+        # Engine warms while moving, cools when stopped
+        moving = self.speed_kph > 5
+        self.engine_temp_c += np.where(moving, u(-0.2, 0.7, n), u(-0.5, 0.2, n))
+        np.clip(self.engine_temp_c, 60.0, 140.0, out=self.engine_temp_c)
+
+        self.battery_v = np.clip(self.battery_v + u(-0.01, 0.01, n), 11.0, 13.0)
+
+        self.fuel_percent = np.clip(self.fuel_percent - (self.speed_kph / 10000.0) * tick_seconds, 0.0, 100.0)
+
+        self.tire_psi = np.clip(self.tire_psi + u(-0.02, 0.02, self.tire_psi.shape), 18.0, 40.0)
+
+    def inject_anomalies(self):
+        """Vectorized Vehicle.inject_anomalies driven by ANOMALY_PROBS."""
+        n = len(self)
+        rng = self.rng
+
+        # Overheat spike (not clamped until the next step, as in Vehicle)
+        hit = rng.random(n) < ANOMALY_PROBS["overheat_spike"]
+        if hit.any():
+            self.engine_temp_c[hit] += rng.uniform(12.0, 28.0, hit.sum())
+
+        # Fuel siphon: sudden large drop
+        hit = rng.random(n) < ANOMALY_PROBS["fuel_siphon"]
+        if hit.any():
+            self.fuel_percent[hit] = np.clip(self.fuel_percent[hit] - rng.uniform(6.0, 22.0, hit.sum()), 0.0, 100.0)
+
+        # Tyre leak on one random wheel
+        hit = np.flatnonzero(rng.random(n) < ANOMALY_PROBS["tyre_leak"])
+        if hit.size:
+            wheels = rng.integers(0, len(TIRE_POSITIONS), hit.size)
+            leaked = self.tire_psi[hit, wheels] - rng.uniform(3.0, 8.0, hit.size)
+            self.tire_psi[hit, wheels] = np.clip(leaked, 10.0, 40.0)
+
+        # Harsh braking: lose 20-70% of speed instantly
+        hit = rng.random(n) < ANOMALY_PROBS["harsh_brake"]
+        if hit.any():
+            self.speed_kph[hit] *= 1 - rng.uniform(0.2, 0.7, hit.sum())
+
+    def to_payloads(self, timestamp: str, event_ids: List[str]) -> List[Dict]:
+        """
+        Materialize the current state as Vehicle.to_payload-shaped dicts.
+        Rounding happens on whole arrays before dropping to Python objects.
+        """
+        lat = np.round(self.lat, 6).tolist()
+        lon = np.round(self.lon, 6).tolist()
+        speed = np.round(self.speed_kph, 2).tolist()
+        heading = np.round(self.heading_deg, 2).tolist()
+        temp = np.round(self.engine_temp_c, 2).tolist()
+        battery = np.round(self.battery_v, 2).tolist()
+        fuel = np.round(self.fuel_percent, 2).tolist()
+        tires = np.round(self.tire_psi, 2).tolist()
+        speeding = (self.speed_kph > 50).tolist()
+
+        return [
+            {
+                "event_id": event_ids[i],
+                "vehicle_id": self.vehicle_ids[i],
+                "driver_id": self.driver_ids[i],
+                "timestamp": timestamp,
+                "lat": lat[i],
+                "lon": lon[i],
+                "speed_kph": speed[i],
+                "heading": heading[i],
+                "engine_temp_c": temp[i],
+                "battery_v": battery[i],
+                "tire_psi": dict(zip(TIRE_POSITIONS, tires[i])),
+                "fuel_percent": fuel[i],
+                "speed_zone_kph": 50,
+                "speeding": speeding[i],
+                "obd_codes": [],
+            }
+            for i in range(len(self))
+        ]
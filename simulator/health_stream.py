@@ -0,0 +1,110 @@
+"""
+simulator/health_stream.py
+--------------------------
+Intraday driver health at minute granularity.
+
+Each driver's paired vehicle is advanced minute by minute with the
+array-backed FleetState, so "driving" comes from the same speed model as
+the telemetry. Continuous driving accumulates while the vehicle moves and
+resets after a long enough break; fatigue is a function of it, plus a small
+whole-shift term. All drivers are generated together, one vectorized step
+per minute.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from simulator.common import entity_seed
+from simulator.fleet_state import FleetState
+
+# Config
+SHIFT_START_HOUR = 6
+SHIFT_MINUTES = 12 * 60
+MOVING_KPH = 5.0
+
+# Breaks: chance per minute grows with continuous driving
+BREAK_BASE_PROB = 0.002
+BREAK_PROB_PER_HOUR = 0.01
+BREAK_MINUTES = (10, 45)
+# A break at least this long resets continuous driving
+BREAK_RESET_MINUTES = 15
+
+# Fatigue = continuous hours / FATIGUE_FULL_HOURS + shift-level wear
+FATIGUE_FULL_HOURS = 6.0
+FATIGUE_SHIFT_WEIGHT = 0.15
+
+
+def _driver_vehicles(vehicles_meta: List[Dict]) -> List[Dict]:
+    """First vehicle paired with each driver (drivers without one are idle)."""
+    seen = {}
+    for meta in vehicles_meta:
+        seen.setdefault(meta["driver_id"], meta)
+    return list(seen.values())
+
+
+def generate_intraday_health(vehicles_meta: List[Dict], date, seed: Optional[int] = None,
+                             minutes: int = SHIFT_MINUTES) -> Iterator[Dict]:
+    """
+    Yield one health sample per driver per minute of the shift.
+    """
+    pairs = _driver_vehicles(vehicles_meta)
+    n = len(pairs)
+    if n == 0:
+        return
+
+    rng = np.random.default_rng(None if seed is None else entity_seed(seed, "health_stream", date))
+    fleet = FleetState.from_meta(pairs, rng=rng)
+    shift_start = datetime(date.year, date.month, date.day, SHIFT_START_HOUR, tzinfo=timezone.utc)
+    date_tag = date.strftime("%Y%m%d")
+
+    continuous = np.zeros(n)  # minutes of continuous driving
+    break_left = np.zeros(n, dtype=np.int64)  # minutes of break remaining
+    break_len = np.zeros(n, dtype=np.int64)  # length of the current/last stop
+
+    for minute in range(minutes):
+        fleet.step(tick_seconds=60)
+
+        # Start breaks, more likely the longer a driver has been at the wheel
+        p = BREAK_BASE_PROB + BREAK_PROB_PER_HOUR * (continuous / 60.0)
+        starting = (break_left == 0) & (rng.random(n) < p)
+        if starting.any():
+            break_left[starting] = rng.integers(BREAK_MINUTES[0], BREAK_MINUTES[1] + 1, starting.sum())
+            break_len[starting] = 0
+
+        on_break = break_left > 0
+        fleet.speed_kph[on_break] = 0.0
+        break_left[on_break] -= 1
+        break_len[on_break] += 1
+
+        driving = fleet.speed_kph > MOVING_KPH
+        continuous = np.where(driving, continuous + 1, continuous)
+        continuous[break_len >= BREAK_RESET_MINUTES] = 0
+        break_len[driving] = 0
+
+        fatigue = np.clip(
+            continuous / 60.0 / FATIGUE_FULL_HOURS + FATIGUE_SHIFT_WEIGHT * (minute / minutes),
+            0.0, 1.0,
+        )
+
+        ts = (shift_start + timedelta(minutes=minute)).isoformat().replace("+00:00", "Z")
+        speed = np.round(fleet.speed_kph, 2).tolist()
+        fatigue_list = np.round(fatigue, 3).tolist()
+        continuous_list = continuous.astype(int).tolist()
+        driving_list = driving.tolist()
+        break_list = on_break.tolist()
+
+        for i, meta in enumerate(pairs):
+            yield {
+                "event_id": f"hm_{meta['driver_id']}_{date_tag}_{minute:04d}",
+                "driver_id": meta["driver_id"],
+                "vehicle_id": meta["vehicle_id"],
+                "timestamp": ts,
+                "shift_minute": minute,
+                "speed_kph": speed[i],
+                "driving": driving_list[i],
+                "on_break": break_list[i],
+                "continuous_driving_min": continuous_list[i],
+                "fatigue_index": fatigue_list[i],
+            }
@@ -0,0 +1,185 @@
+"""
+simulator/jsonl_io.py
+---------------------
+Streaming JSONL reader/writer for the raw layer.
+
+Records are written from any iterable through a buffered writer, so the
+simulator never holds a full day in memory. Output can be plain JSONL,
+gzip (.jsonl.gz) or zstd (.jsonl.zst, needs the optional `zstandard`
+package). Readers pick the codec from the file suffix.
+
+Stagers quarantine records they cannot accept with write_rejects().
+"""
+
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, only needed for .jsonl.zst
+    zstandard = None
+
+# Config
+COMPRESSION_SUFFIXES = {
+    None: ".jsonl",
+    "gzip": ".jsonl.gz",
+    "zstd": ".jsonl.zst",
+}
+
+# Records buffered before each write to the underlying file
+DEFAULT_FLUSH_RECORDS = 5000
+
+# Balanced levels: raw files are regenerated often, not archived
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+# Paths
+def raw_file_path(directory, stem: str, compression: Optional[str] = None) -> Path:
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    return Path(directory) / f"{stem}{COMPRESSION_SUFFIXES[compression]}"
+
+
+def raw_files(directory) -> List[Path]:
+    """
+    All raw JSONL files in a directory, compressed or not, sorted by name.
+    """
+    directory = Path(directory)
+    files = []
+    for suffix in COMPRESSION_SUFFIXES.values():
+        files.extend(directory.glob(f"*{suffix}"))
+    return sorted(files)
+
+
+def _stem(path: Path) -> str:
+    name = path.name
+    for suffix in sorted(COMPRESSION_SUFFIXES.values(), key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return path.stem
+
+
+def remove_other_encodings(path: Path) -> None:
+    """
+    Drop copies of the same day written with a different codec, so an
+    overwrite never leaves two versions for staging to load.
+    """
+    path = Path(path)
+    stem = _stem(path)
+    for suffix in COMPRESSION_SUFFIXES.values():
+        sibling = path.with_name(stem + suffix)
+        if sibling != path and sibling.exists():
+            sibling.unlink()
+
+
+# Codecs
+def open_jsonl(path, mode: str = "r"):
+    """
+    Open a JSONL file in text mode, choosing the codec from its suffix.
+    `mode` is "r", "w" or "a" (gzip and zstd append as a new frame).
+    """
+    path = Path(path)
+    name = path.name
+
+    if name.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=GZIP_LEVEL)
+
+    if name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstd raw files need the 'zstandard' package (pip install zstandard)")
+        raw = path.open(mode + "b")
+        if mode == "r":
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+
+    return path.open(mode, encoding="utf-8")
+
+
+# Reader
+def read_jsonl(path, errors: Optional[List[Dict]] = None) -> Iterator[Dict]:
+    """
+    Yield records from a JSONL file. Malformed lines raise, unless an
+    `errors` list is given to collect them as reject entries.
+    """
+    with open_jsonl(path) as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                if errors is None:
+                    raise
+                errors.append({
+                    "reason": f"Malformed JSON: {e.msg}",
+                    "source": f"{Path(path).name}:{line_no}",
+                    "record": line.rstrip("\n"),
+                })
+
+
+# Rejects
+def reject_entry(record, error: Exception) -> Dict:
+    return {"reason": str(error) or type(error).__name__, "record": record}
+
+
+def write_rejects(path, rejects: List[Dict]) -> None:
+    """
+    Replace the quarantine file for one staging run (removed when clean).
+    """
+    path = Path(path)
+    if not rejects:
+        path.unlink(missing_ok=True)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with JsonlWriter(path, overwrite=True) as writer:
+        writer.write_all(rejects)
+
+
+# Writer
+class JsonlWriter:
+    """
+    Buffered JSONL writer. Lines are joined and written in chunks of
+    `flush_records`, instead of two f.write calls per record.
+    """
+
+    def __init__(self, path, overwrite: bool = False, flush_records: int = DEFAULT_FLUSH_RECORDS):
+        self.path = Path(path)
+        self.flush_records = max(1, flush_records)
+        self.count = 0
+        self._buffer: List[str] = []
+        self._encode = json.JSONEncoder().encode
+        self._file = open_jsonl(self.path, "w" if overwrite else "a")
+
+    def write(self, record) -> None:
+        # Pre-encoded lines (str) are written verbatim
+        self._buffer.append(record if isinstance(record, str) else self._encode(record))
+        self.count += 1
+        if len(self._buffer) >= self.flush_records:
+            self.flush()
+
+    def write_all(self, records: Iterable[Dict]) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write("\n".join(self._buffer))
+            self._file.write("\n")
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -12,17 +12,22 @@ Design principles:
 """
 
 import os
-import json
 import random
 import argparse
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
 
 from simulator.vehicle_sim import Vehicle
+from simulator.fleet_state import FleetState
+from simulator.health_stream import generate_intraday_health
+from simulator.chaos import CHAOS_PROFILES, ChaosInjector, resolve_profile
+from simulator.jsonl_io import DEFAULT_FLUSH_RECORDS, JsonlWriter, raw_file_path, remove_other_encodings
 from simulator import driver_health_sim
 from simulator import finance_sim
-from simulator.common import DRIVERS, VEHICLES, DRIVERS_MAP, VEHICLES_MAP, utc_now_iso
+from simulator.common import DRIVERS, VEHICLES, DRIVERS_MAP, VEHICLES_MAP, utc_now_iso, entity_rng, entity_seed
 
 
 # Config
@@ -32,6 +37,7 @@ RAW_ROOT = os.path.join(PROJECT_ROOT, "warehouse", "raw")
 VEHICLES_OUT = os.path.join(RAW_ROOT, "vehicles")
 HEALTH_OUT = os.path.join(RAW_ROOT, "driver_health")
 FINANCE_OUT = os.path.join(RAW_ROOT, "finance")
+HEALTH_STREAM_OUT = os.path.join(RAW_ROOT, "driver_health_intraday")
 
 DEFAULT_TELEMETRY_PER_DAY = 180
 
@@ -45,25 +51,51 @@ logging.basicConfig(
 
 # Helpers
 def ensure_dirs():
-    for path in (VEHICLES_OUT, HEALTH_OUT, FINANCE_OUT):
+    for path in (VEHICLES_OUT, HEALTH_OUT, FINANCE_OUT, HEALTH_STREAM_OUT):
         os.makedirs(path, exist_ok=True)
 
 
-def write_jsonl(path: str, records: List[dict], overwrite: bool = False):
-    mode = "w" if overwrite else "a"
-    with open(path, mode, encoding="utf-8") as f:
-        for r in records:
-            f.write(json.dumps(r))
-            f.write("\n")
+def write_jsonl(
+    directory: str,
+    date,
+    records: Iterable[Dict],
+    overwrite: bool = False,
+    compression: Optional[str] = None,
+    flush_records: int = DEFAULT_FLUSH_RECORDS,
+) -> int:
+    """
+    Stream records into the day's raw file (.jsonl, .jsonl.gz or .jsonl.zst).
+    `records` may be a generator; only `flush_records` are held at once.
+    """
+    path = raw_file_path(directory, str(date), compression)
+    if overwrite:
+        remove_other_encodings(path)
+    with JsonlWriter(path, overwrite=overwrite, flush_records=flush_records) as writer:
+        return writer.write_all(records)
+
+
+def make_meta(seed=None, **extra) -> dict:
+    """
+    Record provenance. Seeded runs carry the seed instead of a wall-clock
+    stamp so regenerated files are byte-identical.
+    """
+    stamp = {"generated_at": utc_now_iso()} if seed is None else {"seed": seed}
+    return {**stamp, **extra}
 
 
-def make_vehicle_list():
+def make_vehicle_list(n_vehicles=None):
     """
     Dynamically creates metadata for only ACTIVE vehicles.
     Pairs them with ACTIVE drivers from common.py.
+    `n_vehicles` beyond the roster adds synthetic SIM_xxxxx vehicles
+    for load testing.
     """
-    active_vehicles = VEHICLES
+    active_vehicles = list(VEHICLES)
     active_drivers = DRIVERS
+
+    if n_vehicles is not None:
+        extra = max(0, n_vehicles - len(active_vehicles))
+        active_vehicles = active_vehicles[:n_vehicles] + [f"SIM_{i:05d}" for i in range(1, extra + 1)]
     
     vehicles_meta = []
     for i, v_id in enumerate(active_vehicles):
@@ -80,10 +112,10 @@ def make_vehicle_list():
 
 
 # Generators
-def generate_vehicle_snapshots(vehicles, samples, date):
-    records = []
+def generate_vehicle_snapshots(vehicles, samples, date, seed=None) -> Iterator[Dict]:
     for idx, meta in enumerate(vehicles):
-        v = Vehicle(**meta)
+        rng = None if seed is None else entity_rng(seed, "vehicle", meta["vehicle_id"], date)
+        v = Vehicle(**meta, rng=rng)
 
         for s in range(samples):
             v.step(tick_seconds=60)
@@ -95,46 +127,72 @@ def generate_vehicle_snapshots(vehicles, samples, date):
             ) + timedelta(seconds=(12 * 3600 * s / samples))
 
             payload["timestamp"] = ts.isoformat().replace("+00:00", "Z")
-            payload["_meta"] = {
-                "generated_at": utc_now_iso(),
-                "vehicle_index": idx,
-                "sample_index": s,
-            }
-
-            records.append(payload)
+            payload["_meta"] = make_meta(seed, vehicle_index=idx, sample_index=s)
 
-    return records
+            yield payload
 
 
-def generate_health_events(drivers, date):
+def generate_vehicle_snapshots_vectorized(vehicles, samples, date, seed=None) -> Iterator[Dict]:
+    """
+    Same output shape as generate_vehicle_snapshots, but the whole fleet
+    is stepped at once by the array-backed FleetState engine.
+    """
+    rng = np.random.default_rng(None if seed is None else entity_seed(seed, "fleet", date))
+    fleet = FleetState.from_meta(vehicles, rng=rng)
+    day_start = datetime(date.year, date.month, date.day, tzinfo=timezone.utc)
+    generated_at = utc_now_iso()
+    n = len(fleet)
+
+    for s in range(samples):
+        fleet.step(tick_seconds=60)
+        fleet.inject_anomalies()
+
+        ts = day_start + timedelta(seconds=(12 * 3600 * s / samples))
+        event_ids = [f"evt_{x:016x}" for x in fleet.rng.integers(0, 2**63, n).tolist()]
+        payloads = fleet.to_payloads(ts.isoformat().replace("+00:00", "Z"), event_ids)
+
+        for idx, payload in enumerate(payloads):
+            payload["_meta"] = (
+                {"generated_at": generated_at, "vehicle_index": idx, "sample_index": s}
+                if seed is None
+                else make_meta(seed, vehicle_index=idx, sample_index=s)
+            )
+        yield from payloads
+
+
+def generate_health_events(drivers, date, seed=None):
     """Fixed: Removed n_drivers argument to match new Simulator __init__"""
     sim = driver_health_sim.DriverHealthSimulator(
         tick=60,
         mode="stdout"
     )
 
-    records = []
     for d in drivers:
-        evt = sim.simulate_shift_event(d)
+        rng = None if seed is None else entity_rng(seed, "health", d, date)
+        evt = sim.simulate_shift_event(d, rng=rng)
         evt["timestamp"] = (
             datetime(date.year, date.month, date.day, 10, tzinfo=timezone.utc)
             .isoformat()
             .replace("+00:00", "Z")
         )
-        evt["_meta"] = {"generated_at": utc_now_iso()}
-        records.append(evt)
+        evt["_meta"] = make_meta(seed)
+        yield evt
 
-    return records
 
-
-def generate_finance_events(drivers, date, trips_range):
-    records = []
+def generate_finance_events(drivers, date, trips_range, seed=None):
     for d in drivers:
-        trips = random.randint(*trips_range)
-        evt = finance_sim.generate_daily_finance(d, date, trips)
-        evt["_meta"] = {"generated_at": utc_now_iso()}
-        records.append(evt)
-    return records
+        rng = None if seed is None else entity_rng(seed, "finance", d, date)
+        trips = (rng or random).randint(*trips_range)
+        evt = finance_sim.generate_daily_finance(d, date, trips, rng=rng)
+        evt["_meta"] = make_meta(seed)
+        yield evt
+
+
+def generate_finance_events_vectorized(drivers, date, trips_range, seed=None):
+    """Whole-fleet finance for one day in a single NumPy pass."""
+    for evt in finance_sim.generate_daily_finance_batch(drivers, date, trips_range, seed):
+        evt["_meta"] = make_meta(seed)
+        yield evt
 
 
 # Orchestrator
@@ -142,42 +200,74 @@ def run_batch(
     start_date,
     days,
     telemetry_per_day,
-    overwrite
+    overwrite,
+    seed=None,
+    engine="object",
+    n_vehicles=None,
+    compression=None,
+    flush_records=DEFAULT_FLUSH_RECORDS,
+    chaos=None,
+    chaos_rates=None,
+    health_stream=False,
 ):
     ensure_dirs()
 
+    # Optional dirty-data profile (see simulator/chaos.py)
+    injector = ChaosInjector(chaos, resolve_profile(chaos, chaos_rates), seed) if chaos else None
+
+    def dirty(entity, date, records):
+        return injector.apply(entity, date, records) if injector else records
+
     # Uses the dynamic list (Buses + Cars)
-    vehicles_meta = make_vehicle_list()
+    vehicles_meta = make_vehicle_list(n_vehicles)
 
     for offset in range(days):
         date = start_date - timedelta(days=offset)
         logging.info(f"Generating data for {date}")
 
         # Vehicle Telemetry
-        write_jsonl(
-            os.path.join(VEHICLES_OUT, f"{date}.jsonl"),
-            generate_vehicle_snapshots(vehicles_meta, telemetry_per_day, date),
-            overwrite=overwrite,
-        )
+        # Seeded runs give every (entity, day) its own RNG stream, so any
+        # vehicle or driver regenerates identically in any process or order
+        samples = injector.telemetry_samples(date, telemetry_per_day) if injector else telemetry_per_day
+        if engine == "vector":
+            snapshots = generate_vehicle_snapshots_vectorized(vehicles_meta, samples, date, seed)
+        else:
+            snapshots = generate_vehicle_snapshots(vehicles_meta, samples, date, seed)
+        snapshots = dirty("vehicles", date, snapshots)
+
+        # Records stream straight to disk; memory stays flat with fleet size
+        written = write_jsonl(VEHICLES_OUT, date, snapshots, overwrite, compression, flush_records)
+        logging.info(f"Wrote {written} vehicle records")
 
         # Health Events (Uses DRIVERS constant from common)
-        write_jsonl(
-            os.path.join(HEALTH_OUT, f"{date}.jsonl"),
-            generate_health_events(DRIVERS, date),
-            overwrite=overwrite,
-        )
+        if health_stream:
+            # Minute-level stream; the warehouse rolls it up into one shift
+            # row per driver, so the daily event is not generated as well
+            intraday = generate_intraday_health(vehicles_meta, date, seed)
+            written = write_jsonl(HEALTH_STREAM_OUT, date, intraday, overwrite, compression, flush_records)
+            logging.info(f"Wrote {written} intraday health records")
+        else:
+            health = dirty("driver_health", date, generate_health_events(DRIVERS, date, seed))
+            write_jsonl(HEALTH_OUT, date, health, overwrite, compression, flush_records)
 
         # Finance Summaries
-        write_jsonl(
-            os.path.join(FINANCE_OUT, f"{date}.jsonl"),
-            generate_finance_events(DRIVERS, date, (5, 15)),
-            overwrite=overwrite,
-        )
+        if engine == "vector":
+            finance = generate_finance_events_vectorized(DRIVERS, date, (5, 15), seed)
+        else:
+            finance = generate_finance_events(DRIVERS, date, (5, 15), seed)
+        finance = dirty("finance", date, finance)
+        write_jsonl(FINANCE_OUT, date, finance, overwrite, compression, flush_records)
+
+    if injector:
+        # Late records land in the newest day's file, after every day was written
+        for entity, out_dir in (("vehicles", VEHICLES_OUT), ("driver_health", HEALTH_OUT), ("finance", FINANCE_OUT)):
+            write_jsonl(out_dir, start_date, injector.drain_late(entity, start_date), False, compression, flush_records)
+        injector.write_manifest(start_date=str(start_date), days=days)
 
     logging.info(f"Batch run complete. Processed {len(vehicles_meta)} active vehicles.")
 
 # CLI
-def parse_args():
+def parse_args(argv=None):
     p = argparse.ArgumentParser(description="FleetIntel360 batch simulator")
     p.add_argument(
         "--start-date", 
@@ -187,12 +277,40 @@ def parse_args():
     p.add_argument("--days", type=int, default=1)
     p.add_argument("--telemetry-per-day", type=int, default=180)
     p.add_argument("--overwrite", action="store_true")
+    p.add_argument("--seed", type=int, default=None, help="seed for byte-identical, per-entity reproducible output")
+    p.add_argument(
+        "--engine",
+        choices=["object", "vector"],
+        default="object",
+        help="engine: per-object models, or array-backed FleetState and batch finance",
+    )
+    p.add_argument("--vehicles", type=int, default=None, help="fleet size (adds synthetic vehicles beyond the roster)")
+    p.add_argument(
+        "--compression",
+        choices=["none", "gzip", "zstd"],
+        default="none",
+        help="raw file codec (.jsonl, .jsonl.gz or .jsonl.zst; zstd needs 'zstandard')",
+    )
+    p.add_argument("--flush-records", type=int, default=DEFAULT_FLUSH_RECORDS, help="records buffered per write")
+    p.add_argument(
+        "--health-stream",
+        action="store_true",
+        help="minute-level driver health (rolled up per shift) instead of one daily event",
+    )
+    p.add_argument("--chaos", choices=list(CHAOS_PROFILES), default=None, help="inject dirty data and write a ground-truth manifest")
+    p.add_argument(
+        "--chaos-rate",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="override one chaos rate, e.g. duplicate_rate=0.1 (repeatable)",
+    )
 
-    return p.parse_args()
+    return p.parse_args(argv)
 
 
-def main():
-    args = parse_args()
+def main(argv=None):
+    args = parse_args(argv)
 
     # Convert the string date from CLI into a date object
     start_dt = datetime.fromisoformat(args.start_date).date()
@@ -202,6 +320,14 @@ def main():
         days=args.days,
         telemetry_per_day=args.telemetry_per_day,
         overwrite=args.overwrite,
+        seed=args.seed,
+        engine=args.engine,
+        n_vehicles=args.vehicles,
+        compression=None if args.compression == "none" else args.compression,
+        flush_records=args.flush_records,
+        chaos=args.chaos,
+        health_stream=args.health_stream,
+        chaos_rates={k: float(v) for k, v in (item.split("=", 1) for item in args.chaos_rate)},
     )
 
 if __name__ == "__main__":
@@ -6,31 +6,37 @@ simulator/vehicle_sim.py
 Multi-vehicle telematics simulator.
 
 Features:
-- Simulates N vehicles producing telemetry every `tick` seconds.
+- Simulates N vehicles producing telemetry every `tick` seconds, all driven
+  by one asyncio event loop (timer-wheel scheduler, jittered ticks).
 - Movement: simple route-following (if route provided) or random walk.
 - Injects realistic anomalies with configurable probabilities:
     - engine overheat spike
     - fuel siphon (sudden drop)
     - tyre leak (per wheel)
     - harsh braking
-- Replay buffer per vehicle (last N samples) kept in memory for use by processors.
-- Publishes JSON payloads to:
-    - MQTT broker (default)
+- Compact per-vehicle state (__slots__, typed arrays) with a replay ring
+  of the last N speeds for harsh-brake detection.
+- Publishes payloads to:
+    - MQTT broker (default): one JSON event per message on --topic, or
+      NDJSON batches on --batch-topic when given
+    - a TCP socket (mode=tcp), e.g. the streaming ingest consumer
     - or STDOUT (mode=stdout) for demo without broker
+  TCP and STDOUT are written as batched NDJSON.
+- Reports achieved vs target event rate.
 - Configurable via command-line args or environment variables.
 """
 
 import argparse
+import asyncio
 import json
 import math
 import random
-import threading
+import sys
 import time
-import uuid
-from collections import deque
+from array import array
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
-from simulator.common import safe_rand_int
+from simulator.common import safe_rand_int, generate_id
 
 
 try:
@@ -41,10 +47,20 @@ except Exception:
 # Configurable defaults
 DEFAULT_BROKER = "localhost"
 DEFAULT_TOPIC = "fleet/telemetry"
+# Opt-in topic for NDJSON batches; DEFAULT_TOPIC keeps one event per message
+DEFAULT_BATCH_TOPIC = "fleet/telemetry/batch"
 DEFAULT_VEHICLE_COUNT = 6
 DEFAULT_TICK = 1.0  # seconds
+DEFAULT_TCP_PORT = 9009
+DEFAULT_JITTER = 0.2  # +/- fraction of tick, so vehicles don't align
+WHEEL_RESOLUTION = 0.01  # seconds per timer-wheel slot
+MAX_BATCH_EVENTS = 500  # payloads per published NDJSON message
+REPORT_INTERVAL = 10.0  # seconds between rate reports
 REPLAY_BUFFER_SIZE = 30  # last N telemetry records to keep in memory
 
+# Fixed wheel order for the tyre pressure arrays
+TIRE_POSITIONS = ("FL", "FR", "RL", "RR")
+
 # anomaly probabilities per tick (tweakable)
 ANOMALY_PROBS = {
     "overheat_spike": 0.001,     # 0.1% per tick
@@ -64,31 +80,74 @@ def utc_iso_ts() -> str:
 def clamp(v, lo, hi):
     return max(lo, min(hi, v))
 
+class SpeedRing:
+    """
+    Fixed-size ring of recent speeds, stored as raw doubles.
+    Replaces a deque of full payload dicts; harsh-brake detection only
+    ever needs the previous speed.
+    """
+    __slots__ = ("_values", "_next", "_size")
+
+    def __init__(self, capacity: int = REPLAY_BUFFER_SIZE):
+        self._values = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def append(self, value: float):
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        self._size = min(self._size + 1, len(self._values))
+
+    def last(self) -> float:
+        if not self._size:
+            raise IndexError("empty ring")
+        return self._values[self._next - 1]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        """Oldest to newest."""
+        capacity = len(self._values)
+        start = (self._next - self._size) % capacity
+        for i in range(self._size):
+            yield self._values[(start + i) % capacity]
+
 # Vehicle model
 class Vehicle:
-    def __init__(self, vehicle_id: str, driver_id: str, lat: float, lon: float):
+    # No per-instance __dict__; thousands of live vehicles stay small
+    __slots__ = (
+        "vehicle_id", "driver_id", "lat", "lon", "seeded", "rng",
+        "speed_kph", "heading_deg", "engine_temp_c", "battery_v", "tire_psi", "fuel_percent",
+        "replay", "_overheat_until", "_tyre_leak_until",
+    )
+
+    def __init__(self, vehicle_id: str, driver_id: str, lat: float, lon: float,
+                 rng: Optional[random.Random] = None):
         self.vehicle_id = vehicle_id
         self.driver_id = driver_id
         self.lat = lat
         self.lon = lon
-        self.speed_kph = random.uniform(20, 60)
-        self.heading_deg = random.uniform(0, 360)
-        self.engine_temp_c = random.uniform(75, 95)
-        self.battery_v = random.uniform(12.0, 12.8)
-        self.tire_psi = {"FL": random.uniform(30, 34),
-                         "FR": random.uniform(30, 34),
-                         "RL": random.uniform(30, 34),
-                         "RR": random.uniform(30, 34)}
-        self.fuel_percent = random.uniform(50, 100)
-        self.replay = deque(maxlen=REPLAY_BUFFER_SIZE)
+        # Per-vehicle stream (see common.entity_rng); global random when unseeded
+        self.seeded = rng is not None
+        self.rng = rng or random
+        rng = self.rng
+        self.speed_kph = rng.uniform(20, 60)
+        self.heading_deg = rng.uniform(0, 360)
+        self.engine_temp_c = rng.uniform(75, 95)
+        self.battery_v = rng.uniform(12.0, 12.8)
+        # Tyre pressures in TIRE_POSITIONS order
+        self.tire_psi = array("d", (rng.uniform(30, 34) for _ in TIRE_POSITIONS))
+        self.fuel_percent = rng.uniform(50, 100)
+        self.replay = SpeedRing(REPLAY_BUFFER_SIZE)
         # state flags to make anomalies persist a bit
         self._overheat_until = 0.0
-        self._tyre_leak_until = {k: 0.0 for k in self.tire_psi.keys()}
+        self._tyre_leak_until = array("d", bytes(8 * len(TIRE_POSITIONS)))
 
     def step(self, tick_seconds: float = 1.0):
         """Advance the vehicle state by one tick."""
         # random small heading change
-        self.heading_deg = (self.heading_deg + random.uniform(-3, 3)) % 360
+        self.heading_deg = (self.heading_deg + self.rng.uniform(-3, 3)) % 360
 
         # movement distance (approx): kph -> degrees delta (very rough)
         # NOTE: this is just for visualization; it's not high-precision geo sim.
@@ -100,18 +159,18 @@ class Vehicle:
         self.lon += dlon
 
         # small speed drift
-        self.speed_kph += random.uniform(-3, 3)
+        self.speed_kph += self.rng.uniform(-3, 3)
         self.speed_kph = clamp(self.speed_kph, SPEED_MIN, SPEED_MAX)
 
         # engine temp random walk (cooling if stopped)
         if self.speed_kph > 5:
-            self.engine_temp_c += random.uniform(-0.2, 0.7)
+            self.engine_temp_c += self.rng.uniform(-0.2, 0.7)
         else:
-            self.engine_temp_c += random.uniform(-0.5, 0.2)
+            self.engine_temp_c += self.rng.uniform(-0.5, 0.2)
         self.engine_temp_c = clamp(self.engine_temp_c, 60.0, 140.0)
 
         # battery slow drift
-        self.battery_v += random.uniform(-0.01, 0.01)
+        self.battery_v += self.rng.uniform(-0.01, 0.01)
         self.battery_v = clamp(self.battery_v, 11.0, 13.0)
 
         # fuel consumption depends on speed
@@ -119,56 +178,56 @@ class Vehicle:
         self.fuel_percent = clamp(self.fuel_percent, 0.0, 100.0)
 
         # tire slow leakage
-        for k in self.tire_psi.keys():
-            self.tire_psi[k] += random.uniform(-0.02, 0.02)
-            self.tire_psi[k] = clamp(self.tire_psi[k], 18.0, 40.0)
+        tires = self.tire_psi
+        for k in range(len(tires)):
+            tires[k] = clamp(tires[k] + self.rng.uniform(-0.02, 0.02), 18.0, 40.0)
 
     def inject_anomalies(self):
         """Randomly inject anomalies based on configured probabilities."""
         now = time.time()
         # Overheat spike (temporary high temp)
-        if random.random() < ANOMALY_PROBS["overheat_spike"]:
-            spike = random.uniform(12.0, 28.0)
+        if self.rng.random() < ANOMALY_PROBS["overheat_spike"]:
+            spike = self.rng.uniform(12.0, 28.0)
             self.engine_temp_c += spike
-            self._overheat_until = now + random.uniform(10, 60)  # lasts a bit
+            self._overheat_until = now + self.rng.uniform(10, 60)  # lasts a bit
             # print debug
             # print(f"[ANOMALY] {self.vehicle_id} overheat spike +{spike:.1f}C")
 
         # Fuel siphon: sudden large drop
-        if random.random() < ANOMALY_PROBS["fuel_siphon"]:
-            drop = random.uniform(6.0, 22.0)
+        if self.rng.random() < ANOMALY_PROBS["fuel_siphon"]:
+            drop = self.rng.uniform(6.0, 22.0)
             self.fuel_percent = clamp(self.fuel_percent - drop, 0.0, 100.0)
 
         # Tyre leak on a random wheel
-        if random.random() < ANOMALY_PROBS["tyre_leak"]:
-            wheel = random.choice(list(self.tire_psi.keys()))
-            leak_drop = random.uniform(3.0, 8.0)
+        if self.rng.random() < ANOMALY_PROBS["tyre_leak"]:
+            wheel = self.rng.choice(range(len(TIRE_POSITIONS)))
+            leak_drop = self.rng.uniform(3.0, 8.0)
             self.tire_psi[wheel] = clamp(self.tire_psi[wheel] - leak_drop, 10.0, 40.0)
-            self._tyre_leak_until[wheel] = now + random.uniform(60, 3600)  # leak persists
+            self._tyre_leak_until[wheel] = now + self.rng.uniform(60, 3600)  # leak persists
             # print(f"[ANOMALY] {self.vehicle_id} tyre leak {wheel} -{leak_drop:.1f}psi")
 
         # Harsh braking event: sudden speed drop
-        if random.random() < ANOMALY_PROBS["harsh_brake"]:
-            drop_pct = random.uniform(0.2, 0.7)  # fraction of speed lost instantly
+        if self.rng.random() < ANOMALY_PROBS["harsh_brake"]:
+            drop_pct = self.rng.uniform(0.2, 0.7)  # fraction of speed lost instantly
             prev_speed = self.speed_kph
             self.speed_kph = max(0.0, self.speed_kph * (1 - drop_pct))
             # embed a temporary "brake_force" marker in the next payload by manipulating heading a bit
             # print(f"[ANOMALY] {self.vehicle_id} harsh brake {prev_speed:.1f} -> {self.speed_kph:.1f} kph")
 
-    def to_payload(self) -> Dict:
+    def to_payload(self, timestamp: Optional[str] = None) -> Dict:
         """Construct JSON payload for this vehicle at current state."""
         payload = {
-            "event_id": f"evt_{uuid.uuid4().hex[:10]}",
+            "event_id": generate_id("evt", self.rng if self.seeded else None),
             "vehicle_id": self.vehicle_id,
             "driver_id": self.driver_id,
-            "timestamp": utc_iso_ts(),
+            "timestamp": timestamp or utc_iso_ts(),
             "lat": round(self.lat, 6),
             "lon": round(self.lon, 6),
             "speed_kph": round(self.speed_kph, 2),
             "heading": round(self.heading_deg, 2),
             "engine_temp_c": round(self.engine_temp_c, 2),
             "battery_v": round(self.battery_v, 2),
-            "tire_psi": {k: round(v, 2) for k, v in self.tire_psi.items()},
+            "tire_psi": {k: round(v, 2) for k, v in zip(TIRE_POSITIONS, self.tire_psi)},
             "fuel_percent": round(self.fuel_percent, 2),
             # a simple derived field (speed zone not implemented here; consumer can enrich with polygons)
             "speed_zone_kph": 50,
@@ -179,16 +238,41 @@ class Vehicle:
 
 # Simulator Engine
 class Simulator:
-    def __init__(self, n_vehicles: int, broker: str, topic: str, mode: str, tick: float, start_lat: float = 6.45, start_lon: float = 3.39):
+    """
+    Drives every vehicle from a single asyncio event loop.
+
+    Vehicles sit in a timer wheel: a ring of slots WHEEL_RESOLUTION seconds
+    wide. Each slot fires once per revolution, steps the vehicles due in it,
+    and publishes their payloads as one NDJSON batch. A vehicle is then
+    re-filed `tick` +/- jitter seconds ahead, so scheduling costs O(1) per
+    event and no OS thread is needed per vehicle.
+    """
+
+    def __init__(self, n_vehicles: int, broker: str, topic: str, mode: str, tick: float,
+                 start_lat: float = 6.45, start_lon: float = 3.39, jitter: float = DEFAULT_JITTER,
+                 port: int = DEFAULT_TCP_PORT, seed: Optional[int] = None, batch_topic: Optional[str] = None):
         self.n = n_vehicles
         self.broker = broker
+        self.port = port
         self.topic = topic
-        self.mode = mode  # 'mqtt' or 'stdout'
+        self.batch_topic = batch_topic
+        self.mode = mode  # 'mqtt', 'tcp' or 'stdout'
         self.tick = tick
+        self.jitter = max(0.0, min(jitter, 0.9))
+        self.rng = random.Random(seed)
         self.vehicles: List[Vehicle] = []
-        self.threads: List[threading.Thread] = []
-        self.stop_event = threading.Event()
         self._init_vehicles(start_lat, start_lon)
+
+        # Wheel must span the longest jittered delay
+        self.resolution = min(WHEEL_RESOLUTION, tick)
+        self.n_slots = int(math.ceil(tick * (1 + self.jitter) / self.resolution)) + 1
+        self.wheel: List[List[Vehicle]] = [[] for _ in range(self.n_slots)]
+
+        self.events_sent = 0
+        self.batches_sent = 0
+        self.max_lag = 0.0
+        self._stopping = False
+        self._tcp_writer = None
         self.mqtt_client = None
         if self.mode == "mqtt":
             if mqtt is None:
@@ -198,86 +282,175 @@ class Simulator:
             # run network loop in a background thread
             self.mqtt_client.loop_start()
 
-def _init_vehicles(self, start_lat: float, start_lon: float):
-    from simulator.common import VEHICLES, DRIVERS
-    
-    # Pair active vehicles with active drivers
-    for i, v_id in enumerate(VEHICLES):
-        # Safety: Does not go out of index if more vehicles than drivers
-        d_id = DRIVERS[i % len(DRIVERS)] 
-        
-        lat = start_lat + (i * 0.0012)
-        lon = start_lon + (i * 0.0015)
-        v = Vehicle(vehicle_id=v_id, driver_id=d_id, lat=lat, lon=lon)
-        self.vehicles.append(v)
-
-    def _publish(self, payload: Dict):
-        if self.mode == "mqtt":
-            self.mqtt_client.publish(self.topic, json.dumps(payload))
-        elif self.mode == "stdout":
-            print(json.dumps(payload, default=str), flush=True)
+    @property
+    def target_rate(self) -> float:
+        return len(self.vehicles) / self.tick
+
+    def _init_vehicles(self, start_lat: float, start_lon: float):
+        from simulator.common import VEHICLES, DRIVERS
+
+        # Roster vehicles first, then synthetic SIM_xxxxx ones up to n
+        vehicle_ids = list(VEHICLES)[:self.n]
+        vehicle_ids += [f"SIM_{i:05d}" for i in range(1, self.n - len(vehicle_ids) + 1)]
+
+        # Pair vehicles with active drivers
+        for i, v_id in enumerate(vehicle_ids):
+            # Safety: Does not go out of index if more vehicles than drivers
+            d_id = DRIVERS[i % len(DRIVERS)]
+
+            lat = start_lat + (i * 0.0012)
+            lon = start_lon + (i * 0.0015)
+            v = Vehicle(vehicle_id=v_id, driver_id=d_id, lat=lat, lon=lon)
+            self.vehicles.append(v)
+
+    # Scheduling
+    def _schedule(self, vehicle: Vehicle, current_slot: int, delay: float):
+        offset = max(1, int(round(delay / self.resolution)))
+        self.wheel[(current_slot + offset) % self.n_slots].append(vehicle)
+
+    def _next_delay(self) -> float:
+        return self.tick * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _sample(self, vehicle: Vehicle, timestamp: str) -> Dict:
+        """Advance one vehicle and build its payload."""
+        # step state
+        vehicle.step(tick_seconds=self.tick)
+        # maybe inject anomalies
+        vehicle.inject_anomalies()
+
+        # create payload
+        payload = vehicle.to_payload(timestamp)
+
+        # attach a "brake_force" synthetic field when immediate large decel from previous replay item
+        # compare last replay if exists
+        if vehicle.replay:
+            prev_speed = vehicle.replay.last()
+            # compute decel
+            payload["harsh_brake"] = prev_speed - payload["speed_kph"] > max(8.0, prev_speed * 0.25)
         else:
-            # future: implement pubsub/http
-            print(json.dumps(payload, default=str), flush=True)
-
-    def _vehicle_loop(self, vehicle: Vehicle):
-        """Loop for single vehicle."""
-        while not self.stop_event.is_set():
-            # step state
-            vehicle.step(tick_seconds=self.tick)
-            # maybe inject anomalies
-            vehicle.inject_anomalies()
-
-            # create payload
-            payload = vehicle.to_payload()
-
-            # attach a "brake_force" synthetic field when immediate large decel from previous replay item
-            # compare last replay if exists
-            if vehicle.replay:
-                last = vehicle.replay[-1]
-                prev_speed = last.get("speed_kph", vehicle.speed_kph)
-                # compute decel
-                if prev_speed - payload["speed_kph"] > max(8.0, prev_speed * 0.25):
-                    payload["harsh_brake"] = True
-                else:
-                    payload["harsh_brake"] = False
-            else:
-                payload["harsh_brake"] = False
+            payload["harsh_brake"] = False
 
-            # append to replay buffer
-            vehicle.replay.append(payload)
+        # append to replay buffer (speed only)
+        vehicle.replay.append(payload["speed_kph"])
+        return payload
 
-            # publish
-            self._publish(payload)
+    # Publishing
+    async def _connect(self):
+        if self.mode == "tcp":
+            _, self._tcp_writer = await asyncio.open_connection(self.broker, self.port)
+
+    async def _publish(self, payloads: List[Dict]):
+        """
+        Publish payloads as NDJSON messages of at most MAX_BATCH_EVENTS lines.
+        MQTT without a batch topic sends one event per message, as subscribers
+        of the telemetry topic expect.
+        """
+        if self.mode == "mqtt" and not self.batch_topic:
+            for p in payloads:
+                self.mqtt_client.publish(self.topic, json.dumps(p, default=str))
+            self.events_sent += len(payloads)
+            self.batches_sent += len(payloads)
+            return
+
+        for start in range(0, len(payloads), MAX_BATCH_EVENTS):
+            chunk = payloads[start:start + MAX_BATCH_EVENTS]
+            body = "\n".join(json.dumps(p, default=str) for p in chunk) + "\n"
+
+            if self.mode == "mqtt":
+                self.mqtt_client.publish(self.batch_topic, body)
+            elif self.mode == "tcp":
+                self._tcp_writer.write(body.encode())
+                # backpressure: wait if the consumer falls behind
+                await self._tcp_writer.drain()
+            else:
+                # future: implement pubsub/http
+                sys.stdout.write(body)
+                sys.stdout.flush()
+
+            self.events_sent += len(chunk)
+            self.batches_sent += 1
 
-            # tiny random jitter so not all vehicles align perfectly
-            time.sleep(self.tick + random.uniform(-0.2 * self.tick, 0.2 * self.tick))
+    # Main loop
+    async def run(self, duration: Optional[float] = None):
+        await self._connect()
 
-    def start(self):
+        # Spread first ticks evenly across one revolution
         for v in self.vehicles:
-            t = threading.Thread(target=self._vehicle_loop, args=(v,), daemon=True)
-            self.threads.append(t)
-            t.start()
-        print(f"[SIM] started {len(self.vehicles)} vehicle threads. mode={self.mode}, tick={self.tick}s, topic={self.topic}")
+            self._schedule(v, 0, self.rng.uniform(0, self.tick))
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        last_report, last_count = started, 0
+        slot = 0
+
+        print(f"[SIM] started {len(self.vehicles)} vehicles on one event loop. mode={self.mode}, tick={self.tick}s, "
+              f"target={self.target_rate:,.0f} events/s, topic={self.batch_topic or self.topic}", file=sys.stderr)
+
+        while not self._stopping:
+            due = started + slot * self.resolution
+            now = loop.time()
+            if due > now:
+                await asyncio.sleep(due - now)
+            else:
+                # Running behind: record lag and still yield to the loop
+                self.max_lag = max(self.max_lag, now - due)
+                await asyncio.sleep(0)
+
+            index = slot % self.n_slots
+            bucket, self.wheel[index] = self.wheel[index], []
+            if bucket:
+                timestamp = utc_iso_ts()
+                payloads = [self._sample(v, timestamp) for v in bucket]
+                for v in bucket:
+                    self._schedule(v, slot, self._next_delay())
+                await self._publish(payloads)
+
+            slot += 1
+
+            now = loop.time()
+            if now - last_report >= REPORT_INTERVAL:
+                self._report(self.events_sent - last_count, now - last_report)
+                last_report, last_count = now, self.events_sent
+            if duration is not None and now - started >= duration:
+                break
+
+        self._report(self.events_sent, loop.time() - started, final=True)
+        if self._tcp_writer is not None:
+            self._tcp_writer.close()
+            await self._tcp_writer.wait_closed()
+
+    def _report(self, events: int, elapsed: float, final: bool = False):
+        achieved = events / elapsed if elapsed > 0 else 0.0
+        label = "total" if final else "rate"
+        print(f"[SIM] {label}: {achieved:,.0f} events/s achieved vs {self.target_rate:,.0f} target "
+              f"({achieved / self.target_rate:.0%}) | {self.events_sent:,} events in {self.batches_sent:,} messages | "
+              f"max lag {self.max_lag * 1000:.0f} ms", file=sys.stderr)
+
+    def start(self, duration: Optional[float] = None):
+        """Run the event loop until stop(), Ctrl-C or `duration` seconds."""
+        asyncio.run(self.run(duration))
 
     def stop(self):
-        self.stop_event.set()
-        # allow threads to exit
-        for t in self.threads:
-            t.join(timeout=1.0)
+        self._stopping = True
         if self.mqtt_client:
             self.mqtt_client.loop_stop()
             self.mqtt_client.disconnect()
-        print("[SIM] stopped simulator.")
+        print("[SIM] stopped simulator.", file=sys.stderr)
 
 # CLI
 def parse_args():
     p = argparse.ArgumentParser(description="Multi-vehicle telematics simulator")
     p.add_argument("--vehicles", "-n", type=int, default=DEFAULT_VEHICLE_COUNT, help="number of vehicles to simulate")
-    p.add_argument("--broker", type=str, default=DEFAULT_BROKER, help="MQTT broker host (ignored in stdout mode)")
+    p.add_argument("--broker", type=str, default=DEFAULT_BROKER, help="MQTT broker / TCP host (ignored in stdout mode)")
+    p.add_argument("--port", type=int, default=DEFAULT_TCP_PORT, help="TCP port (mode=tcp)")
     p.add_argument("--topic", type=str, default=DEFAULT_TOPIC, help="MQTT topic to publish telemetry")
-    p.add_argument("--mode", type=str, default="mqtt", choices=["mqtt", "stdout"], help="publish mode: mqtt or stdout")
+    p.add_argument("--batch-topic", type=str, nargs="?", const=DEFAULT_BATCH_TOPIC, default=None,
+                   help=f"publish NDJSON batches to this MQTT topic instead (default {DEFAULT_BATCH_TOPIC})")
+    p.add_argument("--mode", type=str, default="mqtt", choices=["mqtt", "tcp", "stdout"], help="publish mode: mqtt, tcp or stdout")
     p.add_argument("--tick", type=float, default=DEFAULT_TICK, help="seconds between telemetry ticks (per vehicle)")
+    p.add_argument("--jitter", type=float, default=DEFAULT_JITTER, help="+/- fraction of tick added to each interval")
+    p.add_argument("--duration", type=float, default=None, help="stop after this many seconds (default: run forever)")
+    p.add_argument("--seed", type=int, default=None, help="seed for tick phases and jitter")
     p.add_argument("--start-lat", type=float, default=6.45, help="starting latitude for first vehicle")
     p.add_argument("--start-lon", type=float, default=3.39, help="starting longitude for first vehicle")
     return p.parse_args()
@@ -285,14 +458,15 @@ def parse_args():
 def main():
     args = parse_args()
     sim = Simulator(n_vehicles=args.vehicles, broker=args.broker, topic=args.topic, mode=args.mode, tick=args.tick,
-                    start_lat=args.start_lat, start_lon=args.start_lon)
+                    start_lat=args.start_lat, start_lon=args.start_lon, jitter=args.jitter, port=args.port,
+                    seed=args.seed, batch_topic=args.batch_topic)
     try:
-        sim.start()
-        # run until interrupted
-        while True:
-            time.sleep(1.0)
+        sim.start(duration=args.duration)
     except KeyboardInterrupt:
-        print("\n[SIM] KeyboardInterrupt received. Shutting down...")
+        print("\n[SIM] KeyboardInterrupt received. Shutting down...", file=sys.stderr)
+    except BrokenPipeError:
+        # stdout consumer went away (e.g. piped into `head`)
+        print("[SIM] output closed. Shutting down...", file=sys.stderr)
     finally:
         sim.stop()
 
@@ -0,0 +1,431 @@
+# slack_delivery.py
+"""
+Asynchronous Slack webhook delivery.
+
+Alert payloads go through a bounded queue to a few sender tasks that share
+one pooled HTTP session (requests, run on a small thread pool so the event
+loop never blocks):
+
+- each webhook URL has a token bucket (Slack allows about one message per
+  second per webhook, with short bursts)
+- 429s wait for Retry-After; 5xx and connection errors retry with
+  exponential backoff and jitter
+- anything that still fails, or is rejected outright (other 4xx), is
+  appended to the dead-letter file with the payload, for --replay
+
+Usage:
+    python slack_delivery.py --replay           # resend dead-lettered payloads
+    python slack_delivery.py --stub --port 8765  # local stand-in webhook server
+    python slack_delivery.py --bench -n 200      # deliver against the stub and report
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from warehouse.snapshots import ANALYTICS_DIR
+
+# Config
+DEAD_LETTER_PATH = ANALYTICS_DIR / "slack_dead_letter.jsonl"
+
+DEFAULT_RATE = 1.0  # messages per second per webhook
+DEFAULT_BURST = 3
+DEFAULT_WORKERS = 4  # concurrent sends (and pooled connections)
+DEFAULT_QUEUE_SIZE = 100  # producers wait beyond this
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.5  # seconds, doubled per attempt
+BACKOFF_MAX = 30.0
+TIMEOUT = (3.05, 10)  # connect, read (s)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_STUB_PORT = 8765
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+
+# Rate limiting
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header, which is either a number of
+    seconds or an HTTP date. None when missing or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def penalize(self, seconds: float) -> None:
+        """Slack said slow down: no tokens for `seconds`."""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+# Client
+class SlackDelivery:
+    """
+    Queue-backed webhook sender. Use as `async with SlackDelivery(url) as slack:`
+    and `await slack.send(payload)`; leaving the block waits for the queue
+    to drain. `stats` counts sent, retried and dead-lettered messages.
+    """
+
+    def __init__(
+        self,
+        webhook_url: Optional[str],
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        dead_letter_path: Path = DEAD_LETTER_PATH,
+    ):
+        self.webhook_url = webhook_url
+        self.rate = rate
+        self.burst = burst
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.max_attempts = max(1, max_attempts)
+        self.dead_letter_path = Path(dead_letter_path)
+        self.stats = {"sent": 0, "retried": 0, "dead_lettered": 0}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._dead_letter_lock = threading.Lock()
+
+    async def __aenter__(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="slack")
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self.started = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                await self.queue.join()
+        finally:
+            for task in self.tasks:
+                task.cancel()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+            self.pool.shutdown(wait=True)
+            self.session.close()
+
+    async def send(self, payload: Dict, webhook_url: Optional[str] = None) -> None:
+        """Queue one message (waits while the queue is full)."""
+        url = webhook_url or self.webhook_url
+        if not url:
+            raise ValueError("No Slack webhook URL configured")
+        await self.queue.put((url, payload))
+
+    def _bucket(self, url: str) -> TokenBucket:
+        if url not in self._buckets:
+            self._buckets[url] = TokenBucket(self.rate, self.burst)
+        return self._buckets[url]
+
+    def _post(self, url: str, payload: Dict) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+        """(status, Retry-After, error) of one POST; runs on the thread pool."""
+        import requests
+
+        try:
+            response = self.session.post(url, json=payload, timeout=TIMEOUT)
+        except requests.RequestException as e:
+            return None, None, str(e)
+        return response.status_code, response.headers.get("Retry-After"), response.text[:200]
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            url, payload = await self.queue.get()
+            try:
+                await self._deliver(loop, url, payload)
+            except Exception as e:  # never lose a message to a bug in the retry path
+                self._dead_letter(url, payload, None, f"{type(e).__name__}: {e}", 0)
+            finally:
+                self.queue.task_done()
+
+    async def _deliver(self, loop, url: str, payload: Dict) -> None:
+        bucket = self._bucket(url)
+        status, error = None, None
+        for attempt in range(1, self.max_attempts + 1):
+            await bucket.acquire()
+            status, retry_after, error = await loop.run_in_executor(self.pool, self._post, url, payload)
+            if status is not None and status < 300:
+                self.stats["sent"] += 1
+                return
+            if status is not None and status not in RETRY_STATUSES:
+                break  # bad payload or revoked webhook; retrying will not help
+            if attempt == self.max_attempts:
+                break
+
+            delay = retry_after_seconds(retry_after) if status == 429 else None
+            if delay is not None:
+                bucket.penalize(delay)
+            else:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+            self.stats["retried"] += 1
+            logger.warning("Slack send failed (%s); retry %s/%s in %.1fs",
+                           status or error, attempt, self.max_attempts - 1, delay)
+            await asyncio.sleep(delay)
+
+        self._dead_letter(url, payload, status, error, attempt)
+
+    def _dead_letter(self, url: str, payload: Dict, status: Optional[int], error: Optional[str], attempts: int) -> None:
+        entry = {
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "webhook_url": url,
+            "status": status,
+            "error": error,
+            "attempts": attempts,
+            "payload": payload,
+        }
+        with self._dead_letter_lock:
+            self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.dead_letter_path.open("a") as f:
+                f.write(json.dumps(entry))
+                f.write("\n")
+        self.stats["dead_lettered"] += 1
+        logger.error("Slack message dead-lettered after %s attempt(s): %s (see %s)",
+                     attempts, status or error, self.dead_letter_path)
+
+
+def deliver(payloads: Iterable, webhook_url: Optional[str], **options) -> Dict[str, int]:
+    """
+    Send every payload (or (payload, webhook_url) pair) and wait for the
+    queue to drain. Returns the delivery stats.
+    """
+    async def _run():
+        async with SlackDelivery(webhook_url, **options) as slack:
+            for item in payloads:
+                payload, url = item if isinstance(item, tuple) else (item, None)
+                await slack.send(payload, url)
+        return slack.stats
+
+    return asyncio.run(_run())
+
+
+def upload_file(path: Path, token: str, channel: str, title: str) -> None:
+    """
+    Attach a file to `channel` through the Web API (incoming webhooks cannot
+    carry files). Needs slack_sdk and a bot token with files:write.
+    """
+    try:
+        from slack_sdk import WebClient
+    except ImportError:
+        raise RuntimeError("slack_sdk is not installed but a file upload was requested. pip install slack_sdk")
+
+    WebClient(token=token, timeout=TIMEOUT[1]).files_upload_v2(channel=channel, file=str(path), title=title)
+
+
+def replay_dead_letters(path: Path = DEAD_LETTER_PATH, **options) -> Dict[str, int]:
+    """
+    Resend dead-lettered payloads to their webhooks; failures are dead-lettered again.
+    The file is moved aside to `<path>.replaying` first and only deleted once
+    the resend has finished, so an interrupted replay loses nothing: the next
+    replay picks the leftover file up again.
+    """
+    path = Path(path)
+    replaying = path.with_name(path.name + ".replaying")
+    if path.exists():
+        if replaying.exists():
+            # An earlier replay was interrupted; resend its entries as well
+            with replaying.open("a") as f:
+                f.write(path.read_text())
+            path.unlink()
+        else:
+            os.replace(path, replaying)
+    if not replaying.exists():
+        logger.info("No dead letters at %s", path)
+        return {"sent": 0, "retried": 0, "dead_lettered": 0}
+
+    entries = [json.loads(line) for line in replaying.read_text().splitlines() if line.strip()]
+    logger.info("Replaying %s dead-lettered message(s)", len(entries))
+    stats = deliver([(e["payload"], e["webhook_url"]) for e in entries], None, dead_letter_path=path, **options)
+    replaying.unlink()
+    return stats
+
+
+# Stub webhook
+class StubWebhook:
+    """
+    Local stand-in for a Slack webhook: answers 429 (with Retry-After) above
+    `rate` messages per second and 500 for a `fail_rate` share of requests.
+    `fail_rate` and `retry_after` can be changed while it is serving.
+    """
+
+    def __init__(self, port: int = DEFAULT_STUB_PORT, rate: float = DEFAULT_RATE,
+                 burst: int = DEFAULT_BURST, fail_rate: float = 0.0, retry_after: str = "1"):
+        self.received: List[Dict] = []
+        self.rejected = {429: 0, 500: 0}
+        self.fail_rate = fail_rate
+        self.retry_after = retry_after
+        stub = self
+        tokens = {"value": float(burst), "at": time.monotonic()}
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with lock:
+                    now = time.monotonic()
+                    tokens["value"] = min(burst, tokens["value"] + (now - tokens["at"]) * rate)
+                    tokens["at"] = now
+                    limited = tokens["value"] < 1
+                    if not limited:
+                        tokens["value"] -= 1
+                    failed = not limited and random.random() < stub.fail_rate
+
+                if limited:
+                    stub.rejected[429] += 1
+                    self._reply(429, "rate_limited", {"Retry-After": stub.retry_after})
+                elif failed:
+                    stub.rejected[500] += 1
+                    self._reply(500, "internal_error")
+                else:
+                    stub.received.append(json.loads(body))
+                    self._reply(200, "ok")
+
+            def _reply(self, status, text, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(text)))
+                self.end_headers()
+                self.wfile.write(text.encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/services/stub"
+
+    def start(self) -> "StubWebhook":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def bench(messages: int, rate: float, burst: int, fail_rate: float, workers: int) -> Dict:
+    """Deliver `messages` test payloads to an in-process stub and report."""
+    stub = StubWebhook(port=0, rate=rate, burst=burst, fail_rate=fail_rate).start()
+    dead_letters = ANALYTICS_DIR / "slack_bench_dead_letter.jsonl"
+    dead_letters.unlink(missing_ok=True)
+    try:
+        started = time.perf_counter()
+        payloads = [{"text": f"bench {i}"} for i in range(messages)]
+        # Client a little under the stub's limit, as against Slack
+        stats = deliver(payloads, stub.url, rate=rate * 0.95, burst=burst, workers=workers,
+                        dead_letter_path=dead_letters)
+        elapsed = time.perf_counter() - started
+    finally:
+        stub.stop()
+
+    return {
+        **stats,
+        "received": len(stub.received),
+        "stub_429": stub.rejected[429],
+        "stub_500": stub.rejected[500],
+        "elapsed_s": round(elapsed, 2),
+        "ideal_s": round(max(0.0, messages - burst) / rate, 2),
+    }
+
+
+# CLI
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Slack webhook delivery: dead-letter replay, stub server, benchmark")
+    mode = p.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--replay", action="store_true", help="resend the dead-lettered payloads")
+    mode.add_argument("--stub", action="store_true", help="serve a local stub webhook until interrupted")
+    mode.add_argument("--bench", action="store_true", help="deliver test messages to an in-process stub")
+    p.add_argument("--port", type=int, default=DEFAULT_STUB_PORT, help="stub listen port")
+    p.add_argument("-n", "--messages", type=int, default=50, help="bench messages")
+    p.add_argument("--rate", type=float, default=DEFAULT_RATE, help="messages per second per webhook")
+    p.add_argument("--burst", type=int, default=DEFAULT_BURST)
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    p.add_argument("--fail-rate", type=float, default=0.0, help="stub: share of requests answered 500")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    if args.replay:
+        stats = replay_dead_letters(rate=args.rate, burst=args.burst, workers=args.workers)
+        logger.info("Replay: %s", stats)
+        return 0 if stats["dead_lettered"] == 0 else 1
+
+    if args.stub:
+        stub = StubWebhook(args.port, args.rate, args.burst, args.fail_rate).start()
+        logger.info("Stub webhook at %s (rate %.1f/s, fail rate %.0f%%)", stub.url, args.rate, args.fail_rate * 100)
+        try:
+            while True:
+                time.sleep(5)
+                logger.info("Received %s, answered 429 x%s, 500 x%s",
+                            len(stub.received), stub.rejected[429], stub.rejected[500])
+        except KeyboardInterrupt:
+            stub.stop()
+        return 0
+
+    result = bench(args.messages, args.rate, args.burst, args.fail_rate, args.workers)
+    logger.info(
+        "Delivered %s/%s in %.2fs (rate floor %.2fs) | retried %s | dead-lettered %s | stub 429 x%s, 500 x%s",
+        result["sent"], args.messages, result["elapsed_s"], result["ideal_s"], result["retried"],
+        result["dead_lettered"], result["stub_429"], result["stub_500"],
+    )
+    return 0 if result["received"] == result["sent"] and result["dead_lettered"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -76,3 +76,117 @@ def format_alert(
         "text": title,
         "blocks": blocks
     }
+
+
+# Digest: every hit of a run, paged across as many messages as needed
+DASHBOARD_URL = "https://fleetintel360-ysuogxo9vb4xcbf6jnqj2h.streamlit.app/Data_Quality"
+
+SEVERITY_EMOJIS = {"CRITICAL": "🚨", "WARNING": "⚠️", "INFO": "ℹ️"}
+SEVERITY_ORDER = {"CRITICAL": 0, "WARNING": 1, "INFO": 2}
+
+MAX_BLOCKS = 50  # Slack's limit per message
+MAX_SECTION_CHARS = 2900  # section text limit is 3000
+MAX_PAGE_CHARS = 20_000  # stay well clear of the message size limit
+INLINE_CSV_CHARS = 2800  # larger CSVs are attached, not inlined
+
+CSV_COLUMNS = ["rule", "severity", "entity_type", "entity_id", "metric_name", "metric_value"]
+
+
+def _sorted_hits(rows):
+    order = rows["severity"].map(SEVERITY_ORDER).fillna(len(SEVERITY_ORDER))
+    return rows.assign(_order=order).sort_values(
+        ["_order", "entity_type", "rule", "entity_id"], kind="stable"
+    ).drop(columns="_order")
+
+
+def digest_csv(rows) -> str:
+    """Compact CSV of every hit, most severe first."""
+    return _sorted_hits(rows).to_csv(columns=CSV_COLUMNS, index=False, float_format="%.3f")
+
+
+def _chunk_lines(lines, limit):
+    """Join lines into texts of at most `limit` characters."""
+    chunk, size = [], 0
+    for line in lines:
+        if chunk and size + len(line) + 1 > limit:
+            yield "\n".join(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line) + 1
+    if chunk:
+        yield "\n".join(chunk)
+
+
+def format_digest(title: str, rows, csv_text: str = None, csv_note: str = None, max_blocks: int = MAX_BLOCKS):
+    """
+    One or more payloads covering every row (rule, entity_id, entity_type,
+    metric_name, metric_value, severity, description), grouped by severity
+    and entity type, each within Slack's block limit. A small `csv_text` is
+    inlined on the last page; `csv_note` says where a larger one went.
+    """
+    rows = _sorted_hits(rows)
+    total = len(rows)
+
+    # One line per hit, built column-wise
+    emoji = rows["severity"].map(SEVERITY_EMOJIS).fillna("ℹ️")
+    values = rows["metric_value"].map(lambda v: f"{v:g}" if isinstance(v, (int, float)) else str(v))
+    lines = (
+        emoji + " `" + rows["entity_id"].astype(str) + "` " + rows["metric_name"].astype(str)
+        + " = `" + values + "` · " + rows["description"].fillna("").astype(str)
+    )
+
+    summary = rows.groupby(["severity", "entity_type"], sort=False).size()
+    summary_text = " | ".join(
+        f"{SEVERITY_EMOJIS.get(sev, 'ℹ️')} {sev} {etype}: {count}" for (sev, etype), count in summary.items()
+    )
+
+    body = [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*{total} alert(s) detected*\n{summary_text}"}},
+        {"type": "divider"},
+    ]
+    for (sev, etype), group in lines.groupby([rows["severity"], rows["entity_type"]], sort=False):
+        body.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*{sev} · {etype} ({len(group)})*"}})
+        for text in _chunk_lines(group.tolist(), MAX_SECTION_CHARS):
+            body.append({"type": "section", "text": {"type": "mrkdwn", "text": text}})
+
+    footer = []
+    if csv_text and len(csv_text) <= INLINE_CSV_CHARS:
+        footer.append({"type": "section", "text": {"type": "mrkdwn", "text": f"```{csv_text}```"}})
+    if csv_note:
+        footer.append({"type": "context", "elements": [{"type": "mrkdwn", "text": csv_note}]})
+    footer.append({
+        "type": "actions",
+        "elements": [
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": "View Dashboard"},
+                "url": DASHBOARD_URL,
+                "style": "primary"
+            }
+        ]
+    })
+    body += footer
+
+    # Header + page context on every page
+    per_page = max_blocks - 2
+    pages, page, chars = [], [], 0
+    for block in body:
+        size = len(str(block))
+        if page and (len(page) >= per_page or chars + size > MAX_PAGE_CHARS):
+            pages.append(page)
+            page, chars = [], 0
+        page.append(block)
+        chars += size
+    pages.append(page)
+
+    payloads = []
+    for number, page in enumerate(pages, start=1):
+        heading = title if len(pages) == 1 else f"{title} ({number}/{len(pages)})"
+        payloads.append({
+            "text": f"{heading}: {total} alert(s)",
+            "blocks": [
+                {"type": "header", "text": {"type": "plain_text", "text": heading}},
+                {"type": "context", "elements": [{"type": "mrkdwn", "text": f"Page {number} of {len(pages)} · {total} alert(s)"}]},
+            ] + page,
+        })
+    return payloads
@@ -2,10 +2,17 @@ import json
 import logging
 from pathlib import Path
 from typing import List, Dict
+from simulator.jsonl_io import JsonlWriter, raw_files, read_jsonl, reject_entry, write_rejects
 
 # Config
 RAW_DRIVER_HEALTH_PATH = Path("warehouse/raw/driver_health")
 STAGED_OUT_PATH = Path("warehouse/staging/driver_health_staged.jsonl")
+REJECTED_PATH = Path("warehouse/staging/rejected/driver_health.jsonl")
+
+# Minute-level stream (run_simulation --health-stream)
+RAW_INTRADAY_PATH = Path("warehouse/raw/driver_health_intraday")
+STAGED_INTRADAY_PATH = Path("warehouse/staging/driver_health_intraday_staged.jsonl")
+REJECTED_INTRADAY_PATH = Path("warehouse/staging/rejected/driver_health_intraday.jsonl")
 
 # Identity fields only (hard requirement)
 REQUIRED_FIELDS = {
@@ -31,26 +38,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Loaders
-def load_raw_driver_health_files() -> List[Dict]:
+def load_raw_driver_health_files(rejects: List[Dict] = None) -> List[Dict]:
     """
     Load all driver health JSONL files from raw layer.
-    Raw layer is immutable and untrusted.
+    Raw layer is immutable and untrusted; malformed lines go to `rejects`.
     """
     records: List[Dict] = []
 
     if not RAW_DRIVER_HEALTH_PATH.exists():
         raise FileNotFoundError("Raw driver health directory does not exist")
 
-    files = sorted(RAW_DRIVER_HEALTH_PATH.glob("*.jsonl"))
+    files = raw_files(RAW_DRIVER_HEALTH_PATH)
     if not files:
         raise FileNotFoundError("No raw driver health files found")
 
     logger.info("Found %s raw driver health files", len(files))
 
     for file in files:
-        with file.open() as f:
-            for line in f:
-                records.append(json.loads(line))
+        records.extend(read_jsonl(file, rejects))
 
     logger.info("Loaded %s raw driver health records", len(records))
     return records
@@ -75,6 +80,14 @@ def quality_checks(record: Dict) -> None:
     if fatigue is not None and not (0 <= fatigue <= 1):
         raise ValueError("Invalid fatigue index")
 
+def quality_checks_intraday(record: Dict) -> None:
+    fatigue = record.get("fatigue_index")
+    if fatigue is not None and not (0 <= fatigue <= 1):
+        raise ValueError("Invalid fatigue index")
+
+    if record.get("continuous_driving_min", 0) < 0:
+        raise ValueError("Negative continuous driving minutes")
+
 # Staging transform
 def stage_record(record: Dict) -> Dict:
     return {
@@ -91,16 +104,24 @@ def stage_record(record: Dict) -> Dict:
     }
 
 # Orchestrator
-def stage_driver_health() -> None:
+def stage_driver_health() -> Dict[str, int]:
     logger.info("Starting driver health staging")
 
-    raw_records = load_raw_driver_health_files()
+    rejects: List[Dict] = []
+    raw_records = load_raw_driver_health_files(rejects)
     staged_records: List[Dict] = []
 
     for record in raw_records:
-        validate_required_fields(record)
-        quality_checks(record)
-        staged_records.append(stage_record(record))
+        try:
+            validate_required_fields(record)
+            quality_checks(record)
+            staged_records.append(stage_record(record))
+        except (ValueError, KeyError, TypeError) as e:
+            rejects.append(reject_entry(record, e))
+
+    write_rejects(REJECTED_PATH, rejects)
+    if rejects:
+        logger.warning("Rejected %s driver health records (see %s)", len(rejects), REJECTED_PATH)
 
     STAGED_OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
@@ -111,7 +132,53 @@ def stage_driver_health() -> None:
 
     logger.info("Wrote %s staged driver health records", len(staged_records))
     logger.info("Driver health staging completed successfully")
+    return {"rows_in": len(raw_records), "rows_out": len(staged_records), "rows_rejected": len(rejects)}
+
+def stage_intraday_record(record: Dict) -> Dict:
+    return {
+        "event_id": record["event_id"],
+        "driver_id": record["driver_id"],
+        "vehicle_id": record.get("vehicle_id"),
+        "timestamp": record["timestamp"],
+        "shift_minute": record.get("shift_minute"),
+        "speed_kph": record.get("speed_kph"),
+        "driving": record.get("driving", False),
+        "on_break": record.get("on_break", False),
+        "continuous_driving_min": record.get("continuous_driving_min"),
+        "fatigue_index": record.get("fatigue_index"),
+    }
+
+def stage_driver_health_intraday() -> Dict[str, int]:
+    """
+    Stage the minute-level stream. Streams record by record: this feed is
+    ~1,000x the daily volume. Always writes the staged file (possibly empty).
+    """
+    logger.info("Starting intraday driver health staging")
+
+    files = raw_files(RAW_INTRADAY_PATH) if RAW_INTRADAY_PATH.exists() else []
+    rejects: List[Dict] = []
+    STAGED_INTRADAY_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    with JsonlWriter(STAGED_INTRADAY_PATH, overwrite=True) as writer:
+        for file in files:
+            for record in read_jsonl(file, rejects):
+                try:
+                    validate_required_fields(record)
+                    quality_checks_intraday(record)
+                    writer.write(stage_intraday_record(record))
+                except (ValueError, KeyError, TypeError) as e:
+                    rejects.append(reject_entry(record, e))
+        staged = writer.count
+
+    write_rejects(REJECTED_INTRADAY_PATH, rejects)
+    if rejects:
+        logger.warning("Rejected %s intraday health records (see %s)", len(rejects), REJECTED_INTRADAY_PATH)
+
+    logger.info("Wrote %s staged intraday health records from %s files", staged, len(files))
+    # Streamed, so records read = staged + rejected at record level
+    return {"rows_in": staged + len(rejects), "rows_out": staged, "rows_rejected": len(rejects)}
 
 # Entry point
 if __name__ == "__main__":
     stage_driver_health()
+    stage_driver_health_intraday()
@@ -2,6 +2,7 @@ import json
 import logging
 from pathlib import Path
 from typing import List, Dict
+from simulator.jsonl_io import raw_files, read_jsonl, reject_entry, write_rejects
 
 # Config
 
@@ -9,6 +10,7 @@ RAW_FINANCE_PATH = Path("warehouse/raw/finance")
 
 STAGED_DAILY_PATH = Path("warehouse/staging/finance_daily_staged.jsonl")
 STAGED_TRIPS_PATH = Path("warehouse/staging/finance_trips_staged.jsonl")
+REJECTED_PATH = Path("warehouse/staging/rejected/finance.jsonl")
 
 # Identity fields
 REQUIRED_DAILY_FIELDS = {
@@ -33,25 +35,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Loaders
-def load_raw_finance_files() -> List[Dict]:
+def load_raw_finance_files(rejects: List[Dict] = None) -> List[Dict]:
     """
     Load all finance JSONL files from raw layer.
+    Malformed lines go to `rejects`.
     """
     records: List[Dict] = []
 
     if not RAW_FINANCE_PATH.exists():
         raise FileNotFoundError("Raw finance directory does not exist")
 
-    files = sorted(RAW_FINANCE_PATH.glob("*.jsonl"))
+    files = raw_files(RAW_FINANCE_PATH)
     if not files:
         raise FileNotFoundError("No raw finance files found")
 
     logger.info("Found %s raw finance files", len(files))
 
     for file in files:
-        with file.open() as f:
-            for line in f:
-                records.append(json.loads(line))
+        records.extend(read_jsonl(file, rejects))
 
     logger.info("Loaded %s raw finance records", len(records))
     return records
@@ -109,26 +110,43 @@ def stage_trip_record(daily_record: Dict, trip: Dict) -> Dict:
     }
 
 # Orchestrator
-def stage_finance() -> None:
+def stage_finance() -> Dict[str, int]:
+    """
+    Stage daily summaries and their trips. Returns row counts for pipeline
+    telemetry (rows_out counts daily and trip records).
+    """
     logger.info("Starting finance staging")
 
-    raw_records = load_raw_finance_files()
+    rejects: List[Dict] = []
+    raw_records = load_raw_finance_files(rejects)
 
     staged_daily: List[Dict] = []
     staged_trips: List[Dict] = []
 
     for record in raw_records:
-        validate_required_fields(record, REQUIRED_DAILY_FIELDS)
-        quality_checks_daily(record)
+        try:
+            validate_required_fields(record, REQUIRED_DAILY_FIELDS)
+            quality_checks_daily(record)
 
-        staged_daily.append(stage_daily_record(record))
+            staged_daily.append(stage_daily_record(record))
+        except (ValueError, KeyError, TypeError) as e:
+            # A bad daily summary drops its trips with it
+            rejects.append(reject_entry(record, e))
+            continue
 
         trips = record.get("trips", [])
         for trip in trips:
-            validate_required_fields(trip, REQUIRED_TRIP_FIELDS)
-            quality_checks_trip(trip)
+            try:
+                validate_required_fields(trip, REQUIRED_TRIP_FIELDS)
+                quality_checks_trip(trip)
+
+                staged_trips.append(stage_trip_record(record, trip))
+            except (ValueError, KeyError, TypeError) as e:
+                rejects.append(reject_entry(trip, e))
 
-            staged_trips.append(stage_trip_record(record, trip))
+    write_rejects(REJECTED_PATH, rejects)
+    if rejects:
+        logger.warning("Rejected %s finance records (see %s)", len(rejects), REJECTED_PATH)
 
     STAGED_DAILY_PATH.parent.mkdir(parents=True, exist_ok=True)
 
@@ -145,6 +163,11 @@ def stage_finance() -> None:
     logger.info("Wrote %s daily finance records", len(staged_daily))
     logger.info("Wrote %s finance trip records", len(staged_trips))
     logger.info("Finance staging completed successfully")
+    return {
+        "rows_in": len(raw_records),
+        "rows_out": len(staged_daily) + len(staged_trips),
+        "rows_rejected": len(rejects),
+    }
 
 # Entry point
 if __name__ == "__main__":
@@ -1,7 +1,6 @@
 import json
 import logging
 from pathlib import Path
-import pandas as pd
 from simulator.common import DRIVERS_MAP, VEHICLES_MAP
 
 # Config
@@ -44,6 +43,7 @@ def stage_dimensions():
             f.write(json.dumps(v) + "\n")
 
     logger.info(f"Successfully staged {len(all_drivers)} drivers and {len(all_vehicles)} vehicles.")
+    return {"rows_out": len(all_drivers) + len(all_vehicles)}
 
 if __name__ == "__main__":
     stage_dimensions()
\ No newline at end of file
@@ -2,10 +2,12 @@ import json
 import logging
 from pathlib import Path
 from typing import List, Dict
+from simulator.jsonl_io import raw_files, read_jsonl, reject_entry, write_rejects
 
 # Config
 RAW_VEHICLES_PATH = Path("warehouse/raw/vehicles")
 STAGED_OUT_PATH = Path("warehouse/staging/vehicles_staged.jsonl")
+REJECTED_PATH = Path("warehouse/staging/rejected/vehicles.jsonl")
 
 # Identity + location only (hard requirements)
 REQUIRED_FIELDS = {
@@ -23,8 +25,15 @@ OPTIONAL_FIELDS = {
     "engine_temp_c",
     "battery_v",
     "fuel_percent",
+    "heading",
+    "speed_zone_kph",
+    "tire_psi",
+    "obd_codes",
 }
 
+# Fixed wheel order for the flattened tyre pressure columns
+TIRE_POSITIONS = ("FL", "FR", "RL", "RR")
+
 # Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,23 +43,21 @@ logger = logging.getLogger(__name__)
 
 
 # Loaders
-def load_raw_vehicle_files() -> List[Dict]:
+def load_raw_vehicle_files(rejects: List[Dict] = None) -> List[Dict]:
     """
     Load all vehicle JSONL files from raw layer.
-    Raw layer is immutable and untrusted.
+    Raw layer is immutable and untrusted; malformed lines go to `rejects`.
     """
     records: List[Dict] = []
 
-    files = sorted(RAW_VEHICLES_PATH.glob("*.jsonl"))
+    files = raw_files(RAW_VEHICLES_PATH)
     if not files:
         raise FileNotFoundError("No raw vehicle files found")
 
     logger.info("Found %s raw vehicle files", len(files))
 
     for file in files:
-        with file.open() as f:
-            for line in f:
-                records.append(json.loads(line))
+        records.extend(read_jsonl(file, rejects))
 
     logger.info("Loaded %s raw vehicle records", len(records))
     return records
@@ -101,12 +108,25 @@ def quality_checks(record: Dict) -> None:
     if fuel is not None and not (0 <= fuel <= 100):
         raise ValueError("Invalid fuel percent")
 
+    heading = record.get("heading")
+    if heading is not None and not (0 <= heading <= 360):
+        raise ValueError("Invalid heading")
+
+    for wheel, psi in (record.get("tire_psi") or {}).items():
+        if psi is not None and psi < 0:
+            raise ValueError(f"Negative tyre pressure on {wheel}")
+
 
 # Staging Transform
 def stage_record(record: Dict) -> Dict:
     """
     Minimal, query-friendly staging shape.
+    Nested telemetry (tyres, OBD codes) is flattened into fixed columns
+    so the warehouse never has to parse JSON blobs.
     """
+    tire_psi = record.get("tire_psi") or {}
+    heading = record.get("heading")
+
     return {
         "event_id": record["event_id"],
         "vehicle_id": record["vehicle_id"],
@@ -120,6 +140,14 @@ def stage_record(record: Dict) -> Dict:
         "fuel_percent": record.get("fuel_percent"),
         "engine_temp_c": record.get("engine_temp_c"),
         "battery_v": record.get("battery_v"),
+        "heading": int(round(heading)) % 360 if heading is not None else None,
+        "speed_zone_kph": record.get("speed_zone_kph"),
+
+        # Tyres (one column per wheel)
+        **{f"tire_psi_{pos.lower()}": tire_psi.get(pos) for pos in TIRE_POSITIONS},
+
+        # Diagnostics
+        "obd_codes": record.get("obd_codes") or [],
 
         # Metadata
         "speeding": record.get("speeding", False),
@@ -127,19 +155,28 @@ def stage_record(record: Dict) -> Dict:
 
 
 # Orchestrator
-def stage_vehicles() -> None:
+def stage_vehicles() -> Dict[str, int]:
     logger.info("Starting vehicle staging")
 
-    raw_records = load_raw_vehicle_files()
+    rejects: List[Dict] = []
+    raw_records = load_raw_vehicle_files(rejects)
     staged_records: List[Dict] = []
 
     for record in raw_records:
-        record = normalize_record(record)
+        try:
+            normalized = normalize_record(record)
+
+            validate_required_fields(normalized)
+            quality_checks(normalized)
 
-        validate_required_fields(record)
-        quality_checks(record)
+            staged_records.append(stage_record(normalized))
+        except (ValueError, KeyError, TypeError) as e:
+            # Quarantine bad records instead of failing the whole run
+            rejects.append(reject_entry(record, e))
 
-        staged_records.append(stage_record(record))
+    write_rejects(REJECTED_PATH, rejects)
+    if rejects:
+        logger.warning("Rejected %s vehicle records (see %s)", len(rejects), REJECTED_PATH)
 
     STAGED_OUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 
@@ -150,6 +187,7 @@ def stage_vehicles() -> None:
 
     logger.info("Wrote %s staged vehicle records", len(staged_records))
     logger.info("Vehicle staging completed successfully")
+    return {"rows_in": len(raw_records), "rows_out": len(staged_records), "rows_rejected": len(rejects)}
 
 
 # Entry point
@@ -0,0 +1,555 @@
+# stream_alerts.py
+"""
+Ingest-time alert evaluation.
+
+Applies the mart.alert_thresholds rules to events as ingest_stream.py and
+watch_raw.py stage them, instead of waiting for the nightly chain. Running
+aggregates are kept in memory per (entity, day), with the same definitions
+as the daily metric tables:
+
+- vehicle: mean engine_temp_c, mean battery_v, speeding events / events
+  (rounded to 3 places, like fact_vehicle_daily_metrics.speeding_rate)
+- driver: mean fatigue_index (ACTIVE drivers only), sum of fraud_alerts_count
+
+An event's id replaces its earlier contribution, as the warehouse upserts
+do, so re-read or repeated events do not skew the day. An alert is emitted
+the moment an aggregate's severity rises above what was already emitted for
+that entity and day, once the aggregate has MIN_SAMPLES events behind it
+(one hot reading is not an overheating engine). Emitted alerts go through
+the alert state store, under the same rule keys as run_alerts.py, so the
+nightly run does not post them again.
+
+Severities are decided as the nightly query for the rule decides them:
+the alert_thresholds comparisons for fatigue and engine temperature, and
+CRITICAL for any fraud signal (alert_fraud.sql ignores the thresholds), so
+a stream alert is never re-posted by the nightly run as an escalation.
+
+At end of day the aggregates equal the daily metrics, so the crossings
+agree with the nightly alert queries. --reconcile replays a loaded day
+event by event, then runs run_alerts.py's queries for that day and checks
+exactly that:
+
+    python stream_alerts.py --reconcile                 # latest loaded day
+    python stream_alerts.py --reconcile --date 2026-02-08
+"""
+
+import argparse
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Config
+VEHICLE, DRIVER = "vehicle", "driver"
+
+# threshold metric -> (entity type, alert rule, alert metric name). Rules
+# with a nightly query share its key, so dedup state covers both paths.
+METRICS = {
+    "engine_temp_c": (VEHICLE, "alert_vehicle_risk", "engine_temp"),
+    "battery_voltage": (VEHICLE, "stream_battery_voltage", "battery_voltage"),
+    "speeding_rate": (VEHICLE, "stream_speeding_rate", "speeding_rate"),
+    "avg_fatigue_index": (DRIVER, "driver_fatigue_alerts", "avg_fatigue_index"),
+    "fraud_alerts_count": (DRIVER, "alert_fraud", "fraud_alerts"),
+}
+
+# Events behind an aggregate before it may alert intraday
+MIN_SAMPLES = {
+    "engine_temp_c": 10,
+    "battery_voltage": 10,
+    "speeding_rate": 10,
+    "avg_fatigue_index": 1,
+    "fraud_alerts_count": 1,
+}
+
+# Rules whose nightly query ignores mart.alert_thresholds: metric ->
+# (severity of any value above 0, description), as that query reports them
+FIXED_RULES = {
+    "fraud_alerts_count": ("CRITICAL", "Fraud signals detected"),  # alert_fraud.sql
+}
+
+SEVERITY_RANK = {None: 0, "WARNING": 1, "CRITICAL": 2}
+
+# Days of aggregates kept (today and yesterday, for late events); older
+# events are left to the nightly run
+KEEP_DAYS = 2
+
+THRESHOLDS_SQL = """
+SELECT metric_name, warning_threshold, critical_threshold, comparison_op, description
+FROM mart.alert_thresholds
+WHERE is_active
+"""
+
+# The nightly daily metrics the stream aggregates must equal
+BATCH_SQL = """
+WITH metrics AS (
+    SELECT 'vehicle' AS entity_type, vehicle_id AS entity_id, 'engine_temp_c' AS metric, avg_engine_temp_c AS value
+    FROM mart.fact_vehicle_daily_metrics WHERE date_key = $day
+    UNION ALL
+    SELECT 'vehicle', vehicle_id, 'battery_voltage', avg_battery_voltage
+    FROM mart.fact_vehicle_daily_metrics WHERE date_key = $day
+    UNION ALL
+    SELECT 'vehicle', vehicle_id, 'speeding_rate', speeding_rate
+    FROM mart.fact_vehicle_daily_metrics WHERE date_key = $day
+    UNION ALL
+    SELECT 'driver', f.driver_id, 'avg_fatigue_index', f.avg_fatigue_index
+    FROM mart.fact_driver_daily_metrics f
+    JOIN mart.dim_driver d ON d.driver_id = f.driver_id
+    WHERE f.date_key = $day AND d.status = 'ACTIVE'
+      AND EXISTS (SELECT 1 FROM mart.fact_driver_shifts s WHERE s.driver_id = f.driver_id AND s.date_key = $day)
+    UNION ALL
+    SELECT 'driver', driver_id, 'fraud_alerts_count', fraud_alerts_count
+    FROM mart.fact_driver_daily_metrics
+    WHERE date_key = $day
+      AND EXISTS (SELECT 1 FROM mart.fact_daily_finance s WHERE s.driver_id = fact_driver_daily_metrics.driver_id AND s.date_key = $day)
+)
+SELECT m.entity_type, m.entity_id, m.metric, m.value
+FROM metrics m
+JOIN mart.alert_thresholds t ON t.metric_name = m.metric AND t.is_active
+WHERE m.value IS NOT NULL
+"""
+
+# The day's staged events, in arrival order, for --reconcile and warm starts
+REPLAY_SQL = {
+    "telemetry": """
+        SELECT event_id, vehicle_id, driver_id, strftime(event_timestamp, '%Y-%m-%dT%H:%M:%SZ') AS timestamp,
+               engine_temp_c, battery_v, speeding
+        FROM mart.fact_vehicle_telemetry WHERE date_key = $day ORDER BY event_timestamp, event_id
+    """,
+    "shifts": """
+        SELECT event_id, driver_id, strftime(event_timestamp, '%Y-%m-%dT%H:%M:%SZ') AS timestamp, fatigue_index
+        FROM mart.fact_driver_shifts WHERE date_key = $day ORDER BY event_timestamp, event_id
+    """,
+    "finance": """
+        SELECT event_id, driver_id, strftime(date_key, '%Y-%m-%d') AS date, fraud_alerts_count
+        FROM mart.fact_daily_finance WHERE date_key = $day ORDER BY event_id
+    """,
+}
+
+RECONCILE_TOLERANCE = 1e-9
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+
+# Thresholds
+@dataclass
+class Threshold:
+    metric: str
+    warning: float
+    critical: float
+    op: str
+    description: str
+    fixed: Optional[str] = None
+
+    def severity(self, value: Optional[float]) -> Optional[str]:
+        """
+        Same comparisons as the alert queries (>= warning / critical; <= for
+        '<' rules), or the `fixed` severity for any value above 0.
+        """
+        if value is None:
+            return None
+        if self.fixed is not None:
+            return self.fixed if value > 0 else None
+        if self.op == "<":
+            return "CRITICAL" if value <= self.critical else "WARNING" if value <= self.warning else None
+        return "CRITICAL" if value >= self.critical else "WARNING" if value >= self.warning else None
+
+
+def load_thresholds(con) -> Dict[str, Threshold]:
+    thresholds = {
+        row[0]: Threshold(*row)
+        for row in con.execute(THRESHOLDS_SQL).fetchall()
+        if row[0] in METRICS and row[0] not in FIXED_RULES
+    }
+    for metric, (severity, description) in FIXED_RULES.items():
+        thresholds[metric] = Threshold(metric, 0.0, 0.0, ">", description, fixed=severity)
+    return thresholds
+
+
+# Running aggregates
+@dataclass
+class DayAggregate:
+    """One entity's running sums for one day, by event id."""
+
+    contributions: Dict[str, Tuple] = field(default_factory=dict)
+    events: int = 0
+    sums: List[float] = field(default_factory=lambda: [0.0, 0.0, 0.0])
+    counts: List[int] = field(default_factory=lambda: [0, 0, 0])
+
+    def apply(self, event_id: str, values: Tuple) -> None:
+        """Add an event's values (None = missing), replacing its earlier contribution."""
+        old = self.contributions.get(event_id)
+        if old is None:
+            self.events += 1
+        else:
+            for i, value in enumerate(old):
+                if value is not None:
+                    self.sums[i] -= value
+                    self.counts[i] -= 1
+        self.contributions[event_id] = values
+        for i, value in enumerate(values):
+            if value is not None:
+                self.sums[i] += value
+                self.counts[i] += 1
+
+    def mean(self, i: int) -> Optional[float]:
+        return self.sums[i] / self.counts[i] if self.counts[i] else None
+
+
+def event_day(timestamp: str) -> Optional[date]:
+    """UTC calendar day of an event timestamp, as the warehouse's date_key."""
+    try:
+        ts = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if ts.tzinfo:
+        ts = ts.astimezone(timezone.utc)
+    return ts.date()
+
+
+# Evaluator
+class StreamAlertEvaluator:
+    """
+    Running per-entity aggregates and the alerts they trigger. Feed staged
+    rows with observe_batch(); it returns the alerts to emit now.
+    """
+
+    # DayAggregate values: vehicles (engine_temp_c, battery_v, speeding),
+    # drivers (fatigue_index, fraud_alerts_count)
+
+    def __init__(self, thresholds: Dict[str, Threshold], driver_status: Optional[Dict[str, str]] = None):
+        self.thresholds = thresholds
+        self.driver_status = driver_status or {}
+        # (entity type, day) -> entity id -> aggregate
+        self.days: Dict[Tuple[str, date], Dict[str, DayAggregate]] = defaultdict(lambda: defaultdict(DayAggregate))
+        # (metric, entity id, day) -> highest severity emitted
+        self.emitted: Dict[Tuple[str, str, date], str] = {}
+        self.latest_day: Optional[date] = None
+        self.alerts_emitted = 0
+
+    @classmethod
+    def from_snapshot(cls, con, warm: bool = True) -> "StreamAlertEvaluator":
+        """Thresholds and driver status from `con`; with `warm`, the latest loaded day's events too."""
+        status = dict(con.execute("SELECT driver_id, status FROM mart.dim_driver").fetchall())
+        evaluator = cls(load_thresholds(con), status)
+        if warm:
+            day = con.execute("SELECT MAX(date_key) FROM mart.fact_vehicle_telemetry").fetchone()[0]
+            if day is not None:
+                evaluator.replay(con, day, emit=False)
+                logger.info("Stream alerts warmed from %s (%s vehicles, %s drivers)", day,
+                            len(evaluator.days.get((VEHICLE, day), {})), len(evaluator.days.get((DRIVER, day), {})))
+        return evaluator
+
+    # Values
+    def value(self, metric: str, agg: DayAggregate) -> Optional[float]:
+        if metric == "engine_temp_c":
+            return agg.mean(0)
+        if metric == "battery_voltage":
+            return agg.mean(1)
+        if metric == "speeding_rate":
+            return round(agg.sums[2] / agg.events, 3) if agg.events else None
+        if metric == "avg_fatigue_index":
+            return agg.mean(0)
+        if metric == "fraud_alerts_count":
+            return agg.sums[1] if agg.counts[1] else None
+        raise KeyError(metric)
+
+    def samples(self, metric: str, agg: DayAggregate) -> int:
+        if metric == "speeding_rate":
+            return agg.events
+        return agg.counts[0] if metric in ("engine_temp_c", "avg_fatigue_index") else agg.counts[1]
+
+    def _metrics_for(self, entity_type: str, entity_id: str) -> List[str]:
+        metrics = [m for m, (etype, _, _) in METRICS.items() if etype == entity_type and m in self.thresholds]
+        if entity_type == DRIVER and self.driver_status.get(entity_id, "ACTIVE") != "ACTIVE":
+            metrics = [m for m in metrics if m != "avg_fatigue_index"]
+        return metrics
+
+    # Ingest
+    def observe_batch(self, rows: Dict[str, List[Dict]], emit: bool = True) -> List[Dict]:
+        """
+        Update the aggregates from staged rows ({"fact_vehicle_telemetry": [...],
+        "fact_driver_shifts": [...], "fact_daily_finance": [...]}) and return
+        the alerts they raise.
+        """
+        touched = set()
+        for record in rows.get("fact_vehicle_telemetry", ()):
+            day = event_day(record["timestamp"])
+            if self._too_old(day):
+                continue
+            speeding = 1.0 if record.get("speeding") else 0.0
+            values = (record.get("engine_temp_c"), record.get("battery_v"), speeding)
+            self.days[(VEHICLE, day)][record["vehicle_id"]].apply(record["event_id"], values)
+            touched.add((VEHICLE, record["vehicle_id"], day, record["timestamp"]))
+
+        for record in rows.get("fact_driver_shifts", ()):
+            day = event_day(record["timestamp"])
+            if self._too_old(day):
+                continue
+            self.days[(DRIVER, day)][record["driver_id"]].apply(record["event_id"], (record.get("fatigue_index"), None))
+            touched.add((DRIVER, record["driver_id"], day, record["timestamp"]))
+
+        for record in rows.get("fact_daily_finance", ()):
+            day = event_day(record["date"])
+            if self._too_old(day):
+                continue
+            count = record.get("fraud_alerts_count") or 0
+            self.days[(DRIVER, day)][record["driver_id"]].apply(record["event_id"], (None, float(count)))
+            touched.add((DRIVER, record["driver_id"], day, record["date"]))
+
+        alerts = []
+        if emit:
+            # Latest event per entity and day is the one that crossed
+            crossing_time = {}
+            for entity_type, entity_id, day, ts in touched:
+                key = (entity_type, entity_id, day)
+                crossing_time[key] = max(crossing_time.get(key, ts), ts)
+            for (entity_type, entity_id, day), ts in crossing_time.items():
+                alerts.extend(self._evaluate(entity_type, entity_id, day, ts))
+        self._evict(day for _, _, day, _ in touched)
+        return alerts
+
+    def _evaluate(self, entity_type: str, entity_id: str, day: date, event_time: str) -> List[Dict]:
+        agg = self.days[(entity_type, day)][entity_id]
+        alerts = []
+        for metric in self._metrics_for(entity_type, entity_id):
+            if self.samples(metric, agg) < MIN_SAMPLES[metric]:
+                continue
+            value = self.value(metric, agg)
+            severity = self.thresholds[metric].severity(value)
+            key = (metric, entity_id, day)
+            if SEVERITY_RANK[severity] <= SEVERITY_RANK[self.emitted.get(key)]:
+                continue
+            self.emitted[key] = severity
+            _, rule, alert_metric = METRICS[metric]
+            alerts.append({
+                "rule": rule,
+                "entity_id": entity_id,
+                "entity_type": entity_type,
+                "metric_name": alert_metric,
+                "metric_value": round(value, 3),
+                "severity": severity,
+                "description": self.thresholds[metric].description,
+                "date_key": day,
+                "event_time": event_time,
+            })
+        self.alerts_emitted += len(alerts)
+        return alerts
+
+    def _too_old(self, day: Optional[date]) -> bool:
+        """Unparseable, or older than the kept days (backfills are the nightly run's job)."""
+        return day is None or (self.latest_day is not None and (self.latest_day - day).days >= KEEP_DAYS)
+
+    def _evict(self, days: Iterable[date]) -> None:
+        newest = max(days, default=None)
+        if newest is None or (self.latest_day is not None and newest <= self.latest_day):
+            return
+        self.latest_day = newest
+        keep = {d for (_, d) in self.days if (newest - d).days < KEEP_DAYS}
+        for key in [k for k in self.days if k[1] not in keep]:
+            del self.days[key]
+        self.emitted = {k: v for k, v in self.emitted.items() if k[2] in keep}
+
+    # End of day
+    def day_values(self, day: date) -> Dict[Tuple[str, str, str], float]:
+        """(entity type, entity id, metric) -> aggregate, for every entity seen on `day`."""
+        values = {}
+        for entity_type in (VEHICLE, DRIVER):
+            for entity_id, agg in self.days.get((entity_type, day), {}).items():
+                for metric in self._metrics_for(entity_type, entity_id):
+                    value = self.value(metric, agg)
+                    if value is not None:
+                        values[(entity_type, entity_id, metric)] = value
+        return values
+
+    def replay(self, con, day: date, emit: bool = True) -> List[Dict]:
+        """Feed one loaded day through the evaluator event by event; returns the alerts."""
+        alerts = []
+        telemetry = [dict(zip(("event_id", "vehicle_id", "driver_id", "timestamp", "engine_temp_c", "battery_v", "speeding"), r))
+                     for r in con.execute(REPLAY_SQL["telemetry"], {"day": day}).fetchall()]
+        shifts = [dict(zip(("event_id", "driver_id", "timestamp", "fatigue_index"), r))
+                  for r in con.execute(REPLAY_SQL["shifts"], {"day": day}).fetchall()]
+        finance = [dict(zip(("event_id", "driver_id", "date", "fraud_alerts_count"), r))
+                   for r in con.execute(REPLAY_SQL["finance"], {"day": day}).fetchall()]
+
+        # Interleave by event time; daily finance closes the day
+        events = [(r["timestamp"], "fact_vehicle_telemetry", r) for r in telemetry]
+        events += [(r["timestamp"], "fact_driver_shifts", r) for r in shifts]
+        events.sort(key=lambda e: e[0])
+        events += [("~", "fact_daily_finance", r) for r in finance]
+        for _, table, record in events:
+            alerts.extend(self.observe_batch({table: [record]}, emit=emit))
+        return alerts
+
+
+# Delivery
+def notify(alerts: List[Dict], cooldown_hours: Optional[float] = None) -> int:
+    """
+    Post emitted alerts that the alert state does not suppress. Returns the
+    number posted; without a webhook they are only logged.
+    """
+    import pandas as pd
+
+    from run_alerts import ALERT_COLUMNS, send_to_slack, slack_webhook_url
+    from slack_formatter import format_digest
+    from warehouse.alert_state import AlertStateStore
+
+    for alert in alerts:
+        logger.warning("STREAM ALERT %s %s %s = %s (%s, event %s)", alert["severity"], alert["entity_id"],
+                       alert["metric_name"], alert["metric_value"], alert["date_key"], alert["event_time"])
+
+    url = slack_webhook_url()
+    hits = pd.DataFrame(alerts, columns=ALERT_COLUMNS)
+    # No rules listed: intraday evaluation never clears the nightly run's state
+    to_send = AlertStateStore(cooldown_hours=cooldown_hours).filter(hits, [], record=bool(url))
+    if to_send.empty or not url:
+        return 0
+
+    send_to_slack(format_digest("⚡ Live Fleet Alert", to_send))
+    return len(to_send)
+
+
+# Reconciliation
+def nightly_rules() -> set:
+    """The stream's rules that run_alerts.py also evaluates as a query."""
+    from run_alerts import ALERT_SQL_FILES
+
+    return {Path(f).stem for f in ALERT_SQL_FILES} & {rule for _, rule, _ in METRICS.values()}
+
+
+def nightly_alerts(con, day: date) -> Dict[Tuple[str, str], str]:
+    """
+    (rule, entity id) -> severity from run_alerts.py's queries for the
+    stream's rules, run as if `day` were the latest loaded day. The queries
+    read views over the snapshot behind `con` that hide later days.
+    """
+    import duckdb
+
+    from run_alerts import ALERT_SQL_FILES
+
+    rules = nightly_rules()
+    db_path = con.execute("SELECT path FROM duckdb_databases() WHERE database_name = current_database()").fetchone()[0]
+    tables = con.execute(
+        "SELECT table_name, bool_or(column_name = 'date_key') FROM information_schema.columns "
+        "WHERE table_catalog = current_database() AND table_schema = 'mart' GROUP BY table_name"
+    ).fetchall()
+
+    day_con = duckdb.connect()
+    try:
+        day_con.execute(f"ATTACH '{db_path}' AS snapshot (READ_ONLY)")
+        day_con.execute("CREATE SCHEMA mart")
+        for table, dated in tables:
+            where = f" WHERE date_key <= DATE '{day}'" if dated else ""
+            day_con.execute(f'CREATE VIEW mart."{table}" AS SELECT * FROM snapshot.mart."{table}"{where}')
+
+        hits = {}
+        for sql_file in ALERT_SQL_FILES:
+            rule = Path(sql_file).stem
+            if rule not in rules:
+                continue
+            cursor = day_con.execute(Path(sql_file).read_text())
+            columns = [c[0] for c in cursor.description]
+            for row in cursor.fetchall():
+                hit = dict(zip(columns, row))
+                hits[(rule, hit["entity_id"])] = hit["severity"]
+        return hits
+    finally:
+        day_con.close()
+
+
+def reconcile(con, day: Optional[date] = None) -> Dict:
+    """
+    Replay `day` (default: the latest loaded) through a fresh evaluator and
+    compare its end-of-day aggregates with the daily metrics, and its
+    severities with the nightly alert queries (threshold comparisons for
+    rules only the stream evaluates).
+    """
+    if day is None:
+        day = con.execute("SELECT MAX(date_key) FROM mart.fact_vehicle_daily_metrics").fetchone()[0]
+    evaluator = StreamAlertEvaluator.from_snapshot(con, warm=False)
+
+    started = time.perf_counter()
+    alerts = evaluator.replay(con, day)
+    replay_s = time.perf_counter() - started
+
+    stream = evaluator.day_values(day)
+    batch = {(r[0], r[1], r[2]): r[3] for r in con.execute(BATCH_SQL, {"day": day}).fetchall()}
+
+    nightly, queried = nightly_alerts(con, day), nightly_rules()
+
+    mismatches = []
+    for key in sorted(set(stream) | set(batch)):
+        s, b = stream.get(key), batch.get(key)
+        threshold = evaluator.thresholds[key[2]]
+        same_value = s is not None and b is not None and abs(s - b) <= RECONCILE_TOLERANCE * max(1.0, abs(b))
+        same_severity = METRICS[key[2]][1] in queried or threshold.severity(s) == threshold.severity(b)
+        if not same_value or not same_severity:
+            mismatches.append({"key": key, "stream": s, "batch": b})
+
+    final = {k: evaluator.thresholds[k[2]].severity(v) for k, v in stream.items()}
+    stream_hits = {(METRICS[k[2]][1], k[1]): sev for k, sev in final.items() if sev and METRICS[k[2]][1] in queried}
+    for rule, entity_id in sorted(set(stream_hits) | set(nightly)):
+        s, b = stream_hits.get((rule, entity_id)), nightly.get((rule, entity_id))
+        if s != b:
+            mismatches.append({"key": (rule, entity_id, "severity"), "stream": s, "batch": b})
+
+    emitted_keys = {(METRIC_BY_ALERT[(a["rule"], a["metric_name"])], a["entity_id"]) for a in alerts}
+    open_at_end = {(k[2], k[1]) for k, sev in final.items() if sev}
+    return {
+        "day": day,
+        "keys": len(batch),
+        "crossings": len(open_at_end),
+        "mismatches": mismatches,
+        "alerts_emitted": len(alerts),
+        "cleared_by_end_of_day": len(emitted_keys - open_at_end),
+        "left_to_nightly": len(open_at_end - emitted_keys),
+        "replay_s": replay_s,
+    }
+
+
+METRIC_BY_ALERT = {(rule, alert_metric): metric for metric, (_, rule, alert_metric) in METRICS.items()}
+
+
+# CLI
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Ingest-time alert evaluation: reconcile against the nightly metrics")
+    p.add_argument("--reconcile", action="store_true", required=True,
+                   help="replay a loaded day and compare with the daily metrics and alert queries")
+    p.add_argument("--date", type=date.fromisoformat, default=None, help="day to replay (default: latest loaded)")
+    p.add_argument("--db", default=None, help="database to read (defaults to the published snapshot)")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    import duckdb
+
+    from warehouse.snapshots import current_db_path
+
+    con = duckdb.connect(args.db or str(current_db_path()), read_only=True)
+    try:
+        result = reconcile(con, args.date)
+    finally:
+        con.close()
+
+    logger.info(
+        "%s: %s entity metrics, %s crossings at end of day | %s alerts emitted intraday "
+        "(%s cleared by end of day, %s left to the nightly run) | replay %.2fs",
+        result["day"], result["keys"], result["crossings"], result["alerts_emitted"],
+        result["cleared_by_end_of_day"], result["left_to_nightly"], result["replay_s"],
+    )
+    for m in result["mismatches"][:20]:
+        logger.error("Mismatch %s: stream %s, batch %s", m["key"], m["stream"], m["batch"])
+    if result["mismatches"]:
+        logger.error("%s mismatches with the nightly metrics and alert queries", len(result["mismatches"]))
+        return 1
+    logger.info("Stream aggregates and severities agree with the nightly metrics and alert queries")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
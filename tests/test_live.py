@@ -0,0 +1,87 @@
+# tests/test_live.py
+"""
+warehouse/live.py: merging the live database into a build and clearing
+what was merged.
+"""
+
+from pathlib import Path
+
+import duckdb
+import pytest
+
+from warehouse import live
+
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "warehouse/sql/schema.sql"
+
+
+@pytest.fixture
+def live_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(live, "SCHEMA_PATH", SCHEMA_PATH)
+    monkeypatch.setattr(live, "EXPORT_DIR", tmp_path / "live_merge")
+    return tmp_path / "live.duckdb"
+
+
+@pytest.fixture
+def build(tmp_path):
+    con = duckdb.connect(str(tmp_path / "build.duckdb"))
+    con.execute(SCHEMA_PATH.read_text())
+    yield con
+    con.close()
+
+
+def append_telemetry(path, *event_ids):
+    con = live.connect_live(path)
+    try:
+        for event_id in event_ids:
+            con.execute(
+                "INSERT OR REPLACE INTO mart.fact_vehicle_telemetry "
+                "(event_id, vehicle_id, driver_id, event_timestamp, engine_temp_c, date_key) "
+                "VALUES (?, 'VH_001', 'DR_001', TIMESTAMP '2026-02-08 08:00:00', 95.0, DATE '2026-02-08')",
+                [event_id],
+            )
+    finally:
+        con.close()
+
+
+def count(con, table):
+    return con.execute(f"SELECT COUNT(*) FROM mart.{table}").fetchone()[0]
+
+
+def test_merge_then_clear_is_idempotent(live_db, build):
+    append_telemetry(live_db, "e1", "e2", "e3")
+
+    assert live.merge_live(build, live_db) == {"rows_in": 3, "rows_out": 3}
+    assert live.clear_merged(live_db) == 3
+    assert count(build, "fact_vehicle_telemetry") == 3
+    assert count(build, "metric_refresh_queue") == 2  # driver and vehicle partitions
+
+    # Nothing left to merge: a second pass changes neither side
+    assert live.merge_live(build, live_db) == {"rows_in": 0, "rows_out": 0}
+    assert live.clear_merged(live_db) == 0
+    assert count(build, "fact_vehicle_telemetry") == 3
+    assert not live.EXPORT_DIR.exists()
+
+
+def test_merging_the_same_rows_twice_does_not_duplicate(live_db, build):
+    append_telemetry(live_db, "e1", "e2")
+
+    # A build that failed after merging leaves the rows live; the next one merges them again
+    live.merge_live(build, live_db)
+    live.merge_live(build, live_db)
+    assert count(build, "fact_vehicle_telemetry") == 2
+
+
+def test_clear_keeps_rows_appended_after_the_export(live_db, build):
+    append_telemetry(live_db, "e1", "e2")
+    live.merge_live(build, live_db)
+    append_telemetry(live_db, "e3")
+
+    assert live.clear_merged(live_db) == 2
+    con = live.connect_live(live_db)
+    try:
+        assert con.execute("SELECT event_id FROM mart.fact_vehicle_telemetry").fetchall() == [("e3",)]
+    finally:
+        con.close()
+
+    assert live.merge_live(build, live_db)["rows_in"] == 1
+    assert count(build, "fact_vehicle_telemetry") == 3
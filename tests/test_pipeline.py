@@ -0,0 +1,91 @@
+# tests/test_pipeline.py
+"""
+pipeline.py end to end on a scratch copy of the repo: step cache
+invalidation, and a failed build resumed with --resume.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parents[1]
+
+# Left out of the scratch copy: anything a run writes
+IGNORED = shutil.ignore_patterns(".git", "__pycache__", ".pytest_cache", "tests", "analytics", "staging")
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    """The repo without warehouse state, so every test builds from scratch."""
+    root = tmp_path / "repo"
+    shutil.copytree(REPO, root, ignore=IGNORED)
+    return root
+
+
+def run_pipeline(workdir, *args):
+    env = {**os.environ, "SLACK_WEBHOOK_URL": ""}
+    return subprocess.run([sys.executable, "pipeline.py", *args], cwd=workdir, env=env,
+                          capture_output=True, text=True, timeout=600)
+
+
+def last_run(workdir):
+    """The latest journaled run and its step statuses."""
+    lines = (workdir / "warehouse/analytics/pipeline_runs.jsonl").read_text().splitlines()
+    entry = json.loads(lines[-1])
+    return entry["run"], {s["step_name"]: s["status"] for s in entry["steps"]}
+
+
+def test_changed_sql_file_invalidates_its_step(workdir):
+    assert run_pipeline(workdir).returncode == 0
+    cache = json.loads((workdir / "warehouse/analytics/step_cache.json").read_text())
+
+    assert run_pipeline(workdir).returncode == 0
+    _, steps = last_run(workdir)
+    assert steps["fact_vehicle_daily_metrics"] == "skipped"
+
+    sql = workdir / "warehouse/sql/facts/fact_vehicle_daily_metrics.sql"
+    sql.write_text(sql.read_text() + "\n-- changed\n")
+    assert run_pipeline(workdir).returncode == 0
+
+    run, steps = last_run(workdir)
+    assert run["status"] == "success"
+    assert steps["fact_vehicle_daily_metrics"] == "success"
+    assert steps["dim_date"] == "skipped" and steps["fact_driver_daily_metrics"] == "skipped"
+    rerun = json.loads((workdir / "warehouse/analytics/step_cache.json").read_text())
+    assert rerun["steps"]["fact_vehicle_daily_metrics"]["key"] != cache["steps"]["fact_vehicle_daily_metrics"]["key"]
+    assert rerun["steps"]["dim_date"]["key"] == cache["steps"]["dim_date"]["key"]
+
+
+def test_failed_step_keeps_build_and_resume_skips_finished_steps(workdir):
+    analytics = workdir / "warehouse/analytics"
+    sql = workdir / "warehouse/sql/facts/fact_driver_daily_metrics.sql"
+    original = sql.read_text()
+    sql.write_text(original + "\nSELECT * FROM no_such_table;\n")
+
+    assert run_pipeline(workdir).returncode == 1
+    failed, steps = last_run(workdir)
+    assert failed["status"] == "failed"
+    assert steps["fact_driver_daily_metrics"] == "failed"
+    assert steps["build_analytics"] == "success"
+    # Kept for --resume, but never where published snapshots live
+    [build] = (analytics / "builds").glob("*.duckdb")
+    assert not (analytics / "CURRENT").exists()
+    assert not list(analytics.glob("versions/*.duckdb"))
+    assert (analytics / "pipeline_checkpoint.json").exists()
+
+    sql.write_text(original)
+    result = run_pipeline(workdir, "--resume")
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    resumed, steps = last_run(workdir)
+    assert resumed["status"] == "success" and resumed["resumed_from"] == failed["run_id"]
+    assert steps["build_analytics"] == "resumed" and steps["fact_vehicle_telemetry"] == "resumed"
+    assert steps["fact_driver_daily_metrics"] == "success"
+    assert (analytics / "CURRENT").read_text().strip() == build.name
+    assert not list((analytics / "builds").glob("*.duckdb"))
+    assert not (analytics / "pipeline_checkpoint.json").exists()
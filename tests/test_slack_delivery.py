@@ -0,0 +1,129 @@
+# tests/test_slack_delivery.py
+"""
+slack_delivery.py against the in-process stub webhook: 429s, 5xx retries,
+dead-lettering and replay.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from slack_delivery import StubWebhook, deliver, replay_dead_letters, retry_after_seconds
+
+# Client limits well above the stub's, so the stub decides what gets through
+FAST = {"rate": 100.0, "burst": 10, "workers": 2}
+
+
+@pytest.fixture
+def make_stub():
+    servers = []
+
+    def _make(**options):
+        servers.append(StubWebhook(port=0, **options).start())
+        return servers[-1]
+
+    yield _make
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def stub(make_stub):
+    """Rate-limited stub: one message per second, no burst."""
+    return make_stub(rate=1.0, burst=1)
+
+
+@pytest.fixture
+def unlimited_stub(make_stub):
+    """Stub that never answers 429, so only fail_rate decides."""
+    return make_stub(rate=1000.0, burst=1000)
+
+
+def read_dead_letters(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert retry_after_seconds("2") == 2.0
+    assert retry_after_seconds("0.5") == 0.5
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds("soon") is None
+
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 28 <= retry_after_seconds(later) <= 30
+    earlier = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=30), usegmt=True)
+    assert retry_after_seconds(earlier) == 0.0
+
+
+def test_429_waits_for_retry_after_seconds(stub, tmp_path):
+    dead_letters = tmp_path / "dead.jsonl"
+    stats = deliver([{"text": f"m{i}"} for i in range(2)], stub.url, dead_letter_path=dead_letters, **FAST)
+
+    assert stats["sent"] == 2 and stats["dead_lettered"] == 0
+    assert stats["retried"] >= 1 and stub.rejected[429] >= 1
+    assert sorted(m["text"] for m in stub.received) == ["m0", "m1"]
+    assert not dead_letters.exists()
+
+
+def test_429_waits_for_retry_after_http_date(stub, tmp_path):
+    stub.retry_after = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=2), usegmt=True)
+    stats = deliver([{"text": f"m{i}"} for i in range(2)], stub.url, dead_letter_path=tmp_path / "dead.jsonl", **FAST)
+
+    assert stats["sent"] == 2 and stats["dead_lettered"] == 0
+    assert stub.rejected[429] >= 1
+
+
+def test_5xx_retries_then_dead_letters(unlimited_stub, tmp_path):
+    unlimited_stub.fail_rate = 1.0
+    dead_letters = tmp_path / "dead.jsonl"
+    stats = deliver([{"text": "down"}], unlimited_stub.url, dead_letter_path=dead_letters, max_attempts=2, **FAST)
+
+    assert stats == {"sent": 0, "retried": 1, "dead_lettered": 1}
+    assert unlimited_stub.rejected[500] == 2
+    [entry] = read_dead_letters(dead_letters)
+    assert entry["status"] == 500 and entry["attempts"] == 2
+    assert entry["payload"] == {"text": "down"} and entry["webhook_url"] == unlimited_stub.url
+
+
+def test_replay_resends_and_removes_dead_letters(unlimited_stub, tmp_path):
+    unlimited_stub.fail_rate = 1.0
+    dead_letters = tmp_path / "dead.jsonl"
+    deliver([{"text": "later"}], unlimited_stub.url, dead_letter_path=dead_letters, max_attempts=1, **FAST)
+    assert len(read_dead_letters(dead_letters)) == 1
+
+    unlimited_stub.fail_rate = 0.0
+    stats = replay_dead_letters(dead_letters, **FAST)
+
+    assert stats["sent"] == 1 and stats["dead_lettered"] == 0
+    assert unlimited_stub.received == [{"text": "later"}]
+    assert not dead_letters.exists()
+    assert not dead_letters.with_name(dead_letters.name + ".replaying").exists()
+
+
+def test_replay_dead_letters_failures_again(unlimited_stub, tmp_path):
+    unlimited_stub.fail_rate = 1.0
+    dead_letters = tmp_path / "dead.jsonl"
+    deliver([{"text": "still down"}], unlimited_stub.url, dead_letter_path=dead_letters, max_attempts=1, **FAST)
+
+    stats = replay_dead_letters(dead_letters, max_attempts=1, **FAST)
+
+    assert stats["dead_lettered"] == 1
+    assert [e["payload"] for e in read_dead_letters(dead_letters)] == [{"text": "still down"}]
+
+
+def test_replay_picks_up_an_interrupted_replay(unlimited_stub, tmp_path):
+    dead_letters = tmp_path / "dead.jsonl"
+    entry = {"webhook_url": unlimited_stub.url, "status": 500, "error": None, "attempts": 1}
+    # Moved aside by a replay that never finished, plus a newer failure
+    dead_letters.with_name(dead_letters.name + ".replaying").write_text(
+        json.dumps({**entry, "payload": {"text": "interrupted"}}) + "\n")
+    dead_letters.write_text(json.dumps({**entry, "payload": {"text": "new"}}) + "\n")
+
+    stats = replay_dead_letters(dead_letters, **FAST)
+
+    assert stats["sent"] == 2 and stats["dead_lettered"] == 0
+    assert sorted(m["text"] for m in unlimited_stub.received) == ["interrupted", "new"]
+    assert not dead_letters.exists()
+    assert not dead_letters.with_name(dead_letters.name + ".replaying").exists()
@@ -0,0 +1,204 @@
+"""
+warehouse/alert_state.py
+------------------------
+Deduplication state for run_alerts.py, keyed by (rule, entity, metric).
+
+Each row records when the condition was first seen, when it was last seen
+and last sent, and at which severity. A hit is sent only if it is new, its
+last send is older than the cooldown, or its severity is higher than the
+last one sent; other hits are counted as suppressed. Keys a rule no longer
+returns are dropped, so a condition that clears and comes back is new again.
+
+All of a run's results go through one batched join against the state
+table, and the state is updated from the same join, in one transaction.
+Published snapshots are never written, so the state lives in its own small
+DuckDB file.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from warehouse.snapshots import ANALYTICS_DIR
+
+# Config
+STATE_DB_PATH = ANALYTICS_DIR / "alert_state.duckdb"
+
+# Hours before an unchanged alert is sent again (ALERT_COOLDOWN_HOURS overrides)
+DEFAULT_COOLDOWN_HOURS = 72.0
+COOLDOWN_ENV = "ALERT_COOLDOWN_HOURS"
+
+SEVERITY_RANK = {"INFO": 0, "WARNING": 1, "CRITICAL": 2}
+
+# Another process (e.g. the stream evaluator) may hold the file briefly
+LOCK_TIMEOUT_SECONDS = 10.0
+LOCK_POLL_SECONDS = 0.2
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_state (
+    rule                VARCHAR,
+    entity_id           VARCHAR,
+    metric_name         VARCHAR,
+    severity            VARCHAR,   -- as last seen
+    metric_value        DOUBLE,
+    first_seen          TIMESTAMP,
+    last_seen           TIMESTAMP,
+    last_sent           TIMESTAMP,
+    last_sent_severity  VARCHAR,
+    times_sent          INTEGER,
+    times_suppressed    INTEGER,
+    PRIMARY KEY (rule, entity_id, metric_name)
+);
+CREATE TABLE IF NOT EXISTS severity_rank (
+    severity VARCHAR PRIMARY KEY,
+    rank     INTEGER
+);
+"""
+
+# One row per hit, with the decision. Duplicate keys within a run keep
+# their highest severity.
+DECIDE_SQL = """
+CREATE OR REPLACE TEMP TABLE alert_decisions AS
+WITH hits AS (
+    SELECT * EXCLUDE (rn) FROM (
+        SELECT
+            r.* REPLACE (
+                CAST(r.rule AS VARCHAR)        AS rule,
+                CAST(r.metric_name AS VARCHAR) AS metric_name,
+                CAST(r.severity AS VARCHAR)    AS severity
+            ),
+            CAST(r.entity_id AS VARCHAR)   AS key_entity,
+            COALESCE(sr.rank, 0)           AS severity_rank,
+            ROW_NUMBER() OVER (
+                PARTITION BY r.rule, CAST(r.entity_id AS VARCHAR), r.metric_name
+                ORDER BY COALESCE(sr.rank, 0) DESC
+            )                              AS rn
+        FROM alert_results r
+        LEFT JOIN severity_rank sr ON sr.severity = CAST(r.severity AS VARCHAR)
+    ) WHERE rn = 1
+)
+SELECT
+    h.*,
+    s.first_seen,
+    s.last_sent,
+    s.last_sent_severity,
+    (
+        s.rule IS NULL
+        OR s.last_sent IS NULL
+        OR s.last_sent <= $now - to_microseconds(CAST($cooldown_us AS BIGINT))
+        OR h.severity_rank > COALESCE(ls.rank, 0)
+    )                                      AS should_send
+FROM hits h
+LEFT JOIN alert_state s
+  ON s.rule = h.rule AND s.entity_id = h.key_entity AND s.metric_name = h.metric_name
+LEFT JOIN severity_rank ls ON ls.severity = s.last_sent_severity
+"""
+
+UPSERT_SQL = """
+INSERT INTO alert_state
+SELECT
+    rule, key_entity, metric_name, severity, CAST(metric_value AS DOUBLE),
+    $now, $now,
+    CASE WHEN should_send THEN $now END,
+    CASE WHEN should_send THEN severity END,
+    CASE WHEN should_send THEN 1 ELSE 0 END,
+    CASE WHEN should_send THEN 0 ELSE 1 END
+FROM alert_decisions
+ON CONFLICT (rule, entity_id, metric_name) DO UPDATE SET
+    severity           = excluded.severity,
+    metric_value       = excluded.metric_value,
+    last_seen          = excluded.last_seen,
+    last_sent          = COALESCE(excluded.last_sent, alert_state.last_sent),
+    last_sent_severity = COALESCE(excluded.last_sent_severity, alert_state.last_sent_severity),
+    times_sent         = alert_state.times_sent + excluded.times_sent,
+    times_suppressed   = alert_state.times_suppressed + excluded.times_suppressed
+"""
+
+# Keys of evaluated rules that did not fire this time have cleared
+CLEAR_SQL = """
+DELETE FROM alert_state s
+WHERE list_contains($rules, s.rule)
+  AND NOT EXISTS (
+      SELECT 1 FROM alert_decisions d
+      WHERE d.rule = s.rule AND d.key_entity = s.entity_id AND d.metric_name = s.metric_name
+  )
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def cooldown_hours_from_env() -> float:
+    value = os.getenv(COOLDOWN_ENV)
+    return float(value) if value else DEFAULT_COOLDOWN_HOURS
+
+
+def _connect(path: Path):
+    import duckdb
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+    while True:
+        try:
+            return duckdb.connect(str(path))
+        except duckdb.IOException:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(LOCK_POLL_SECONDS)
+
+
+class AlertStateStore:
+    """Cooldown / escalation filter over the state file at `path`."""
+
+    def __init__(self, path: Path = STATE_DB_PATH, cooldown_hours: Optional[float] = None):
+        self.path = Path(path)
+        self.cooldown_hours = cooldown_hours_from_env() if cooldown_hours is None else cooldown_hours
+
+    def filter(self, results, rules: Iterable[str], now: Optional[datetime] = None, record: bool = True):
+        """
+        Hits to send now, out of `results` (the alert query columns plus
+        `rule`), and record them unless `record` is False. `rules` lists
+        every rule evaluated this run, including those that returned
+        nothing, so their cleared keys are dropped. Returns the sendable
+        rows with `first_seen` added.
+        """
+        now = now or datetime.now()
+        rules = sorted(set(rules))
+        cooldown_us = int(self.cooldown_hours * 3600 * 1_000_000)
+
+        con = _connect(self.path)
+        try:
+            con.execute(STATE_SCHEMA)
+            con.executemany(
+                "INSERT OR REPLACE INTO severity_rank VALUES (?, ?)", list(SEVERITY_RANK.items())
+            )
+            con.register("alert_results", results)
+            con.execute("BEGIN")
+            try:
+                con.execute(DECIDE_SQL, {"now": now, "cooldown_us": cooldown_us})
+                con.execute(UPSERT_SQL, {"now": now})
+                con.execute(CLEAR_SQL, {"rules": rules})
+                sendable = con.execute(
+                    f"SELECT {', '.join(_quoted(results.columns))}, COALESCE(first_seen, $now) AS first_seen "
+                    "FROM alert_decisions WHERE should_send ORDER BY rule, severity_rank DESC, key_entity",
+                    {"now": now},
+                ).df()
+                counts = con.execute(
+                    "SELECT COUNT(*) FILTER (should_send), COUNT(*) FILTER (NOT should_send) FROM alert_decisions"
+                ).fetchone()
+                con.execute("COMMIT" if record else "ROLLBACK")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+        finally:
+            con.close()
+
+        logger.info("Alert state: %s to send, %s suppressed (cooldown %sh)",
+                    counts[0], counts[1], self.cooldown_hours)
+        return sendable
+
+
+def _quoted(columns) -> list:
+    return ['"' + str(c).replace('"', '""') + '"' for c in columns]
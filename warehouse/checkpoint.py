@@ -0,0 +1,104 @@
+"""
+warehouse/checkpoint.py
+-----------------------
+Per-run checkpoint for pipeline.py, so a failed run can be resumed.
+
+The file is rewritten after every step that completes and holds:
+- each completed step's cache key, output hash and duration
+- the load batch: the private snapshot build the run was writing (build
+  steps commit one transaction each, so the file holds exactly the
+  completed ones), the snapshot it was seeded from, and whether it was
+  published
+
+A successful run removes it. `pipeline.py --resume` reads it back and
+skips completed steps whose key still matches; build steps are only
+reused when the build file survived and nothing else has published since
+it was seeded.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from warehouse.snapshots import ANALYTICS_DIR
+
+# Config
+CHECKPOINT_PATH = ANALYTICS_DIR / "pipeline_checkpoint.json"
+
+logger = logging.getLogger(__name__)
+
+
+class RunCheckpoint:
+    """
+    Completed steps and the build of one pipeline run.
+    Safe to use from the pipeline's worker threads.
+    """
+
+    def __init__(self, run_id: str, started_at: str, names: List[str], path: Path = CHECKPOINT_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.run_id = run_id
+        self.started_at = started_at
+        self.names = list(names)
+        self.steps: Dict[str, Dict] = {}
+        self.build_path: Optional[str] = None
+        self.seed_version: Optional[str] = None
+        self.published = False
+
+    @classmethod
+    def load(cls, path: Path = CHECKPOINT_PATH) -> Optional["RunCheckpoint"]:
+        """The unfinished run's checkpoint, or None."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable pipeline checkpoint %s: %s", path, e)
+            return None
+        checkpoint = cls(data["run_id"], data["started_at"], data["names"], path)
+        checkpoint.steps = data.get("steps", {})
+        checkpoint.build_path = data.get("build_path")
+        checkpoint.seed_version = data.get("seed_version")
+        checkpoint.published = data.get("published", False)
+        return checkpoint
+
+    # Updates (each one is persisted)
+    def record_step(self, name: str, phase: str, duration_s: float,
+                    key: Optional[str] = None, output: Optional[str] = None) -> None:
+        with self.lock:
+            self.steps[name] = {"phase": phase, "duration_s": round(duration_s, 4), "key": key, "output": output}
+        self.save()
+
+    def set_build(self, build_path: Path, seed_version: Optional[str]) -> None:
+        with self.lock:
+            self.build_path = str(build_path)
+            self.seed_version = seed_version
+        self.save()
+
+    def mark_published(self) -> None:
+        with self.lock:
+            self.published = True
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            payload = json.dumps({
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                "names": self.names,
+                "build_path": self.build_path,
+                "seed_version": self.seed_version,
+                "published": self.published,
+                "steps": self.steps,
+            }, indent=1, sort_keys=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(payload)
+            os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,204 @@
+"""
+warehouse/live.py
+-----------------
+Live database the streaming writers append their micro-batches to.
+
+Building a snapshot per micro-batch copies the whole warehouse every few
+seconds, churns versions readers may still have open and fights the
+nightly build for the build lock. Instead, writers append each batch to
+warehouse/analytics/live.duckdb (the warehouse schema, fact tables only
+used), and the rows reach a published snapshot in one of two ways:
+
+1. the nightly pipeline's merge_live step folds them into its build
+2. a writer's publish_live(), every --publish-every seconds, builds a
+   snapshot from the current one plus the live rows. It never waits for
+   the build lock; when the nightly build holds it, that build merges them
+
+Either way the live rows are exported once, upserted into the build and
+queued for metric refresh (merge_live), and deleted from the live database
+only after the build is published (clear_merged), so a failed build loses
+nothing. Both happen under the build lock.
+"""
+
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from warehouse.snapshots import ANALYTICS_DIR, begin_build, build_lock, discard, publish
+
+# Config
+LIVE_DB_PATH = ANALYTICS_DIR / "live.duckdb"
+EXPORT_DIR = ANALYTICS_DIR / "live_merge"
+SCHEMA_PATH = Path("warehouse/sql/schema.sql")
+
+# Seconds between a writer's snapshot publishes (0 leaves it to the nightly build)
+DEFAULT_PUBLISH_EVERY = 300.0
+
+# Writers and the merge open the file briefly, one process at a time
+LOCK_TIMEOUT_SECONDS = 30.0
+LOCK_POLL_SECONDS = 0.2
+
+# Metric partitions each fact table feeds; the exported rows are live_rows
+QUEUE_SQL = {
+    "fact_vehicle_telemetry": """
+        INSERT OR IGNORE INTO mart.metric_refresh_queue
+        SELECT DISTINCT 'driver', driver_id, date_key, now() FROM live_rows
+        UNION
+        SELECT DISTINCT 'vehicle', vehicle_id, date_key, now() FROM live_rows
+    """,
+    "fact_driver_shifts": """
+        INSERT OR IGNORE INTO mart.metric_refresh_queue
+        SELECT DISTINCT 'driver', driver_id, date_key, now() FROM live_rows
+    """,
+    "fact_daily_finance": """
+        INSERT OR IGNORE INTO mart.metric_refresh_queue
+        SELECT DISTINCT 'driver', driver_id, date_key, now() FROM live_rows
+    """,
+}
+LIVE_TABLES = tuple(QUEUE_SQL)
+
+# Dimensions first (metrics join dim_driver), then the queued partitions
+REFRESH_SQL = [
+    "warehouse/sql/dimensions/dim_driver.sql",
+    "warehouse/sql/dimensions/dim_vehicle.sql",
+    "warehouse/sql/facts/fact_driver_daily_metrics.sql",
+    "warehouse/sql/facts/fact_vehicle_daily_metrics.sql",
+]
+
+logger = logging.getLogger(__name__)
+
+# Live files whose schema this process has already applied
+_prepared = set()
+
+
+def connect_live(path: Path = LIVE_DB_PATH):
+    """
+    Read-write connection to the live database, created on first use.
+    Retries while another writer or a merge holds the file.
+    """
+    import duckdb
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + LOCK_TIMEOUT_SECONDS
+    while True:
+        try:
+            con = duckdb.connect(str(path))
+            break
+        except duckdb.IOException:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(LOCK_POLL_SECONDS)
+
+    if str(path) not in _prepared:
+        con.execute(SCHEMA_PATH.read_text())
+        _prepared.add(str(path))
+    return con
+
+
+def export_live(path: Path = LIVE_DB_PATH) -> Dict[str, Path]:
+    """
+    Copy every live fact table that has rows to EXPORT_DIR as Parquet.
+    Returns {table: file}. The live file is only held while copying.
+    """
+    shutil.rmtree(EXPORT_DIR, ignore_errors=True)
+    if not Path(path).exists():
+        return {}
+
+    exports = {}
+    con = connect_live(path)
+    try:
+        for table in LIVE_TABLES:
+            if not con.execute(f"SELECT COUNT(*) FROM mart.{table}").fetchone()[0]:
+                continue
+            EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+            target = EXPORT_DIR / f"{table}.parquet"
+            con.execute(f"COPY (SELECT * FROM mart.{table}) TO '{target.as_posix()}' (FORMAT parquet)")
+            exports[table] = target
+    finally:
+        con.close()
+    return exports
+
+
+def merge_live(con, path: Path = LIVE_DB_PATH, exports: Optional[Dict[str, Path]] = None) -> Dict:
+    """
+    Upsert the live rows (exported now unless `exports` is given) into the
+    build on `con` and queue the metric partitions they touch. Returns row
+    counts for pipeline telemetry.
+    """
+    if exports is None:
+        exports = export_live(path)
+
+    merged = 0
+    for table, export in exports.items():
+        con.execute(f"CREATE OR REPLACE TEMP VIEW live_rows AS SELECT * FROM read_parquet('{export.as_posix()}')")
+        try:
+            rows = con.execute("SELECT COUNT(*) FROM live_rows").fetchone()[0]
+            con.execute(f"INSERT OR REPLACE INTO mart.{table} BY NAME SELECT * FROM live_rows")
+            con.execute(QUEUE_SQL[table])
+        finally:
+            con.execute("DROP VIEW IF EXISTS live_rows")
+        logger.info("Merged %s live rows into %s", f"{rows:,}", table)
+        merged += rows
+    return {"rows_in": merged, "rows_out": merged}
+
+
+def clear_merged(path: Path = LIVE_DB_PATH) -> int:
+    """
+    Delete the rows of the last export from the live database, once the
+    build they were merged into is published. Rows appended since stay.
+    """
+    exports = sorted(EXPORT_DIR.glob("*.parquet")) if EXPORT_DIR.exists() else []
+    if not exports or not Path(path).exists():
+        shutil.rmtree(EXPORT_DIR, ignore_errors=True)
+        return 0
+
+    deleted = 0
+    con = connect_live(path)
+    try:
+        for export in exports:
+            deleted += con.execute(
+                f"DELETE FROM mart.{export.stem} WHERE event_id IN "
+                f"(SELECT event_id FROM read_parquet('{export.as_posix()}'))"
+            ).fetchone()[0]
+    finally:
+        con.close()
+    shutil.rmtree(EXPORT_DIR, ignore_errors=True)
+    return deleted
+
+
+def publish_live(path: Path = LIVE_DB_PATH) -> Optional[int]:
+    """
+    Publish a snapshot with the live rows merged and their metric
+    partitions refreshed. Returns the rows published, 0 when there were
+    none, or None when another build holds the lock (it will merge them).
+    """
+    import duckdb
+
+    try:
+        with build_lock(timeout=0):
+            exports = export_live(path)
+            if not exports:
+                return 0
+            build_path = begin_build()
+            try:
+                con = duckdb.connect(str(build_path))
+                try:
+                    merged = merge_live(con, path, exports)["rows_out"]
+                    for sql_file in REFRESH_SQL:
+                        for statement in duckdb.extract_statements(Path(sql_file).read_text()):
+                            con.execute(statement)
+                finally:
+                    con.close()
+            except Exception:
+                discard(build_path)
+                raise
+
+            publish(build_path)
+            clear_merged(path)
+            return merged
+    except TimeoutError:
+        logger.info("Another build holds the lock; it will merge the live rows")
+        return None
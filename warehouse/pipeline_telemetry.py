@@ -0,0 +1,123 @@
+"""
+warehouse/pipeline_telemetry.py
+-------------------------------
+Run and step records for pipeline.py.
+
+Every run is appended to a JSONL journal, whatever its outcome. Published
+snapshots are never written, so the journal is loaded into
+mart.pipeline_runs / mart.pipeline_steps by the next build, just before it
+is published; that build's own run is included with status 'running' and
+the stage/build steps finished so far, and is completed by the run after.
+The daily workflow commits the journal, so that run can see it.
+
+A build loads only the journaled runs its snapshot lacks or holds as
+'running', and once it is published the runs it holds complete are
+trimmed from the journal, so neither grows with the run history.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from warehouse.snapshots import ANALYTICS_DIR
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Config
+JOURNAL_PATH = ANALYTICS_DIR / "pipeline_runs.jsonl"
+
+RUN_COLUMNS = [
+    "run_id", "started_at", "finished_at", "duration_s", "status",
+    "steps_run", "steps_skipped", "critical_path_s", "snapshot", "error",
+    "resumed_from", "resume_saved_s",
+]
+STEP_COLUMNS = [
+    "run_id", "step_name", "phase", "started_at", "duration_s", "status",
+    "rows_in", "rows_out", "rows_rejected", "bytes_read", "peak_rss_mb", "error",
+]
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MiB."""
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def append_run(run: Dict, steps: List[Dict]) -> None:
+    JOURNAL_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with JOURNAL_PATH.open("a") as f:
+        f.write(json.dumps({"run": run, "steps": steps}, default=str))
+        f.write("\n")
+
+
+def load_journal() -> List[Dict]:
+    if not JOURNAL_PATH.exists():
+        return []
+    entries = []
+    with JOURNAL_PATH.open() as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A run killed mid-write leaves a partial last line
+                logger.warning("Skipping unreadable pipeline journal line")
+    return entries
+
+
+def write_tables(con, run: Dict, steps: List[Dict]) -> Set[str]:
+    """
+    Upsert the journaled runs the build does not hold yet (or holds as
+    'running') plus the in-progress one. INSERT OR REPLACE lets a later
+    build complete a run's 'running' row. Returns the journaled run ids the
+    build now holds complete, for trim_journal() once it is published.
+    """
+    import pandas as pd  # only builds write the tables; keeps `pipeline --list` / stage runs light
+
+    stored = dict(con.execute("SELECT run_id, status FROM mart.pipeline_runs").fetchall())
+    journal = load_journal()
+    pending = [e for e in journal if stored.get(e["run"]["run_id"], "running") == "running"]
+    entries = pending + [{"run": run, "steps": steps}]
+
+    runs_df = pd.DataFrame([e["run"] for e in entries], columns=RUN_COLUMNS)
+    steps_df = pd.DataFrame([s for e in entries for s in e["steps"]], columns=STEP_COLUMNS)
+    for df in (runs_df, steps_df):
+        for col in ("started_at", "finished_at"):
+            if col in df:
+                df[col] = pd.to_datetime(df[col])
+
+    con.register("pipeline_runs_df", runs_df)
+    con.register("pipeline_steps_df", steps_df)
+    try:
+        con.execute("INSERT OR REPLACE INTO mart.pipeline_runs BY NAME SELECT * FROM pipeline_runs_df")
+        con.execute("INSERT OR REPLACE INTO mart.pipeline_steps BY NAME SELECT * FROM pipeline_steps_df")
+    finally:
+        con.unregister("pipeline_runs_df")
+        con.unregister("pipeline_steps_df")
+
+    logger.info("Loaded %s of %s journaled run(s) into pipeline telemetry", len(pending), len(journal))
+    return {e["run"]["run_id"] for e in journal if e["run"]["status"] != "running"}
+
+
+def trim_journal(run_ids: Iterable[str]) -> None:
+    """
+    Drop `run_ids` from the journal: call once the snapshot holding them
+    complete is published. Runs journaled since are kept.
+    """
+    run_ids = set(run_ids)
+    if not run_ids or not JOURNAL_PATH.exists():
+        return
+    kept = [e for e in load_journal() if e["run"]["run_id"] not in run_ids]
+    tmp = JOURNAL_PATH.with_name(JOURNAL_PATH.name + ".tmp")
+    with tmp.open("w") as f:
+        for entry in kept:
+            f.write(json.dumps(entry, default=str))
+            f.write("\n")
+    os.replace(tmp, JOURNAL_PATH)
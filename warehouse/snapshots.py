@@ -0,0 +1,256 @@
+"""
+warehouse/snapshots.py
+----------------------
+Versioned snapshot publishing for the analytics database.
+
+The dashboard only ever reads a published snapshot, and the pipeline
+never writes into one:
+
+1. begin_build() copies the current snapshot into a new file in builds/
+2. the pipeline writes into that file (handed to child scripts via env)
+3. publish() moves it into versions/ and atomically swaps the CURRENT
+   pointer to it
+
+Only published snapshots ever live in versions/, so a failed build left
+for --resume is never mistaken for (or committed as) a snapshot.
+
+Readers resolve CURRENT and reopen when it changes, so refreshes are
+zero-downtime and the build never waits on DuckDB's file lock.
+
+Writers (the nightly pipeline, the streaming ingest service) hold
+build_lock() from begin_build() to publish(), so one never publishes over
+a snapshot the other has not seen.
+"""
+
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+# Config
+ANALYTICS_DIR = Path("warehouse/analytics")
+VERSIONS_DIR = ANALYTICS_DIR / "versions"
+BUILDS_DIR = ANALYTICS_DIR / "builds"
+CURRENT_POINTER = ANALYTICS_DIR / "CURRENT"
+
+# Pre-snapshot location; still used when nothing has been published yet
+LEGACY_DB_PATH = ANALYTICS_DIR / "analytics.duckdb"
+
+# Hands the in-progress build file to child pipeline scripts
+BUILD_DB_ENV = "FLEETINTEL_BUILD_DB"
+
+# Published versions kept on disk (older ones may still have readers)
+KEEP_VERSIONS = 2
+
+# Held by whichever writer is between begin_build() and publish()
+BUILD_LOCK = ANALYTICS_DIR / "BUILD.lock"
+LOCK_POLL_SECONDS = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+# Resolution
+def current_version() -> Optional[str]:
+    """
+    Name of the published snapshot file, or None before the first publish.
+    """
+    if not CURRENT_POINTER.exists():
+        return None
+    version = CURRENT_POINTER.read_text().strip()
+    return version or None
+
+
+def current_db_path() -> Path:
+    """
+    Path of the snapshot readers should open.
+    """
+    version = current_version()
+    if version is None:
+        return LEGACY_DB_PATH
+    return VERSIONS_DIR / version
+
+
+def build_db_path() -> Path:
+    """
+    Path pipeline writers should open.
+    Inside a snapshot build this is the private build file; standalone
+    script runs fall back to the current database as before.
+    """
+    override = os.environ.get(BUILD_DB_ENV)
+    if override:
+        return Path(override)
+    return current_db_path()
+
+
+# Build lock
+def _lock_is_stale() -> bool:
+    """
+    True when the lock file's owner process no longer exists.
+    """
+    try:
+        pid = int(BUILD_LOCK.read_text().strip())
+    except (OSError, ValueError):
+        # Unreadable or half-written; treat as live and let the owner finish
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+@contextmanager
+def build_lock(timeout: Optional[float] = None):
+    """
+    Exclusive lock around a build -> publish cycle.
+    Waits up to `timeout` seconds (forever when None), then raises TimeoutError.
+    """
+    ANALYTICS_DIR.mkdir(parents=True, exist_ok=True)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    waited = False
+
+    while True:
+        try:
+            fd = os.open(BUILD_LOCK, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if _lock_is_stale():
+                logger.warning("Removing stale build lock %s", BUILD_LOCK)
+                BUILD_LOCK.unlink(missing_ok=True)
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for build lock {BUILD_LOCK}")
+            if not waited:
+                logger.info("Waiting for another build to publish...")
+                waited = True
+            time.sleep(LOCK_POLL_SECONDS)
+
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        BUILD_LOCK.unlink(missing_ok=True)
+
+
+# Build lifecycle
+def _wal_path(db_path: Path) -> Path:
+    return db_path.with_name(db_path.name + ".wal")
+
+
+def new_build_path() -> Path:
+    """
+    Fresh, not-yet-existing database path for an unpublished build.
+    Names sort chronologically, which prune_versions relies on once the
+    build is published under the same name.
+    """
+    BUILDS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return BUILDS_DIR / f"analytics_{stamp}.duckdb"
+
+
+def begin_build() -> Path:
+    """
+    Create a new build file seeded from the current snapshot.
+    The pipeline loads incrementally, so it needs yesterday's state.
+    """
+    build_path = new_build_path()
+
+    source = current_db_path()
+    if source.exists():
+        shutil.copy2(source, build_path)
+        if _wal_path(source).exists():
+            shutil.copy2(_wal_path(source), _wal_path(build_path))
+        logger.info("Seeded build %s from %s", build_path.name, source)
+    else:
+        logger.info("No published snapshot found. Starting build %s from scratch", build_path.name)
+
+    return build_path
+
+
+def publish(build_path: Path) -> Path:
+    """
+    Move a finished build into versions/ and atomically point CURRENT at it.
+    All connections to the build file must be closed first.
+    Returns the published path.
+    """
+    build_path = Path(build_path)
+    if not build_path.exists():
+        raise FileNotFoundError(f"Build file not found: {build_path}")
+
+    version_path = VERSIONS_DIR / build_path.name
+    if build_path.resolve() != version_path.resolve():
+        VERSIONS_DIR.mkdir(parents=True, exist_ok=True)
+        # WAL first, so the database is never visible in versions/ without it
+        if _wal_path(build_path).exists():
+            os.replace(_wal_path(build_path), _wal_path(version_path))
+        os.replace(build_path, version_path)
+
+    tmp_pointer = CURRENT_POINTER.with_name(CURRENT_POINTER.name + ".tmp")
+    with tmp_pointer.open("w") as f:
+        f.write(build_path.name + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_pointer, CURRENT_POINTER)
+
+    logger.info("Published snapshot %s", build_path.name)
+    prune_versions(keep=KEEP_VERSIONS)
+    return version_path
+
+
+@contextmanager
+def standalone_build():
+    """
+    Build file for a pipeline script run on its own. Inside a pipeline
+    build (BUILD_DB_ENV set) that build's file; otherwise a new build taken
+    under the build lock, published when the block completes and discarded
+    when it raises. Connections to it must be closed inside the block.
+    """
+    override = os.environ.get(BUILD_DB_ENV)
+    if override:
+        yield Path(override)
+        return
+
+    with build_lock():
+        build_path = begin_build()
+        try:
+            yield build_path
+        except BaseException:
+            discard(build_path)
+            raise
+        publish(build_path)
+
+
+def discard(build_path: Path) -> None:
+    """
+    Drop an unpublished build (e.g. after a pipeline failure).
+    """
+    build_path = Path(build_path)
+    for path in (build_path, _wal_path(build_path)):
+        if path.exists():
+            path.unlink()
+    logger.info("Removed database file %s", build_path.name)
+
+
+def prune_versions(keep: int = KEEP_VERSIONS) -> None:
+    """
+    Delete published versions older than the newest `keep`.
+    Versions newer than CURRENT (published by a racing writer) are left alone.
+    """
+    current = current_version()
+    if current is None:
+        return
+
+    published = sorted(p for p in VERSIONS_DIR.glob("analytics_*.duckdb") if p.name <= current)
+    for path in published[:-max(keep, 1)]:
+        try:
+            discard(path)
+        except OSError as e:
+            # A reader may still hold the file open (Windows); retry next publish
+            logger.warning("Could not prune %s: %s", path.name, e)
@@ -0,0 +1,18 @@
+-- warehouse/sql/alerts/alert_baseline_anomaly.sql
+-- Latest day's metrics far from the entity's own EWMA baseline, in the
+-- risky direction (low battery, high everything else)
+SELECT
+    s.entity_id                         AS entity_id,
+    s.entity_type                       AS entity_type,
+    s.metric_name || '_zscore'          AS metric_name,
+    ROUND(s.z_score, 2)                 AS metric_value,
+    CASE
+        WHEN ABS(s.z_score) >= t.critical_threshold THEN 'CRITICAL'
+        ELSE 'WARNING'
+    END                                 AS severity,
+    t.description || ': ' || s.metric_name || ' ' || ROUND(s.metric_value, 3)
+        || ' vs usual ' || ROUND(s.baseline_mean, 3) AS description
+FROM mart.fact_entity_baseline_scores s
+JOIN mart.alert_thresholds t ON t.metric_name = 'baseline_zscore' AND t.is_active
+WHERE s.date_key = (SELECT MAX(date_key) FROM mart.fact_entity_baseline_scores)
+  AND CASE WHEN s.metric_name = 'battery_voltage' THEN -s.z_score ELSE s.z_score END >= t.warning_threshold;
@@ -0,0 +1,114 @@
+-- FACT: Entity Baselines (Incremental EWMA state)
+-- Grain: 1 row per entity per metric (state) + 1 score row per entity, metric and day
+-- Sources:
+--   mart.fact_vehicle_daily_metrics
+--   mart.fact_driver_daily_metrics
+-- Purpose: per-vehicle / per-driver "normal", so alerts can fire on a jump
+-- from an entity's own history rather than on a fleet-wide threshold.
+--
+-- Only days after an entity's last_date_key are folded in, oldest first, so
+-- each run touches just the new days. Per day, with alpha = 0.1
+-- (half-life about 6.6 days):
+--   diff = value - mean;  mean += alpha * diff;  var = (1 - alpha) * (var + alpha * diff^2)
+-- and the day's z-score is diff / std of the baseline before it, once the
+-- baseline has 7 days. std is floored per metric so a very steady entity
+-- does not alert on noise. Late corrections to already folded days are not
+-- replayed.
+
+CREATE OR REPLACE TEMP MACRO ewma_mean(prev_mean, prev_days, x) AS
+    CASE WHEN COALESCE(prev_days, 0) = 0 THEN x ELSE prev_mean + 0.1 * (x - prev_mean) END;
+
+CREATE OR REPLACE TEMP MACRO ewma_var(prev_mean, prev_var, prev_days, x) AS
+    CASE WHEN COALESCE(prev_days, 0) = 0 THEN 0.0 ELSE 0.9 * (prev_var + 0.1 * (x - prev_mean) ^ 2) END;
+
+CREATE OR REPLACE TEMP MACRO baseline_std(prev_var, std_floor) AS
+    GREATEST(sqrt(prev_var), std_floor);
+
+CREATE OR REPLACE TEMP MACRO baseline_z(prev_mean, prev_var, prev_days, x, std_floor) AS
+    CASE WHEN COALESCE(prev_days, 0) >= 7 THEN (x - prev_mean) / baseline_std(prev_var, std_floor) END;
+
+-- 1. New (entity, metric, day) values, numbered per key
+CREATE OR REPLACE TEMP TABLE tmp_baseline_days AS
+WITH daily AS (
+    SELECT 'vehicle' AS entity_type, vehicle_id AS entity_id, 'engine_temp_c' AS metric_name,
+           date_key, avg_engine_temp_c AS metric_value
+    FROM mart.fact_vehicle_daily_metrics
+    UNION ALL
+    SELECT 'vehicle', vehicle_id, 'battery_voltage', date_key, avg_battery_voltage
+    FROM mart.fact_vehicle_daily_metrics
+    UNION ALL
+    SELECT 'vehicle', vehicle_id, 'speeding_rate', date_key, speeding_rate
+    FROM mart.fact_vehicle_daily_metrics
+    UNION ALL
+    SELECT 'driver', driver_id, 'speeding_rate', date_key,
+           CAST(speeding_events AS DOUBLE) / NULLIF(total_events, 0)
+    FROM mart.fact_driver_daily_metrics
+    UNION ALL
+    -- Days without shift data carry a COALESCEd 0, not a reading
+    SELECT 'driver', driver_id, 'avg_fatigue_index', date_key, avg_fatigue_index
+    FROM mart.fact_driver_daily_metrics
+    WHERE total_shift_hours > 0
+),
+std_floors (metric_name, std_floor) AS (
+    VALUES ('engine_temp_c', 1.0), ('battery_voltage', 0.05), ('speeding_rate', 0.01), ('avg_fatigue_index', 0.02)
+)
+SELECT
+    d.*,
+    f.std_floor,
+    ROW_NUMBER() OVER (PARTITION BY d.entity_type, d.entity_id, d.metric_name ORDER BY d.date_key) AS seq
+FROM daily d
+JOIN std_floors f ON f.metric_name = d.metric_name
+LEFT JOIN mart.entity_baselines b
+  ON b.entity_type = d.entity_type AND b.entity_id = d.entity_id AND b.metric_name = d.metric_name
+WHERE d.metric_value IS NOT NULL
+  AND d.date_key > COALESCE(b.last_date_key, DATE '1900-01-01');
+
+-- 2. Fold the new days into the stored state, in date order
+CREATE OR REPLACE TEMP TABLE tmp_baseline_fold AS
+WITH RECURSIVE fold AS (
+    SELECT
+        n.entity_type, n.entity_id, n.metric_name, n.seq, n.date_key, n.metric_value,
+        b.ewma_mean AS prev_mean,
+        b.ewma_var AS prev_var,
+        COALESCE(b.days_observed, 0) AS prev_days,
+        n.std_floor,
+        ewma_mean(b.ewma_mean, b.days_observed, n.metric_value) AS ewma_mean,
+        ewma_var(b.ewma_mean, b.ewma_var, b.days_observed, n.metric_value) AS ewma_var,
+        COALESCE(b.days_observed, 0) + 1 AS days_observed
+    FROM tmp_baseline_days n
+    LEFT JOIN mart.entity_baselines b
+      ON b.entity_type = n.entity_type AND b.entity_id = n.entity_id AND b.metric_name = n.metric_name
+    WHERE n.seq = 1
+
+    UNION ALL
+
+    SELECT
+        n.entity_type, n.entity_id, n.metric_name, n.seq, n.date_key, n.metric_value,
+        f.ewma_mean,
+        f.ewma_var,
+        f.days_observed,
+        n.std_floor,
+        ewma_mean(f.ewma_mean, f.days_observed, n.metric_value),
+        ewma_var(f.ewma_mean, f.ewma_var, f.days_observed, n.metric_value),
+        f.days_observed + 1
+    FROM fold f
+    JOIN tmp_baseline_days n
+      ON n.entity_type = f.entity_type AND n.entity_id = f.entity_id AND n.metric_name = f.metric_name
+     AND n.seq = f.seq + 1
+)
+SELECT * FROM fold;
+
+-- 3. Score every folded day against the baseline before it
+INSERT OR REPLACE INTO mart.fact_entity_baseline_scores
+SELECT
+    entity_type, entity_id, metric_name, date_key, metric_value,
+    prev_mean,
+    CASE WHEN prev_days > 0 THEN baseline_std(prev_var, std_floor) END,
+    baseline_z(prev_mean, prev_var, prev_days, metric_value, std_floor)
+FROM tmp_baseline_fold;
+
+-- 4. Keep the state after each key's last folded day
+INSERT OR REPLACE INTO mart.entity_baselines
+SELECT entity_type, entity_id, metric_name, ewma_mean, ewma_var, days_observed, date_key, now()
+FROM tmp_baseline_fold
+QUALIFY seq = MAX(seq) OVER (PARTITION BY entity_type, entity_id, metric_name);
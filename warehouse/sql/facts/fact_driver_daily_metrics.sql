@@ -36,7 +36,10 @@ SELECT DISTINCT driver_id, date_key FROM mart.fact_vehicle_telemetry WHERE date_
 UNION
 SELECT DISTINCT driver_id, date_key FROM mart.fact_driver_shifts WHERE date_key > (SELECT val FROM last_date)
 UNION
-SELECT DISTINCT driver_id, date_key FROM mart.fact_daily_finance WHERE date_key > (SELECT val FROM last_date);
+SELECT DISTINCT driver_id, date_key FROM mart.fact_daily_finance WHERE date_key > (SELECT val FROM last_date)
+UNION
+-- Partitions queued for refresh (late data for days already computed)
+SELECT entity_id, date_key FROM mart.metric_refresh_queue WHERE metric = 'driver';
 
 -- 3. Only attempt DELETE if there are actually dates to refresh
 DELETE FROM mart.fact_driver_daily_metrics
@@ -104,4 +107,7 @@ FROM tmp_driver_dates d
 JOIN mart.dim_driver dim ON d.driver_id = dim.driver_id 
 LEFT JOIN telemetry_agg t ON d.driver_id = t.driver_id AND d.date_key = t.date_key
 LEFT JOIN shift_agg s ON d.driver_id = s.driver_id AND d.date_key = s.date_key
-LEFT JOIN finance_agg f ON d.driver_id = f.driver_id AND d.date_key = f.date_key;
\ No newline at end of file
+LEFT JOIN finance_agg f ON d.driver_id = f.driver_id AND d.date_key = f.date_key;
+
+-- 5. Queued partitions are now up to date
+DELETE FROM mart.metric_refresh_queue WHERE metric = 'driver';
\ No newline at end of file
@@ -0,0 +1,64 @@
+-- FACT: Driver Health (minute level)
+-- Grain: 1 row per driver per shift minute
+-- Source: warehouse/staging/driver_health_intraday_staged.jsonl
+-- Target: mart.fact_driver_health_minute
+--
+-- Staging rewrites the whole intraday feed every run, so the shifts that
+-- gained minutes are queued here for fact_driver_shift_rollup.sql.
+
+CREATE OR REPLACE TEMP TABLE tmp_staged_minutes AS
+SELECT
+    event_id,
+    driver_id,
+    vehicle_id,
+    CAST(timestamp AS TIMESTAMP)                 AS event_timestamp,
+    CAST(timestamp AS DATE)                      AS date_key,
+    shift_minute,
+    speed_kph,
+    driving,
+    on_break,
+    continuous_driving_min,
+    fatigue_index
+-- Explicit columns: the staged file is empty when the stream is not in use
+FROM read_json(
+    'warehouse/staging/driver_health_intraday_staged.jsonl',
+    format = 'newline_delimited',
+    columns = {
+        event_id: 'VARCHAR',
+        driver_id: 'VARCHAR',
+        vehicle_id: 'VARCHAR',
+        timestamp: 'VARCHAR',
+        shift_minute: 'SMALLINT',
+        speed_kph: 'DOUBLE',
+        driving: 'BOOLEAN',
+        on_break: 'BOOLEAN',
+        continuous_driving_min: 'SMALLINT',
+        fatigue_index: 'DOUBLE'
+    }
+)
+WHERE event_id IS NOT NULL
+  AND driver_id IS NOT NULL
+  AND timestamp IS NOT NULL;
+
+INSERT OR IGNORE INTO mart.metric_refresh_queue
+SELECT DISTINCT 'shift', s.driver_id, s.date_key, now()
+FROM tmp_staged_minutes s
+WHERE NOT EXISTS (
+    SELECT 1 FROM mart.fact_driver_health_minute m WHERE m.event_id = s.event_id
+);
+
+INSERT INTO mart.fact_driver_health_minute (
+    event_id,
+    driver_id,
+    vehicle_id,
+    event_timestamp,
+    date_key,
+    shift_minute,
+    speed_kph,
+    driving,
+    on_break,
+    continuous_driving_min,
+    fatigue_index
+)
+SELECT * FROM tmp_staged_minutes
+ON CONFLICT (event_id) DO NOTHING;
@@ -0,0 +1,43 @@
+-- FACT: Driver Shifts rollup from the minute-level stream
+-- Grain: 1 row per driver per shift (event_id shift_<driver>_<date>)
+-- Source: mart.fact_driver_health_minute
+-- Target: mart.fact_driver_shifts
+--
+-- Incremental: only shifts queued by fact_driver_health_minute.sql (those
+-- that gained minute rows this run) are re-aggregated, so the rollup cost
+-- follows the new minutes, not the table size. Staging and the minute load
+-- still read the whole intraday feed.
+
+CREATE OR REPLACE TEMP TABLE tmp_shift_keys AS
+SELECT entity_id AS driver_id, date_key
+FROM mart.metric_refresh_queue
+WHERE metric = 'shift';
+
+INSERT OR REPLACE INTO mart.fact_driver_shifts (
+    event_id,
+    driver_id,
+    event_timestamp,
+    shift_hours,
+    continuous_driving_hours,
+    fatigue_index,
+    breaks_taken,
+    alerts,
+    date_key
+)
+SELECT
+    'shift_' || m.driver_id || '_' || strftime(m.date_key, '%Y%m%d')    AS event_id,
+    m.driver_id,
+    MIN(m.event_timestamp)                                              AS event_timestamp,
+    ROUND(COUNT(*) / 60.0, 1)                                           AS shift_hours,
+    ROUND(MAX(m.continuous_driving_min) / 60.0, 1)                      AS continuous_driving_hours,
+    -- Peak fatigue, as the daily event reported it
+    ROUND(MAX(m.fatigue_index), 2)                                      AS fatigue_index,
+    BOOL_OR(m.on_break)                                                 AS breaks_taken,
+    CASE WHEN MAX(m.fatigue_index) >= 0.6
+         THEN '["fatigue_risk"]' ELSE '[]' END::JSON                    AS alerts,
+    m.date_key
+FROM mart.fact_driver_health_minute m
+JOIN tmp_shift_keys k USING (driver_id, date_key)
+GROUP BY m.driver_id, m.date_key;
+
+DELETE FROM mart.metric_refresh_queue WHERE metric = 'shift';
@@ -3,6 +3,24 @@
 -- Source: mart.fact_vehicle_telemetry
 -- Purpose: Operational KPIs + risk signals per vehicle
 
+-- Ensure the table exists first (fresh snapshot builds start empty)
+CREATE TABLE IF NOT EXISTS mart.fact_vehicle_daily_metrics (
+    vehicle_id                  VARCHAR,
+    date_key                    DATE,
+    telemetry_events            INTEGER,
+    avg_speed_kph               DOUBLE,
+    max_speed_kph               DOUBLE,
+    avg_fuel_percent            DOUBLE,
+    avg_engine_temp_c           DOUBLE,
+    avg_battery_voltage         DOUBLE,
+    speeding_events             INTEGER,
+    speeding_rate               DOUBLE,
+    speeding_alert              BOOLEAN,
+    engine_temp_alert           BOOLEAN,
+    battery_alert               BOOLEAN,
+    PRIMARY KEY (vehicle_id, date_key)
+);
+
 CREATE OR REPLACE TEMP TABLE tmp_vehicle_dates AS
 SELECT DISTINCT
     vehicle_id,
@@ -11,7 +29,12 @@ FROM mart.fact_vehicle_telemetry
 WHERE date_key > COALESCE(
     (SELECT MAX(date_key) FROM mart.fact_vehicle_daily_metrics),
     DATE '1900-01-01'
-);
+)
+UNION
+-- Partitions queued for refresh (late data for days already computed)
+SELECT entity_id, date_key
+FROM mart.metric_refresh_queue
+WHERE metric = 'vehicle';
 
 -- Remove existing rows for recomputed days
 DELETE FROM mart.fact_vehicle_daily_metrics
@@ -71,4 +94,7 @@ LEFT JOIN mart.fact_vehicle_telemetry t
    AND v.date_key   = t.date_key
 GROUP BY
     v.vehicle_id,
-    v.date_key;
\ No newline at end of file
+    v.date_key;
+
+-- Queued partitions are now up to date
+DELETE FROM mart.metric_refresh_queue WHERE metric = 'vehicle';
\ No newline at end of file
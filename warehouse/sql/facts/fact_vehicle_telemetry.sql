@@ -15,7 +15,14 @@ INSERT INTO mart.fact_vehicle_telemetry (
     engine_temp_c,
     battery_v,
     speeding,
-    date_key
+    date_key,
+    heading,
+    speed_zone_kph,
+    tire_psi_fl,
+    tire_psi_fr,
+    tire_psi_rl,
+    tire_psi_rr,
+    obd_codes
 )
 SELECT
     event_id,
@@ -29,7 +36,14 @@ SELECT
     engine_temp_c,
     battery_v,
     speeding,
-    CAST(timestamp AS DATE)               AS date_key
+    CAST(timestamp AS DATE)               AS date_key,
+    CAST(heading AS SMALLINT)             AS heading,
+    CAST(speed_zone_kph AS SMALLINT)      AS speed_zone_kph,
+    tire_psi_fl,
+    tire_psi_fr,
+    tire_psi_rl,
+    tire_psi_rr,
+    CAST(obd_codes AS VARCHAR[])          AS obd_codes
 FROM read_json_auto(
     'warehouse/staging/vehicles_staged.jsonl'
 )
@@ -52,9 +52,25 @@ CREATE TABLE IF NOT EXISTS mart.fact_vehicle_telemetry (
     engine_temp_c   DOUBLE,
     battery_v       DOUBLE,
     speeding        BOOLEAN,
-    date_key        DATE
+    date_key        DATE,
+    heading         SMALLINT,
+    speed_zone_kph  SMALLINT,
+    tire_psi_fl     DOUBLE,
+    tire_psi_fr     DOUBLE,
+    tire_psi_rl     DOUBLE,
+    tire_psi_rr     DOUBLE,
+    obd_codes       VARCHAR[]
 );
 
+-- Columns added after the first release (keeps existing warehouses in sync)
+ALTER TABLE mart.fact_vehicle_telemetry ADD COLUMN IF NOT EXISTS heading SMALLINT;
+ALTER TABLE mart.fact_vehicle_telemetry ADD COLUMN IF NOT EXISTS speed_zone_kph SMALLINT;
+ALTER TABLE mart.fact_vehicle_telemetry ADD COLUMN IF NOT EXISTS tire_psi_fl DOUBLE;
+ALTER TABLE mart.fact_vehicle_telemetry ADD COLUMN IF NOT EXISTS tire_psi_fr DOUBLE;
+ALTER TABLE mart.fact_vehicle_telemetry ADD COLUMN IF NOT EXISTS tire_psi_rl DOUBLE;
+ALTER TABLE mart.fact_vehicle_telemetry ADD COLUMN IF NOT EXISTS tire_psi_rr DOUBLE;
+ALTER TABLE mart.fact_vehicle_telemetry ADD COLUMN IF NOT EXISTS obd_codes VARCHAR[];
+
 CREATE TABLE IF NOT EXISTS mart.fact_driver_shifts (
     event_id                    VARCHAR PRIMARY KEY,
     driver_id                   VARCHAR,
@@ -67,6 +83,22 @@ CREATE TABLE IF NOT EXISTS mart.fact_driver_shifts (
     date_key                    DATE
 );
 
+-- Minute-level driver health (run_simulation --health-stream)
+-- Rolled up into mart.fact_driver_shifts, one row per driver shift
+CREATE TABLE IF NOT EXISTS mart.fact_driver_health_minute (
+    event_id                    VARCHAR PRIMARY KEY,
+    driver_id                   VARCHAR,
+    vehicle_id                  VARCHAR,
+    event_timestamp             TIMESTAMP,
+    date_key                    DATE,
+    shift_minute                SMALLINT,
+    speed_kph                   DOUBLE,
+    driving                     BOOLEAN,
+    on_break                    BOOLEAN,
+    continuous_driving_min      SMALLINT,
+    fatigue_index               DOUBLE
+);
+
 CREATE TABLE IF NOT EXISTS mart.fact_daily_finance (
     event_id                VARCHAR PRIMARY KEY,
     driver_id               VARCHAR,
@@ -98,3 +130,82 @@ CREATE TABLE IF NOT EXISTS mart.alerts (
     alert_time TIMESTAMP,
     description TEXT
 );
+
+-- METRIC REFRESH QUEUE
+-- (entity, date) partitions the daily metric SQL must recompute even when
+-- they are older than the latest loaded day; filled by watch_raw.py and
+-- drained by fact_driver_daily_metrics.sql / fact_vehicle_daily_metrics.sql.
+-- 'shift' rows are driver shifts with new minute rows, drained by
+-- fact_driver_shift_rollup.sql
+CREATE TABLE IF NOT EXISTS mart.metric_refresh_queue (
+    metric              VARCHAR, -- 'driver', 'vehicle', 'shift'
+    entity_id           VARCHAR,
+    date_key            DATE,
+    queued_at           TIMESTAMP,
+    PRIMARY KEY (metric, entity_id, date_key)
+);
+
+-- PIPELINE TELEMETRY (pipeline.py)
+-- One row per run and per step; loaded from warehouse/analytics/pipeline_runs.jsonl
+
+CREATE TABLE IF NOT EXISTS mart.pipeline_runs (
+    run_id              VARCHAR PRIMARY KEY,
+    started_at          TIMESTAMP,
+    finished_at         TIMESTAMP,
+    duration_s          DOUBLE,
+    status              VARCHAR, -- 'running', 'success', 'failed'
+    steps_run           INTEGER,
+    steps_skipped       INTEGER,
+    critical_path_s     DOUBLE,
+    snapshot            VARCHAR,
+    error               VARCHAR,
+    resumed_from        VARCHAR, -- run continued by --resume
+    resume_saved_s      DOUBLE   -- that run's time on the steps not redone
+);
+
+ALTER TABLE mart.pipeline_runs ADD COLUMN IF NOT EXISTS resumed_from VARCHAR;
+ALTER TABLE mart.pipeline_runs ADD COLUMN IF NOT EXISTS resume_saved_s DOUBLE;
+
+CREATE TABLE IF NOT EXISTS mart.pipeline_steps (
+    run_id              VARCHAR,
+    step_name           VARCHAR,
+    phase               VARCHAR,
+    started_at          TIMESTAMP,
+    duration_s          DOUBLE,
+    status              VARCHAR, -- 'success', 'skipped', 'resumed', 'failed'
+    rows_in             BIGINT,
+    rows_out            BIGINT,
+    rows_rejected       BIGINT,
+    bytes_read          BIGINT,
+    peak_rss_mb         DOUBLE,
+    error               VARCHAR,
+    PRIMARY KEY (run_id, step_name)
+);
+
+-- ENTITY BASELINES
+-- EWMA mean / variance of each vehicle's and driver's daily metrics, folded
+-- in one day at a time by warehouse/sql/facts/entity_baselines.sql
+CREATE TABLE IF NOT EXISTS mart.entity_baselines (
+    entity_type         VARCHAR, -- 'vehicle', 'driver'
+    entity_id           VARCHAR,
+    metric_name         VARCHAR,
+    ewma_mean           DOUBLE,
+    ewma_var            DOUBLE,
+    days_observed       INTEGER,
+    last_date_key       DATE,
+    updated_at          TIMESTAMP,
+    PRIMARY KEY (entity_type, entity_id, metric_name)
+);
+
+-- Each folded day scored against the baseline as it stood before that day
+CREATE TABLE IF NOT EXISTS mart.fact_entity_baseline_scores (
+    entity_type         VARCHAR,
+    entity_id           VARCHAR,
+    metric_name         VARCHAR,
+    date_key            DATE,
+    metric_value        DOUBLE,
+    baseline_mean       DOUBLE,
+    baseline_std        DOUBLE,
+    z_score             DOUBLE,  -- NULL until the baseline has enough days
+    PRIMARY KEY (entity_type, entity_id, metric_name, date_key)
+);
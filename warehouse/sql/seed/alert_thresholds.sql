@@ -5,4 +5,5 @@ INSERT OR REPLACE INTO mart.alert_thresholds VALUES
 ('speeding_rate', 0.08, 0.12, '>', 'High speeding frequency', TRUE),
 ('engine_temp_c', 90, 120, '>', 'Engine overheating risk', TRUE),
 ('battery_voltage', 11.8, 11.2, '<', 'Low vehicle battery', TRUE),
-('fraud_alerts_count', 1, 3, '>', 'Potential fraud detected', TRUE);
+('fraud_alerts_count', 1, 3, '>', 'Potential fraud detected', TRUE),
+('baseline_zscore', 3, 4, '>', 'Deviation from own baseline', TRUE);
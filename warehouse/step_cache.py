@@ -0,0 +1,119 @@
+"""
+warehouse/step_cache.py
+-----------------------
+Content-addressed cache for pipeline.py steps.
+
+A step's key hashes its code / SQL text, its input files and the outputs of
+the steps it depends on. When the key matches the last successful run the
+step is skipped:
+
+- stage steps additionally require their output files to still hash to
+  what that run produced
+- build steps additionally require the published snapshot to be the one
+  that run published (anything else, e.g. a stream-ingest publish, may
+  have changed the tables, so the step runs again)
+
+File contents are hashed once per (size, mtime) and memoized in the cache
+file, so unchanged raw files are not re-read on every run.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from warehouse.snapshots import ANALYTICS_DIR
+
+# Config
+CACHE_PATH = ANALYTICS_DIR / "step_cache.json"
+CHUNK_BYTES = 1 << 20
+
+logger = logging.getLogger(__name__)
+
+
+def expand_paths(paths: Iterable) -> List[Path]:
+    """Files under each path (directories recursively), sorted; missing paths are skipped."""
+    files: List[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.is_file()))
+        elif path.is_file():
+            files.append(path)
+    return files
+
+
+def digest_text(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class StepCache:
+    """
+    Step entries plus the per-file digest memo, persisted as JSON.
+    Safe to use from the pipeline's worker threads.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        data = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable step cache %s: %s", self.path, e)
+        self.steps: Dict[str, Dict] = data.get("steps", {})
+        self.files: Dict[str, Dict] = data.get("files", {})
+
+    # Hashing
+    def file_digest(self, path: Path) -> str:
+        st = path.stat()
+        stamp = [st.st_size, st.st_mtime_ns]
+        key = str(path)
+        with self.lock:
+            memo = self.files.get(key)
+        if memo and memo["stat"] == stamp:
+            return memo["sha256"]
+
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                h.update(chunk)
+        value = h.hexdigest()
+        with self.lock:
+            self.files[key] = {"stat": stamp, "sha256": value}
+        return value
+
+    def fingerprint(self, paths: Iterable) -> str:
+        """One digest over the names and contents of every file under `paths`."""
+        return digest_text(*(f"{p}={self.file_digest(p)}" for p in expand_paths(paths)))
+
+    # Entries
+    def get(self, step: str) -> Optional[Dict]:
+        with self.lock:
+            return self.steps.get(step)
+
+    def record(self, step: str, key: str, output: str, snapshot: Optional[str] = None) -> None:
+        with self.lock:
+            self.steps[step] = {"key": key, "output": output, "snapshot": snapshot}
+
+    def forget(self, steps: Iterable[str]) -> None:
+        with self.lock:
+            for step in steps:
+                self.steps.pop(step, None)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            # Drop memo entries for files that no longer exist
+            self.files = {k: v for k, v in self.files.items() if os.path.exists(k)}
+            payload = json.dumps({"steps": self.steps, "files": self.files}, indent=1, sort_keys=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(payload)
+        os.replace(tmp, self.path)
@@ -0,0 +1,471 @@
+# watch_raw.py
+"""
+Continuous ingest of the raw layer.
+
+Polls warehouse/raw/{vehicles,driver_health,finance} and, when a file
+appears or grows, stages only the bytes added since the last batch. The
+byte offset per file is kept in warehouse/analytics/watch_offsets.json:
+
+- plain .jsonl is read up to its last complete line
+- .jsonl.gz / .jsonl.zst are appended as new gzip members / zstd frames, so
+  the tail from the offset decodes on its own; a half-written frame is left
+  for the next batch
+- a file whose first bytes change (or that shrinks) was rewritten and is
+  read again from the start; loads are upserts, so this is safe
+
+Changes are debounced: a batch closes once the raw files have been quiet
+for --debounce seconds, or --batch-window seconds after the first change
+at the latest. Each batch is upserted into the live database
+(warehouse/live.py), so it costs only its own rows. Every --publish-every
+seconds the live rows are merged into a new snapshot, and only the
+(driver, day) and (vehicle, day) metric partitions they touch are
+recomputed, through mart.metric_refresh_queue. Rows not yet published
+when the nightly build runs are merged by it.
+
+New rows also go through the stream alert evaluator (stream_alerts.py)
+before the load, so threshold crossings are posted within a batch of
+landing (--no-alerts to skip).
+
+The nightly pipeline stays the source of truth (intraday health, trips,
+data quality, maintenance); watch mode keeps the dashboard minutes fresh
+in between.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+import stage_driver_health
+import stage_finance
+import stage_vehicles
+import stream_alerts
+from simulator.jsonl_io import JsonlWriter, raw_files, reject_entry, zstandard
+from warehouse.live import DEFAULT_PUBLISH_EVERY, connect_live, publish_live
+from warehouse.snapshots import ANALYTICS_DIR, current_db_path, current_version
+
+# Config
+OFFSETS_PATH = ANALYTICS_DIR / "watch_offsets.json"
+REJECTED_PATH = Path("warehouse/staging/rejected/watch.jsonl")
+
+SOURCES = {
+    "vehicles": stage_vehicles.RAW_VEHICLES_PATH,
+    "driver_health": stage_driver_health.RAW_DRIVER_HEALTH_PATH,
+    "finance": stage_finance.RAW_FINANCE_PATH,
+}
+
+DEFAULT_POLL = 1.0  # seconds between directory scans
+DEFAULT_DEBOUNCE = 3.0  # quiet period before a batch closes
+DEFAULT_BATCH_WINDOW = 60.0  # longest a change waits while files keep growing
+
+# Bytes hashed at the start of each file to detect rewrites
+HEAD_BYTES = 4096
+
+TELEMETRY = "fact_vehicle_telemetry"
+SHIFTS = "fact_driver_shifts"
+FINANCE = "fact_daily_finance"
+
+# Upserts, like build_analytics.py; the batch DataFrame is registered as batch_df
+UPSERT_SQL = {
+    TELEMETRY: """
+        INSERT OR REPLACE INTO mart.fact_vehicle_telemetry (
+            event_id, vehicle_id, driver_id, event_timestamp, lat, lon,
+            speed_kph, fuel_percent, engine_temp_c, battery_v, speeding, date_key,
+            heading, speed_zone_kph, tire_psi_fl, tire_psi_fr, tire_psi_rl, tire_psi_rr, obd_codes
+        )
+        SELECT
+            event_id, vehicle_id, driver_id,
+            CAST(timestamp AS TIMESTAMP),
+            lat, lon, speed_kph, fuel_percent, engine_temp_c, battery_v,
+            CAST(speeding AS BOOLEAN),
+            CAST(CAST(timestamp AS TIMESTAMP) AS DATE),
+            CAST(heading AS SMALLINT),
+            CAST(speed_zone_kph AS SMALLINT),
+            tire_psi_fl, tire_psi_fr, tire_psi_rl, tire_psi_rr,
+            CAST(obd_codes AS VARCHAR[])
+        FROM batch_df
+    """,
+    SHIFTS: """
+        INSERT OR REPLACE INTO mart.fact_driver_shifts (
+            event_id, driver_id, event_timestamp, shift_hours, continuous_driving_hours,
+            fatigue_index, breaks_taken, alerts, date_key
+        )
+        SELECT
+            event_id, driver_id,
+            CAST(timestamp AS TIMESTAMP),
+            shift_hours, continuous_driving_hours, fatigue_index,
+            CAST(breaks_taken AS BOOLEAN),
+            CAST(alerts AS JSON),
+            CAST(CAST(timestamp AS TIMESTAMP) AS DATE)
+        FROM batch_df
+    """,
+    FINANCE: """
+        INSERT OR REPLACE INTO mart.fact_daily_finance (
+            event_id, driver_id, date_key, total_revenue, total_cost, net_profit,
+            fraud_alerts_count, trading_position, end_of_day_balance
+        )
+        SELECT
+            event_id, driver_id,
+            CAST(date AS DATE),
+            total_revenue, total_cost, net_profit,
+            fraud_alerts_count, trading_position, end_of_day_balance
+        FROM batch_df
+    """,
+}
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger(__name__)
+
+
+# Staging
+def stage_vehicle(record: Dict) -> Tuple[str, Dict]:
+    record = stage_vehicles.normalize_record(record)
+    stage_vehicles.validate_required_fields(record)
+    stage_vehicles.quality_checks(record)
+    return TELEMETRY, stage_vehicles.stage_record(record)
+
+
+def stage_health(record: Dict) -> Tuple[str, Dict]:
+    stage_driver_health.validate_required_fields(record)
+    stage_driver_health.quality_checks(record)
+    staged = stage_driver_health.stage_record(record)
+    staged["alerts"] = json.dumps(staged["alerts"])
+    return SHIFTS, staged
+
+
+def stage_daily_finance(record: Dict) -> Tuple[str, Dict]:
+    # Trips are only staged by the nightly pipeline; the mart holds daily rows
+    stage_finance.validate_required_fields(record, stage_finance.REQUIRED_DAILY_FIELDS)
+    stage_finance.quality_checks_daily(record)
+    return FINANCE, stage_finance.stage_daily_record(record)
+
+
+STAGERS = {
+    "vehicles": stage_vehicle,
+    "driver_health": stage_health,
+    "finance": stage_daily_finance,
+}
+
+
+# Tailing
+def head_digest(path: Path, length: int) -> str:
+    with path.open("rb") as f:
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+def _new_decoder(name: str):
+    if name.endswith(".gz"):
+        return zlib.decompressobj(wbits=31)
+    if zstandard is None:
+        raise RuntimeError("zstd raw files need the 'zstandard' package (pip install zstandard)")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+def decode_tail(path: Path, data: bytes) -> Tuple[str, int]:
+    """
+    Text for the complete part of `data` (bytes from the file's offset) and
+    the number of bytes it covers. Plain files stop at the last newline,
+    compressed ones at the last finished gzip member / zstd frame.
+    """
+    name = path.name
+    if not name.endswith((".gz", ".zst")):
+        end = data.rfind(b"\n") + 1
+        return data[:end].decode("utf-8"), end
+
+    chunks: List[bytes] = []
+    consumed = 0
+    while consumed < len(data):
+        decoder = _new_decoder(name)
+        out = decoder.decompress(data[consumed:])
+        if not decoder.eof:
+            # Writer is mid-frame; the rest waits for the next batch
+            break
+        chunks.append(out)
+        consumed = len(data) - len(decoder.unused_data)
+    return b"".join(chunks).decode("utf-8"), consumed
+
+
+def read_new_lines(path: Path, state: Optional[Dict]) -> Tuple[List[str], Dict]:
+    """
+    Complete lines added to `path` since `state` ({"offset", "head"}) and
+    the state after them.
+    """
+    size = path.stat().st_size
+    offset = state["offset"] if state else 0
+    if state and (size < offset or head_digest(path, min(offset, HEAD_BYTES)) != state["head"]):
+        logger.info("%s was rewritten; reading it from the start", path)
+        offset = 0
+
+    with path.open("rb") as f:
+        f.seek(offset)
+        data = f.read(size - offset)
+
+    text, consumed = decode_tail(path, data)
+    new_offset = offset + consumed
+    return text.splitlines(), {"offset": new_offset, "head": head_digest(path, min(new_offset, HEAD_BYTES))}
+
+
+# Warehouse
+def load_batch(rows: Dict[str, List[Dict]]) -> Dict:
+    """
+    Upsert one batch into the live database. Returns the row count; metric
+    partitions are refreshed when the live rows are published.
+    """
+    result = {"rows": 0}
+    con = connect_live()
+    try:
+        for table, records in rows.items():
+            if not records:
+                continue
+            con.register("batch_df", pd.DataFrame.from_records(records))
+            try:
+                con.execute(UPSERT_SQL[table])
+            finally:
+                con.unregister("batch_df")
+            result["rows"] += len(records)
+    finally:
+        con.close()
+    return result
+
+
+# Watcher
+class RawWatcher:
+    """
+    Tracks the raw files' offsets and turns growth into debounced batches.
+    """
+
+    def __init__(
+        self,
+        debounce: float = DEFAULT_DEBOUNCE,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        backfill: bool = False,
+        evaluator: Optional[stream_alerts.StreamAlertEvaluator] = None,
+        publish_every: float = DEFAULT_PUBLISH_EVERY,
+    ):
+        self.debounce = debounce
+        self.evaluator = evaluator
+        self.batch_window = batch_window
+        self.publish_every = publish_every
+        self.offsets: Dict[str, Dict] = self._load_offsets(backfill)
+        self.batches = 0
+        self.rows = 0
+        self.unpublished = 0
+        self.last_publish = time.monotonic()
+        self._last_seen: Optional[Dict[str, Tuple[int, int]]] = None
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+
+    # Offsets
+    def _load_offsets(self, backfill: bool) -> Dict[str, Dict]:
+        if OFFSETS_PATH.exists():
+            try:
+                return json.loads(OFFSETS_PATH.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable offsets file %s: %s", OFFSETS_PATH, e)
+        if backfill:
+            logger.info("No offsets yet; loading existing raw files")
+            return {}
+
+        # Without offsets, what is on disk is assumed to be loaded by the pipeline
+        offsets = {}
+        for _, path in self.files():
+            size = path.stat().st_size
+            offsets[str(path)] = {"offset": size, "head": head_digest(path, min(size, HEAD_BYTES))}
+        logger.info("No offsets yet; watching %s existing raw files from their end (--backfill to load them)", len(offsets))
+        self._save_offsets(offsets)
+        return offsets
+
+    def _save_offsets(self, offsets: Dict[str, Dict]) -> None:
+        OFFSETS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = OFFSETS_PATH.with_name(OFFSETS_PATH.name + ".tmp")
+        tmp.write_text(json.dumps(offsets, indent=1, sort_keys=True))
+        os.replace(tmp, OFFSETS_PATH)
+
+    # Scanning
+    @staticmethod
+    def files() -> List[Tuple[str, Path]]:
+        return [(source, path) for source, directory in SOURCES.items() for path in raw_files(directory)]
+
+    def pending(self) -> Dict[str, Tuple[int, int]]:
+        """(size, mtime) of every raw file that differs from its offset."""
+        changed = {}
+        for _, path in self.files():
+            st = path.stat()
+            state = self.offsets.get(str(path))
+            if state is None or st.st_size != state["offset"]:
+                changed[str(path)] = (st.st_size, st.st_mtime_ns)
+        return changed
+
+    def due(self, now: float) -> bool:
+        """Scan once and report whether the pending changes should be batched now."""
+        changed = self.pending()
+        if not changed:
+            self._first_change = self._last_change = None
+            self._last_seen = None
+            return False
+
+        if changed != self._last_seen:
+            self._last_seen = changed
+            self._last_change = now
+            if self._first_change is None:
+                self._first_change = now
+
+        quiet = now - self._last_change >= self.debounce
+        overdue = now - self._first_change >= self.batch_window
+        return quiet or overdue
+
+    # Batches
+    def flush(self) -> Optional[Dict]:
+        """Stage and load everything new. Returns the batch summary, or None if nothing was complete."""
+        started = time.perf_counter()
+        waited = time.monotonic() - self._first_change if self._first_change else 0.0
+        rows: Dict[str, List[Dict]] = {TELEMETRY: [], SHIFTS: [], FINANCE: []}
+        rejects: List[Dict] = []
+        offsets = dict(self.offsets)
+        files = 0
+        lines_read = 0
+
+        for source, path in self.files():
+            key = str(path)
+            state = self.offsets.get(key)
+            if state is not None and path.stat().st_size == state["offset"]:
+                continue
+            lines, offsets[key] = read_new_lines(path, state)
+            if not lines:
+                continue
+            files += 1
+            stage = STAGERS[source]
+            for line in lines:
+                if not line.strip():
+                    continue
+                lines_read += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    rejects.append({"reason": f"Malformed JSON: {e.msg}", "source": path.name, "record": line})
+                    continue
+                try:
+                    table, staged = stage(record)
+                except (ValueError, KeyError, TypeError) as e:
+                    rejects.append(reject_entry(record, e))
+                    continue
+                rows[table].append(staged)
+
+        # Files removed from the raw layer are forgotten
+        present = {str(path) for _, path in self.files()}
+        offsets = {k: v for k, v in offsets.items() if k in present}
+        self._first_change = self._last_change = None
+        self._last_seen = None
+
+        if not files:
+            # Only partial lines / frames so far; retried after the next quiet period
+            return None
+
+        alerts = self.evaluator.observe_batch(rows) if self.evaluator is not None else []
+        if alerts:
+            stream_alerts.notify(alerts)
+
+        result = load_batch(rows) if any(rows.values()) else {"rows": 0}
+        if rejects:
+            REJECTED_PATH.parent.mkdir(parents=True, exist_ok=True)
+            with JsonlWriter(REJECTED_PATH) as writer:
+                writer.write_all(rejects)
+
+        # Offsets move only once the batch is in the live database
+        self.offsets = offsets
+        self._save_offsets(offsets)
+
+        self.batches += 1
+        self.rows += result["rows"]
+        self.unpublished += result["rows"]
+        return {
+            "files": files,
+            "lines": lines_read,
+            "telemetry": len(rows[TELEMETRY]),
+            "shifts": len(rows[SHIFTS]),
+            "finance": len(rows[FINANCE]),
+            "rejected": len(rejects),
+            "alerts": len(alerts),
+            "waited_s": waited,
+            "cycle_s": time.perf_counter() - started,
+        }
+
+    def publish_due(self, now: float) -> bool:
+        return bool(self.publish_every and self.unpublished and now - self.last_publish >= self.publish_every)
+
+    def publish(self) -> None:
+        """Publish a snapshot with the live rows; skipped while another build holds the lock."""
+        started = time.perf_counter()
+        published = publish_live()
+        self.last_publish = time.monotonic()
+        if published is not None:
+            self.unpublished = 0
+            logger.info("Published %s live rows in %.2fs", f"{published:,}", time.perf_counter() - started)
+
+    def run(self, poll: float = DEFAULT_POLL, once: bool = False) -> None:
+        logger.info(
+            "Watching %s (poll %.1fs, debounce %.1fs, batch window %.0fs)",
+            ", ".join(str(p) for p in SOURCES.values()), poll, self.debounce, self.batch_window,
+        )
+        while True:
+            if once or self.due(time.monotonic()):
+                batch = self.flush()
+                if batch:
+                    log_batch(self.batches, batch)
+            if once:
+                if self.unpublished and self.publish_every:
+                    self.publish()
+                return
+            if self.publish_due(time.monotonic()):
+                self.publish()
+            time.sleep(poll)
+
+
+def log_batch(number: int, batch: Dict) -> None:
+    logger.info(
+        "Batch %s: %s files, %s lines (telemetry %s, health %s, finance %s, rejected %s) | "
+        "%s alerts | waited %.1fs | cycle %.2fs",
+        number, batch["files"], f"{batch['lines']:,}", f"{batch['telemetry']:,}", f"{batch['shifts']:,}",
+        f"{batch['finance']:,}", batch["rejected"], batch["alerts"],
+        batch["waited_s"], batch["cycle_s"],
+    )
+
+
+# CLI
+def parse_args():
+    p = argparse.ArgumentParser(description="Watch the raw layer and load new data into the warehouse as it lands")
+    p.add_argument("--poll", type=float, default=DEFAULT_POLL, help="seconds between scans of the raw directories")
+    p.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="close a batch once files are quiet this long (s)")
+    p.add_argument("--batch-window", type=float, default=DEFAULT_BATCH_WINDOW, help="close a batch at most this long after the first change (s)")
+    p.add_argument("--backfill", action="store_true", help="without saved offsets, load existing raw files instead of starting at their end")
+    p.add_argument("--publish-every", type=float, default=DEFAULT_PUBLISH_EVERY,
+                   help="seconds between snapshot publishes of the live rows (0: leave them to the nightly build)")
+    p.add_argument("--once", action="store_true", help="load whatever is new now, publish it and exit")
+    p.add_argument("--no-alerts", action="store_true", help="do not evaluate alert thresholds on new rows")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if current_version() is None:
+        raise SystemExit("No published snapshot yet; run pipeline.py once before watching")
+    evaluator = None
+    if not args.no_alerts:
+        con = duckdb.connect(str(current_db_path()), read_only=True)
+        try:
+            evaluator = stream_alerts.StreamAlertEvaluator.from_snapshot(con)
+        finally:
+            con.close()
+    watcher = RawWatcher(args.debounce, args.batch_window, args.backfill, evaluator, args.publish_every)
+    try:
+        watcher.run(args.poll, args.once)
+    except KeyboardInterrupt:
+        logger.info("Stopped after %s batches (%s rows)", watcher.batches, f"{watcher.rows:,}")